@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Measure how long saves stall an asyncio event loop
+
+A ticker coroutine sleeps 1 ms in a loop and records how late it wakes
+up while another coroutine saves the storage, first with the blocking
+`storage.save()` and then with `await storage.asave()`. The encoding
+still holds the GIL in the executor thread, so the loop is only
+stalled for the interpreter's switch interval at a time instead of
+the whole save.
+
+Usage: ./benchmarks/bench_async_stall.py [--objects N] [--saves N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.place import Place  # noqa: E402
+
+TICK = 0.001
+
+
+async def ticker(stalls, stop):
+    """Record how late every tick wakes up, until stopped"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stalls.append(time.perf_counter() - start - TICK)
+
+
+async def run(saves, blocking):
+    """Save some times while the ticker runs
+
+    Returns:
+        The sorted stalls of the ticks in seconds, and the total time
+        of the saves
+    """
+    stalls = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(stalls, stop))
+    await asyncio.sleep(0.01)
+    places = list(models.storage.all(Place).values())
+    start = time.perf_counter()
+    for i in range(saves):
+        place = places[i % len(places)]
+        place.number_rooms = i
+        if blocking:
+            place.save()
+        else:
+            await place.asave()
+        # Let the ticker run between the saves
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return sorted(stalls), elapsed
+
+
+def report(name, stalls, elapsed):
+    """Print the stall percentiles of a run"""
+    def percentile(ratio):
+        return stalls[min(len(stalls) - 1, int(len(stalls) * ratio))] * 1000
+
+    print(f'{name:10} ticks {len(stalls):5}  p50 {percentile(0.5):7.2f} ms'
+          f'  p99 {percentile(0.99):7.2f} ms  max {stalls[-1] * 1000:7.2f}'
+          f' ms  saves {elapsed:6.2f} s')
+
+
+def main():
+    """Parse the arguments and print the results"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=20000)
+    parser.add_argument('--saves', type=int, default=20)
+    args = parser.parse_args()
+
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(args.objects):
+            place = Place()
+            place.name = f'Place {i}'
+            place.save()
+    # Encode every object and build the indexes once, so both runs
+    #   only pay for the changes
+    models.storage.save()
+    models.storage.count(Place)
+    print(f'{args.objects} places, {args.saves} saves')
+    report('save()', *asyncio.run(run(args.saves, True)))
+    report('asave()', *asyncio.run(run(args.saves, False)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Time a reload from the binary snapshot against one from the JSON one
+
+The binary snapshot is only read once the JSON one is checksummed, so
+its reload still reads every byte of file.json, but never parses it.
+
+Usage: ./benchmarks/bench_binary_reload.py [--objects N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def timed(function):
+    """The seconds a call takes"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    """Write the snapshots, then reload them both ways"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    args = parser.parse_args()
+
+    FileStorage._FileStorage__objects = {}
+    storage = FileStorage(durability='never', binary=True)
+    for i in range(args.objects):
+        place = Place()
+        place.name = f'Place {i}'
+        place.description = 'A quiet place near the beach'
+        storage.new(place)
+    json_save = timed(FileStorage(durability='never').save)
+    binary_save = timed(storage.save)
+    print(f'{args.objects} places, file.json'
+          f' {os.path.getsize("file.json") / (1 << 20):.0f} MiB,'
+          f' file.json.pickle'
+          f' {os.path.getsize("file.json.pickle") / (1 << 20):.0f} MiB')
+    print(f'save    JSON {json_save:6.2f} s'
+          f'  JSON + binary {binary_save:6.2f} s')
+
+    results = {}
+    for name, binary in (('JSON', False), ('binary', True)):
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(binary=binary)
+        results[name] = timed(storage.reload)
+        assert storage.count(Place) == args.objects
+    print(f'reload  JSON {results["JSON"]:6.2f} s'
+          f'  binary {results["binary"]:6.2f} s'
+          f'  x{results["JSON"] / results["binary"]:4.1f}')
+
+
+if __name__ == '__main__':
+    main()
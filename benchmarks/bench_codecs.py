@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Time the conversions of every model class to and from its dictionary
+
+For each class, with every declared attribute set: to_dict(), as a
+save runs it, the constructor from a dictionary, as a reload runs it,
+and the build of an instance from its raw record, as a lazy reload
+runs it. Run it with HBNB_COMPACT_MODELS=1 for the compact models.
+
+Usage: ./benchmarks/bench_codecs.py [--number N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+from models.engine.file_storage import models_dict, _build  # noqa: E402
+
+# A value of every declared type
+SAMPLES = {
+    str: 'a value of some length',
+    int: 42,
+    float: 37.7749,
+    list: ['a', 'b']
+    }
+
+
+def record_of(cls):
+    """The record of an instance with every declared attribute set"""
+    obj = cls()
+    for name, (kind, _) in cls.schema.items():
+        if kind in SAMPLES:
+            setattr(obj, name, SAMPLES[kind])
+    obj.updated_at = datetime.datetime.now()
+    return obj, obj.to_dict()
+
+
+def main():
+    """Time the conversions of every class"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    compact = os.getenv('HBNB_COMPACT_MODELS') == '1'
+    print(f'{"compact" if compact else "__dict__"} models,'
+          f' microseconds per call')
+    print('class       to_dict  create  raw build')
+    for name, cls in models_dict.items():
+        obj, record = record_of(cls)
+        key = f'{name}.{obj.id}'
+        times = [
+            timeit.timeit(obj.to_dict, number=args.number),
+            timeit.timeit(lambda: cls(**record), number=args.number),
+            timeit.timeit(lambda: _build(key, record), number=args.number)
+            ]
+        print(f'{name:10}' + ''.join(
+            f'{elapsed / args.number * 1e6:8.2f}' for elapsed in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""Measure the storage under many reader threads and one writer thread
+
+Every reader loops over the reads the console makes (count, show, all
+and a filtered query) while the writer creates, updates, destroys and
+saves places. The script reports the operations per second of each
+side and fails if any thread raised, e.g. "dictionary changed size
+during iteration".
+
+Usage: ./benchmarks/bench_contention.py [--readers N] [--seconds S]
+           [--objects N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def reader(stop, counts, errors, ids):
+    """Read until stopped, counting the reads"""
+    generator = random.Random()
+    done = 0
+    try:
+        while not stop.is_set():
+            models.storage.count(Place)
+            models.storage.get(Place, generator.choice(ids))
+            len(models.storage.snapshot())
+            list(models.storage.query(Place).filter(
+                price_by_night__lt=generator.randrange(200)).limit(20))
+            done += 4
+    except Exception as error:
+        errors.append(error)
+    counts.append(done)
+
+
+def writer(stop, counts, errors, ids):
+    """Change places until stopped, counting the changes"""
+    generator = random.Random()
+    done = 0
+    try:
+        while not stop.is_set():
+            place = Place()
+            place.price_by_night = generator.randrange(200)
+            place.save()
+            victim = models.storage.get(Place, ids[done % len(ids)])
+            if victim is not None:
+                victim.price_by_night = generator.randrange(200)
+                victim.save()
+            models.storage.delete(place)
+            models.storage.save()
+            done += 3
+    except Exception as error:
+        errors.append(error)
+    counts.append(done)
+
+
+def run(readers, seconds, objects):
+    """Run the readers and the writer for some seconds
+
+    Returns:
+        The reads per second, the writes per second and the errors
+    """
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(objects):
+            place = Place()
+            place.price_by_night = i % 200
+            place.save()
+    ids = [key.partition('.')[2] for key in models.storage.all(Place)]
+
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    threads = [threading.Thread(target=reader,
+                                args=(stop, reads, errors, ids))
+               for _ in range(readers)]
+    threads.append(threading.Thread(target=writer,
+                                    args=(stop, writes, errors, ids)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, sum(writes) / seconds, errors
+
+
+def main():
+    """Parse the arguments and print the results"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--objects', type=int, default=2000)
+    args = parser.parse_args()
+
+    reads, writes, errors = run(args.readers, args.seconds, args.objects)
+    print(f'{args.readers} readers, 1 writer, {args.objects} places,'
+          f' {args.seconds:g}s')
+    print(f'reads:  {reads:10.0f} /s')
+    print(f'writes: {writes:10.0f} /s')
+    print(f'errors: {len(errors)}')
+    for error in errors:
+        print(f'  {type(error).__name__}: {error}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
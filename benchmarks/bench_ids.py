@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""Compare the random and the time-ordered ids of the new objects
+
+Times the generation of an id by every generator. Then, for every
+generator in a process of its own, reloads a storage file of places
+created with it and times the first query, which builds the indexes,
+a page of the newest places in the order of their dates and of their
+ids, and the next page from the last id of the first. The entries of
+the sorted indexes having equal values are in key order: the random
+ids are inserted all over them, the time-ordered ones appended.
+
+Usage: ./benchmarks/bench_ids.py [--objects N] [--page N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models import ids  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def measure(objects, page):
+    """Print the seconds taken by every step on a new storage file"""
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for _ in range(objects):
+            Place().save()
+    FileStorage._FileStorage__objects = {}
+    models.storage.reload()
+
+    steps = []
+    query = models.storage.query(Place)
+    start = time.perf_counter()
+    query.count()
+    query.order_by('id').limit(1).all()
+    steps.append(time.perf_counter() - start)
+    for newest in (query.order_by('-created_at').limit(page),
+                   query.order_by('-id').limit(page)):
+        start = time.perf_counter()
+        last = list(newest)[-1]
+        steps.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    list(query.filter(id__lt=last.id).order_by('-id').limit(page))
+    steps.append(time.perf_counter() - start)
+    print(*steps)
+
+
+def main():
+    """Time the generators, then measure the storage of every one"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--page', type=int, default=20)
+    parser.add_argument('--measure', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(args.objects, args.page)
+
+    print('microseconds per id')
+    for name, generator in ids.GENERATORS.items():
+        elapsed = timeit.timeit(generator, number=100000)
+        print(f'{name:8}{elapsed / 100000 * 1e6:8.2f}')
+    print()
+    print(f'{args.objects} places, pages of {args.page}, milliseconds')
+    print('ids         indexes  newest by date  newest by id  next page')
+    for name in ids.GENERATORS:
+        steps = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--measure',
+             '--objects', str(args.objects), '--page', str(args.page)],
+            env=dict(os.environ, HBNB_MODEL_IDS=name),
+            cwd=tempfile.mkdtemp(prefix='hbnb-bench-'), check=True,
+            capture_output=True, text=True).stdout.split()
+        build, by_date, by_id, following = (float(step) * 1000
+                                            for step in steps)
+        print(f'{name:8}{build:12.1f}{by_date:16.1f}{by_id:14.2f}'
+              f'{following:11.2f}')
+
+
+if __name__ == '__main__':
+    main()
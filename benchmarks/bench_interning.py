@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""Measure the memory the interned foreign keys save on a reload
+
+Writes a storage file of reviews spread over a number of places and
+users, with its binary copy, then reloads it in a process of its own
+for every mode: from the JSON and the binary snapshots without
+interning (the models listing no `interned` attributes), with it, and
+from a binary snapshot holding a string table. Prints the seconds a
+reload takes, the bytes it allocates for every review and the size of
+the binary snapshot.
+
+Usage: ./benchmarks/bench_interning.py [--objects N] [--places N]
+       [--users N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage, models_dict  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def write(data, objects, places, users, table):
+    """Write the storage files of a directory"""
+    os.chdir(data)
+    models.storage.durability = 'never'
+    models.storage.binary = True
+    models.storage.string_table = table
+    place_ids = [Place().id for _ in range(places)]
+    user_ids = [User().id for _ in range(users)]
+    FileStorage._FileStorage__objects = {}
+    for i in range(objects):
+        review = Review()
+        review.place_id = place_ids[i % places]
+        review.user_id = user_ids[i % users]
+        review.text = 'Great stay'
+    models.storage.save()
+
+
+def measure(data, binary, interned):
+    """Print the seconds a reload of the storage file of a directory
+    takes and the bytes it allocates for each object"""
+    os.chdir(data)
+    models.storage.binary = binary
+    if not interned:
+        for cls in models_dict.values():
+            cls.interned = ()
+    FileStorage._FileStorage__objects = {}
+    start = time.perf_counter()
+    models.storage.reload()
+    elapsed = time.perf_counter() - start
+
+    FileStorage._FileStorage__objects = {}
+    tracemalloc.start()
+    models.storage.reload()
+    memory = tracemalloc.get_traced_memory()[0] / models.storage.count()
+    tracemalloc.stop()
+    print(elapsed, memory)
+
+
+def main():
+    """Write the storage files, then measure every mode"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--write', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--table', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--binary', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--plain', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.write:
+        return write(args.write, args.objects, args.places, args.users,
+                     args.table)
+    if args.measure:
+        return measure(args.measure, args.binary, not args.plain)
+
+    def run(*options):
+        return subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *options,
+             '--objects', str(args.objects), '--places', str(args.places),
+             '--users', str(args.users)],
+            check=True, capture_output=True, text=True).stdout
+
+    files = {}
+    for table in (False, True):
+        files[table] = tempfile.mkdtemp(prefix='hbnb-bench-')
+        run('--write', files[table], *(['--table'] if table else []))
+    print(f'{args.objects} reviews of {args.places} places by {args.users}'
+          f' users')
+    print('mode                    reload (s)  bytes/review  pickle (MB)')
+    for name, table, options in (
+            ('JSON', False, ['--plain']),
+            ('JSON, interned', False, []),
+            ('binary', False, ['--binary', '--plain']),
+            ('binary, interned', False, ['--binary']),
+            ('binary, string table', True, ['--binary'])):
+        elapsed, memory = map(float, run('--measure', files[table],
+                                         *options).split())
+        size = os.path.getsize(os.path.join(files[table],
+                                            'file.json.pickle'))
+        print(f'{name:24}{elapsed:10.2f}{memory:14.0f}{size / 1e6:13.1f}')
+
+
+if __name__ == '__main__':
+    main()
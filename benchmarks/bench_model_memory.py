@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""Measure the memory taken by each object, with and without the
+compact models
+
+Every mode runs in a process of its own. It builds the instances of the
+records of the same file.json, the way a reload does, then converts
+them to dictionaries, the way a save does: the attribute values are
+shared with the records, so only the instances and their parsed
+timestamps are measured. It then reloads the whole storage, indexes
+included.
+
+Usage: ./benchmarks/bench_model_memory.py [--objects N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.engine.file_storage import models_dict  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def measure(data):
+    """Print the bytes taken by each object of the storage file of a
+    directory: built, converted to a dictionary and reloaded"""
+    os.chdir(data)
+    with open('file.json', 'r') as file:
+        records = list(json.load(file).values())
+    tracemalloc.start()
+    objects = [models_dict[record['__class__']](**record)
+               for record in records]
+    built = tracemalloc.get_traced_memory()[0]
+    for obj in objects:
+        obj.to_dict()
+    converted = tracemalloc.get_traced_memory()[0]
+    del objects
+    tracemalloc.stop()
+    tracemalloc.start()
+    models.storage.reload()
+    reloaded = tracemalloc.get_traced_memory()[0]
+    print(built / len(records), converted / len(records),
+          reloaded / len(records))
+
+
+def main():
+    """Write the storage file, then measure every mode"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(args.measure)
+
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(args.objects):
+            place = Place()
+            place.city_id = f'city-{i % 100}'
+            place.name = f'Place {i}'
+            place.price_by_night = i % 300
+            place.save()
+    print(f'{args.objects} places, bytes per object')
+    print('           instance  after to_dict()  whole storage')
+    for name, compact in (('__dict__', '0'), ('compact', '1')):
+        with tempfile.TemporaryDirectory() as empty:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__),
+                 '--measure', os.getcwd()],
+                env=dict(os.environ, HBNB_COMPACT_MODELS=compact),
+                cwd=empty, check=True, capture_output=True, text=True)
+        built, converted, reloaded = map(float, output.stdout.split())
+        print(f'{name:9} {built:9.0f} {converted:16.0f} {reloaded:14.0f}')
+
+
+if __name__ == '__main__':
+    main()
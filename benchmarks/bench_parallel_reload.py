@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""Time the reload of a large storage file by 1 to N processes
+
+The objects are built in the worker processes, then sent back and
+stored by the reloading process, which bounds the speedup: that part
+doesn't shrink with more processes.
+
+Usage: ./benchmarks/bench_parallel_reload.py [--objects N]
+           [--workers N [N ...]]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def main():
+    """Write the storage file, then reload it with every pool size"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(args.objects):
+            place = Place()
+            place.name = f'Place {i}'
+            place.description = 'A quiet place near the beach'
+            place.save()
+    size = os.path.getsize('file.json') / (1 << 20)
+    print(f'{args.objects} places, file.json {size:.0f} MiB,'
+          f' {os.cpu_count()} CPUs')
+
+    serial = None
+    for workers in args.workers:
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(reload_workers=workers)
+        start = time.perf_counter()
+        storage.reload()
+        elapsed = time.perf_counter() - start
+        serial = serial or elapsed
+        print(f'{workers:3} processes  {elapsed:6.2f} s'
+              f'  x{serial / elapsed:4.1f}')
+
+
+if __name__ == '__main__':
+    main()
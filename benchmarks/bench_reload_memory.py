@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Compare the peak memory of reloading a large storage file
+
+The streaming reload parses the records one at a time, the previous
+reload decoded the whole file with json.load before building the
+objects. Each is measured in a fresh process, by its peak resident
+set size.
+
+Usage: ./benchmarks/bench_reload_memory.py [--objects N]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def peak_rss():
+    """The peak resident set size of this process, in MiB"""
+    # ru_maxrss can keep the peak of the parent process on Linux
+    try:
+        with open('/proc/self/status', 'r') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode):
+    """Reload the storage file of the current directory and print the
+    peak memory and time"""
+    # Importing the models reloads the storage file of the directory
+    data = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+    import models
+    os.chdir(data)
+    from models.engine.file_storage import FileStorage, models_dict
+
+    FileStorage._FileStorage__objects = {}
+    before = peak_rss()
+    start = time.perf_counter()
+    if mode == 'stream':
+        models.storage.reload()
+    else:
+        with open('file.json', 'r') as file:
+            records = json.load(file)
+        objects = FileStorage._FileStorage__objects
+        for key, record in records.items():
+            objects[key] = models_dict[record['__class__']](**record)
+        del records
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'objects': len(models.storage.all()),
+                      'rss': peak_rss(), 'baseline': before,
+                      'seconds': elapsed}))
+
+
+def main():
+    """Write the storage file, then reload it both ways"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--measure', choices=('stream', 'load'))
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure)
+        return
+
+    os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+    import models
+    from models.place import Place
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(args.objects):
+            place = Place()
+            place.name = f'Place {i}'
+            place.description = 'A quiet place near the beach'
+            place.save()
+    size = os.path.getsize('file.json') / (1 << 20)
+    print(f'{args.objects} places, file.json {size:.0f} MiB')
+    for mode, name in (('load', 'json.load'), ('stream', 'streaming')):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--measure', mode],
+            check=True, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=ROOT)).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{name:10} peak RSS {result["rss"]:7.0f} MiB'
+              f' (+{result["rss"] - result["baseline"]:.0f} MiB)'
+              f'  {result["seconds"]:6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
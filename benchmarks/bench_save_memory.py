@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""Compare the peak memory and time of saving many objects
+
+`obj_to_json` is the original save: a dictionary of every object's
+to_dict() dumped with json.dump(..., indent=3). `stream` is the
+storage's save without its encode cache, writing the encoded records
+one at a time, and `compact` the same without indentation. `cached` is
+`stream` keeping the encoded records, so the next saves only encode
+the changed objects, as the time to save again after changing one
+object shows. Each runs in a fresh process holding the objects. The
+peak resident set size is measured above the size before the save,
+and so is the size kept after it.
+
+Usage: ./benchmarks/bench_save_memory.py [--objects N [N ...]]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+MODES = ('obj_to_json', 'stream', 'compact', 'cached')
+
+
+def memory():
+    """The current and peak resident set sizes of this process, in MiB
+    """
+    sizes = {}
+    with open('/proc/self/status', 'r') as status:
+        for line in status:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'VmHWM'):
+                sizes[name] = int(value.split()[0]) / 1024
+    return sizes['VmRSS'], sizes['VmHWM']
+
+
+def reset_peak():
+    """Reset the peak resident set size to the current one, if Linux
+    allows it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def measure(mode, objects):
+    """Create the objects, save them and print the peak memory and time
+    """
+    os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+
+    storage = FileStorage(compact=mode == 'compact', durability='never',
+                          encode_cache=mode == 'cached')
+    models.storage = storage
+    for i in range(objects):
+        place = Place()
+        place.name = f'Place {i}'
+        place.description = 'A quiet place near the beach'
+
+    def save():
+        if mode != 'obj_to_json':
+            storage.save()
+            return
+        obj_to_json = {}
+        for key, value in storage.all().items():
+            obj_to_json[key] = value.to_dict()
+        with open('file.json', 'w') as obj_to_json_file:
+            json.dump(obj_to_json, obj_to_json_file, indent=3)
+
+    reset_peak()
+    before, _ = memory()
+    start = time.perf_counter()
+    save()
+    elapsed = time.perf_counter() - start
+    after, peak = memory()
+    place.number_rooms = 1
+    storage.touch(place)
+    start = time.perf_counter()
+    save()
+    again = time.perf_counter() - start
+    print(json.dumps({'before': before, 'peak': peak, 'after': after,
+                      'seconds': elapsed, 'again': again,
+                      'size': os.path.getsize('file.json')}))
+
+
+def main():
+    """Run every mode for every number of objects"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, nargs='+',
+                        default=[100000, 1000000])
+    parser.add_argument('--measure', choices=MODES)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure, args.objects[0])
+        return
+
+    for objects in args.objects:
+        print(f'{objects} places')
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--measure',
+                 mode, '--objects', str(objects)],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f'  {mode:12}'
+                  f' peak +{result["peak"] - result["before"]:5.0f} MiB'
+                  f'  kept +{result["after"] - result["before"]:5.0f} MiB'
+                  f'  {result["seconds"]:6.2f} s'
+                  f'  resave {result["again"]:6.2f} s'
+                  f'  file {result["size"] / (1 << 20):5.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Compare the ISO and the epoch timestamps on a large storage file
+
+Every mode runs in a process of its own: it reloads the file, reads
+every timestamp, converts every object to its dictionary, the way a
+save does, and counts the objects of a range of dates. The epoch mode
+is measured on a file of ISO timestamps too, as written before it was
+turned on.
+
+Usage: ./benchmarks/bench_timestamps.py [--objects N]
+"""
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp(prefix='hbnb-bench-'))
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+# The timestamps of the places, a minute apart
+START = datetime.datetime(2024, 1, 1)
+
+
+def write(data, objects):
+    """Write the storage file of a directory"""
+    os.chdir(data)
+    models.storage.durability = 'never'
+    with models.storage.batch():
+        for i in range(objects):
+            place = Place()
+            place.name = f'Place {i}'
+            place.created_at = START + datetime.timedelta(minutes=i)
+            place.save()
+
+
+def measure(data):
+    """Print the seconds taken by every step on the storage file of a
+    directory, and the bytes taken by each reloaded object"""
+    os.chdir(data)
+    tracemalloc.start()
+    models.storage.reload()
+    memory = tracemalloc.get_traced_memory()[0] / models.storage.count()
+    tracemalloc.stop()
+
+    steps = []
+    FileStorage._FileStorage__objects = {}
+    start = time.perf_counter()
+    models.storage.reload()
+    steps.append(time.perf_counter() - start)
+    objects = models.storage.all(Place).values()
+
+    start = time.perf_counter()
+    for place in objects:
+        place.created_at
+    steps.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for place in objects:
+        place.to_dict()
+    steps.append(time.perf_counter() - start)
+    middle = START + datetime.timedelta(minutes=len(objects) // 2)
+    start = time.perf_counter()
+    models.storage.query(Place).filter(
+        created_at__ge=middle,
+        created_at__lt=middle + datetime.timedelta(days=1)).count()
+    steps.append(time.perf_counter() - start)
+    print(*steps, memory)
+
+
+def main():
+    """Write the storage files, then measure every mode"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=200000)
+    parser.add_argument('--write', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.write:
+        return write(args.write, args.objects)
+    if args.measure:
+        return measure(args.measure)
+
+    def run(option, timestamps, directory):
+        return subprocess.run(
+            [sys.executable, os.path.abspath(__file__), option, directory,
+             '--objects', str(args.objects)],
+            env=dict(os.environ, HBNB_STORAGE_TIMESTAMPS=timestamps),
+            cwd=empty, check=True, capture_output=True, text=True).stdout
+
+    empty = tempfile.mkdtemp(prefix='hbnb-bench-')
+    files = {}
+    for timestamps in ('iso', 'epoch'):
+        files[timestamps] = tempfile.mkdtemp(prefix='hbnb-bench-')
+        run('--write', timestamps, files[timestamps])
+    print(f'{args.objects} places, seconds, and bytes per object')
+    print('mode              reload  read dates  to_dict   range  memory')
+    for name, timestamps, data in (('ISO', 'iso', 'iso'),
+                                   ('epoch, ISO file', 'epoch', 'iso'),
+                                   ('epoch', 'epoch', 'epoch')):
+        reload, read, convert, count, memory = map(
+            float, run('--measure', timestamps, files[data]).split())
+        print(f'{name:16}{reload:8.2f}{read:12.2f}{convert:9.2f}'
+              f'{count:8.2f}{memory:8.0f}')
+
+
+if __name__ == '__main__':
+    main()
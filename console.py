@@ -28,6 +28,7 @@ Example of typical usage:
 """
 import json
 import cmd
+import math
 import re
 import sys
 from models.engine.file_storage import models_dict
@@ -54,6 +55,7 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, args):
         """Quit command to exit the program\n"""
+        storage.flush()
         return True
 
     # aliases
@@ -98,7 +100,10 @@ class HBNBCommand(cmd.Cmd):
             for x in range(2, 4):
                 args[x] = args[x].replace('"', '')
                 args[x] = args[x].replace(',', '')
-            if len(args) > 4:
+            if args[0] in ('bbox', 'search'):
+                # The box takes four values and a query any number
+                line = ' '.join(args)
+            elif len(args) > 4:
                 line = f'{args[0]} {args[1]} {args[2]} {args[3]} {args[4]}'
             else:
                 line = f'{args[0]} {args[1]} {args[2]} {args[3]}'
@@ -143,12 +148,11 @@ class HBNBCommand(cmd.Cmd):
         elif len(args) < 2:
             print("** instance id missing **")
         else:
-            instance_key = "{}.{}".format(args[0], args[1])
-            all_instances = storage.all()
-            if instance_key not in all_instances:
+            instance = storage.get(args[0], args[1])
+            if instance is None:
                 print('** no instance found **')
             else:
-                print(all_instances[instance_key])
+                print(instance)
 
     def do_all(self, model=''):
         """Prints all string representation of all instances based
@@ -158,15 +162,14 @@ class HBNBCommand(cmd.Cmd):
 
         list_instances = []
         if len(model) == 0:
-            for val in storage.all().values():
+            for val in storage.snapshot().values():
                 list_instances.append(str(val))
         else:
             if model not in models_dict:
                 print("** class doesn't exist **")
                 return
-            for key, val in storage.all().items():
-                if model in key:
-                    list_instances.append(str(val))
+            for val in storage.all(model).values():
+                list_instances.append(str(val))
         if not list_instances:
             return
         else:
@@ -197,22 +200,18 @@ class HBNBCommand(cmd.Cmd):
                 model_name = args[0]
                 model_id = args[1].replace('"', "")
                 new_attributes_dict = from_json_string(args[2])
-                all_instances = storage.all()
-                instance_key = f'{model_name}.{model_id}'
-                if instance_key not in all_instances:
+                new = storage.get(model_name, model_id)
+                if new is None:
                     print('** no instance found **')
                     return
                 else:
-                    instance = all_instances[instance_key].__dict__
-                    instance.update(new_attributes_dict)
-                    all_instances.update()
-                    new = all_instances[instance_key]
+                    for name, value in new_attributes_dict.items():
+                        setattr(new, name, value)
                     new.save()
                     return
 
-            instance_key = "{}.{}".format(args[0], args[1])
-            all_instances = storage.all()
-            if instance_key not in all_instances:
+            new = storage.get(args[0], args[1])
+            if new is None:
                 print('** no instance found **')
             else:
                 attribute_name = args[2]
@@ -221,12 +220,8 @@ class HBNBCommand(cmd.Cmd):
                 match = re.match(pattern, attribute_value)
                 if not match:
                     return
-                instance = all_instances[instance_key].__dict__
-
                 attribute_value = attribute_value.replace('"', '')
-                instance.update({attribute_name: attribute_value})
-                all_instances.update()
-                new = all_instances[instance_key]
+                setattr(new, attribute_name, attribute_value)
                 new.save()
 
     def do_destroy(self, args):
@@ -242,19 +237,17 @@ class HBNBCommand(cmd.Cmd):
         elif len(args) < 2:
             print("** instance id missing **")
         else:
-            instance_key = "{}.{}".format(args[0], args[1])
-            all_instances = storage.all()
-            if instance_key not in all_instances:
+            instance = storage.get(args[0], args[1])
+            if instance is None:
                 print('** no instance found **')
             else:
-                all_instances.pop(instance_key)
+                storage.delete(instance)
                 storage.save()
 
     def do_count(self, my_model):
         """Retrieve the number of instances of a class
         USAGE:<class name>.count() / count <class name>
         EX: User.count() / count User"""
-        number_of_instances = 0
         if not my_model:
             print("** class name missing **")
             return
@@ -262,12 +255,141 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
             return
         else:
-            all_instances_keys = list(storage.all().keys())
-            for key in all_instances_keys:
-                if my_model in key:
-                    number_of_instances += 1
+            number_of_instances = storage.query(my_model).count()
         print(number_of_instances)
 
+    def spatial_args(self, args, kinds):
+        """Split the arguments of a spatial search command
+
+        Arguments:
+            args -- The class name followed by the numbers
+            kinds -- The kind of each number expected: 'latitude',
+                'longitude', 'distance' or 'count'
+
+        Returns:
+            The class name and the list of numbers, the count as an int,
+            None if they are invalid (the error is printed)
+        """
+        args = args.split()
+        if not args:
+            print("** class name missing **")
+            return None
+        if args[0] not in models_dict:
+            print("** class doesn't exist **")
+            return None
+        if len(args) < len(kinds) + 1:
+            print("** coordinates missing **")
+            return None
+        numbers = []
+        for kind, arg in zip(kinds, args[1:]):
+            try:
+                number = float(arg)
+            except ValueError:
+                number = math.nan
+            if kind in ('latitude', 'longitude'):
+                if not math.isfinite(number):
+                    print("** invalid coordinates **")
+                    return None
+                if abs(number) > (90 if kind == 'latitude' else 180):
+                    print(f"** {kind} out of range **")
+                    return None
+            elif not math.isfinite(number) or number < 0 or \
+                    kind == 'count' and not number.is_integer():
+                print(f"** invalid {kind} **")
+                return None
+            numbers.append(int(number) if kind == 'count' else number)
+        return args[0], numbers
+
+    def print_instances(self, instances):
+        """Print the string representation of instances, if any
+
+        Arguments:
+            instances -- A dictionary of instances
+        """
+        if instances:
+            print([str(val) for val in instances.values()])
+
+    def do_radius(self, args):
+        """Prints all the instances of a class within a distance (in km)
+        of a point, nearest first.
+        USAGE: radius <class name> <latitude> <longitude> <km>
+        Ex: $ radius Place 40.7128 -74.0060 5
+        """
+        parsed = self.spatial_args(args,
+                                   ('latitude', 'longitude', 'distance'))
+        if parsed:
+            model, (latitude, longitude, radius) = parsed
+            self.print_instances(
+                storage.within_radius(model, latitude, longitude, radius))
+
+    def do_bbox(self, args):
+        """Prints all the instances of a class inside a box.
+        USAGE: bbox <class name> <south> <west> <north> <east>
+        Ex: $ bbox Place 40.5 -74.3 40.9 -73.7
+        """
+        parsed = self.spatial_args(
+            args, ('latitude', 'longitude', 'latitude', 'longitude'))
+        if parsed:
+            model, (south, west, north, east) = parsed
+            self.print_instances(
+                storage.within_box(model, south, west, north, east))
+
+    def do_nearest(self, args):
+        """Prints the instances of a class nearest to a point, nearest
+        first.
+        USAGE: nearest <class name> <latitude> <longitude> <count>
+        Ex: $ nearest Place 40.7128 -74.0060 10
+        """
+        parsed = self.spatial_args(args, ('latitude', 'longitude', 'count'))
+        if parsed:
+            model, (latitude, longitude, count) = parsed
+            self.print_instances(
+                storage.nearest(model, latitude, longitude, count))
+
+    def do_search(self, args):
+        """Prints the instances of a class matching a text query, most
+        relevant first. Words starting with - must not appear, and OR
+        separates alternatives.
+        USAGE: search <class name> <words>
+        Ex: $ search Place quiet garden -noisy OR beach
+        """
+        args = args.split(maxsplit=1)
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in models_dict:
+            print("** class doesn't exist **")
+        elif len(args) < 2:
+            print("** query missing **")
+        else:
+            self.print_instances(storage.search(args[0], args[1]))
+
+    def do_begin(self, args):
+        """Start a transaction, saves are deferred until commit.
+        USAGE: begin
+        """
+        if storage.in_batch:
+            print("** transaction already in progress **")
+        else:
+            storage.begin()
+
+    def do_commit(self, args):
+        """Save all the changes made since begin at once.
+        USAGE: commit
+        """
+        if not storage.in_batch:
+            print("** no transaction in progress **")
+        else:
+            storage.commit()
+
+    def do_rollback(self, args):
+        """Discard all the changes made since begin.
+        USAGE: rollback
+        """
+        if not storage.in_batch:
+            print("** no transaction in progress **")
+        else:
+            storage.rollback()
+
 
 if __name__ == '__main__':
     HBNBCommand().cmdloop()
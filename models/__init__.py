@@ -1,7 +1,24 @@
 #!/usr/bin/python3
 """Initialize the FileStorage instance"""
-
+from os import getenv
 from models.engine.file_storage import FileStorage
 
-storage = FileStorage()
+durability = getenv('HBNB_STORAGE_DURABILITY', 'always')
+write_behind = getenv('HBNB_STORAGE_WRITE_BEHIND')
+storage = FileStorage(
+    journal=getenv('HBNB_STORAGE_JOURNAL') == '1',
+    sharded=getenv('HBNB_STORAGE_SHARDED') == '1',
+    lazy=getenv('HBNB_STORAGE_LAZY') == '1',
+    persist_text=getenv('HBNB_STORAGE_PERSIST_TEXT') == '1',
+    durability=int(durability) if durability.isdigit() else durability,
+    write_behind=int(write_behind) if write_behind else None,
+    write_behind_objects=int(getenv('HBNB_STORAGE_WRITE_BEHIND_OBJECTS',
+                                    '100')),
+    shared=getenv('HBNB_STORAGE_SHARED') == '1',
+    compact=getenv('HBNB_STORAGE_COMPACT') == '1',
+    reload_workers=int(getenv('HBNB_STORAGE_RELOAD_WORKERS', '0')),
+    binary=getenv('HBNB_STORAGE_BINARY') == '1',
+    string_table=getenv('HBNB_STORAGE_STRING_TABLE') == '1',
+    encode_cache=getenv('HBNB_STORAGE_ENCODE_CACHE') != '0'
+    )
 storage.reload()
@@ -10,4 +10,4 @@ class Amenity(BaseModel):
         BaseModel -- Inherts BaseModel's attributes and methods
     """
 
-    name = ''
+    name: str = ''
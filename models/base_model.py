@@ -1,16 +1,212 @@
 #!/usr/bin/python3
 """Base class for all models"""
-import uuid
 import datetime
+from os import getenv
 import models
+from models import ids
+from models.codec import compile_codecs, from_epoch, to_epoch
 
+# Keep the declared attributes of the models in slots instead of a
+#   __dict__, see ModelType
+COMPACT = getenv('HBNB_COMPACT_MODELS') == '1'
+# Keep the timestamps as integer microseconds since the epoch instead
+#   of datetimes, and write them so, see _timestamp()
+EPOCH = getenv('HBNB_STORAGE_TIMESTAMPS') == 'epoch'
+# The generator of the ids of the new objects, see models.ids
+NEW_ID = ids.generator(getenv('HBNB_MODEL_IDS', 'uuid4'))
 
-class BaseModel():
+# The default of an attribute declared without one
+NO_DEFAULT = object()
+
+
+class Timestamp(property):
+    """The property of a timestamp attribute, see _timestamp()"""
+
+    def __init__(self, getter, setter, deleter, epoch):
+        """Initialize the property
+
+        Arguments:
+            getter, setter, deleter -- Its functions
+            epoch -- The function reading the attribute of an instance
+                as microseconds since the epoch, see codec.to_epoch()
+        """
+        super().__init__(getter, setter, deleter)
+        self.epoch = epoch
+
+
+def _timestamp(name, slot=None):
+    """Build a property for a timestamp attribute
+
+    The attribute stays in the instance's __dict__, or its slot, where
+    it may hold the ISO string or the number of microseconds since the
+    epoch loaded from a file. It's always read as a datetime.
+
+    A datetime is kept once read, or set. With the epoch timestamps
+    (HBNB_STORAGE_TIMESTAMPS=epoch) a number is kept instead, it takes
+    less memory and is written as it is. The datetime of a number is
+    then built when the attribute is read, see codec.from_epoch().
+
+    Arguments:
+        name -- The name of the attribute
+
+    Keyword Arguments:
+        slot -- The member descriptor of the attribute's slot in a
+            compact model (default: {None})
+
+    Returns:
+        The Timestamp property getting and setting the attribute
+    """
+
+    if slot is None:
+        def get(self):
+            try:
+                return self.__dict__[name]
+            except KeyError:
+                raise AttributeError(
+                    f"'{type(self).__name__}' object has no attribute"
+                    f" '{name}'") from None
+
+        def put(self, value):
+            self.__dict__[name] = value
+
+        def drop(self):
+            del self.__dict__[name]
+    else:
+        get, put, drop = slot.__get__, slot.__set__, slot.__delete__
+
+    if EPOCH:
+        def getter(self):
+            value = get(self)
+            if type(value) is int:
+                return from_epoch(value)
+            if type(value) is str:
+                value = datetime.datetime.fromisoformat(value)
+                put(self, to_epoch(value))
+            return value
+
+        def setter(self, value):
+            put(self, to_epoch(value)
+                if type(value) is datetime.datetime else value)
+    else:
+        def getter(self):
+            value = get(self)
+            if type(value) is str:
+                value = datetime.datetime.fromisoformat(value)
+                put(self, value)
+            elif type(value) is int:
+                value = from_epoch(value)
+                put(self, value)
+            return value
+
+        setter = put
+
+    def epoch(self):
+        value = get(self)
+        return value if type(value) is int else to_epoch(value)
+
+    return Timestamp(getter, setter, drop, epoch)
+
+
+class ModelType(type):
+    """The type of the models, reading their schema from the annotated
+    class attributes
+
+    A model declares its attributes with their types and defaults,
+    `number_rooms: int = 0`. The `schema` of a class maps the name of
+    every declared attribute, the inherited ones included, to its
+    (type, default) pair, the default being NO_DEFAULT if it has none.
+    The attributes of type datetime are timestamps, see _timestamp().
+
+    Their conversions to and from dictionaries, to_dict() and create(),
+    are compiled for every class from its schema, see models.codec. A
+    class defining its own keeps it, for its subclasses too.
+
+    The attributes of an instance normally live in its __dict__ and the
+    defaults are class attributes. With compact models
+    (HBNB_COMPACT_MODELS=1) the declared attributes live in slots and
+    the instances have no __dict__: an unset attribute reads as its
+    default, and the attributes that weren't declared are kept in a
+    dictionary of their own, only created for the instances having one.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        """Create a model class
+
+        Arguments:
+            name -- The name of the class
+            bases -- Its base classes
+            namespace -- The attributes of its body
+
+        Returns:
+            The class
+        """
+        fields = {
+            field: (kind, namespace.get(field, NO_DEFAULT))
+            for field, kind in namespace.get('__annotations__', {}).items()}
+        if COMPACT:
+            for field in fields:
+                namespace.pop(field, None)
+            namespace['__slots__'] = tuple(fields)
+            if not any(isinstance(base, ModelType) for base in bases):
+                namespace['__slots__'] += ('_extra',)
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+
+        cls.schema = {}
+        cls._slots = {}
+        for base in reversed(cls.__mro__[1:]):
+            cls.schema.update(getattr(base, 'schema', {}))
+            cls._slots.update(getattr(base, '_slots', {}))
+        cls.schema.update(fields)
+        for field, (kind, _) in fields.items():
+            slot = None
+            if COMPACT:
+                slot = cls._slots[field] = cls.__dict__[field]
+            if kind is datetime.datetime:
+                setattr(cls, field, _timestamp(field, slot))
+
+        timestamps = [field for field, (kind, _) in cls.schema.items()
+                      if kind is datetime.datetime]
+        extra_slot = None
+        if COMPACT:
+            extra_slot = next(base.__dict__['_extra'] for base in cls.__mro__
+                              if '_extra' in base.__dict__)
+        codecs = compile_codecs(cls, timestamps, COMPACT, EPOCH, extra_slot)
+        for method, function in codecs.items():
+            inherited = getattr(cls, method, None)
+            if method in namespace:
+                continue
+            if inherited is None or getattr(inherited, 'compiled', False):
+                setattr(cls, method, function)
+        return cls
+
+    def default(cls, name):
+        """The value of an attribute on the instances not setting it
+
+        Arguments:
+            name -- The name of the attribute
+
+        Returns:
+            Its default, None if it has none
+        """
+        if name in cls.schema:
+            default = cls.schema[name][1]
+            return None if default is NO_DEFAULT else default
+        return getattr(cls, name, None)
+
+
+class BaseModel(metaclass=ModelType):
     """BaseModel
     desc:
         Contains all the necassary and shared attributes/methods.
     """
 
+    id: str
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    # The function making the id of a new object, a class may have its own
+    new_id = staticmethod(NEW_ID)
+
     def __init__(self, *args, **kwargs):
         """Constructor for the BaseModel class
         desc:
@@ -20,32 +216,13 @@ class BaseModel():
         if len(kwargs) != 0:
             self.create(**kwargs)
         else:
-            self.id = str(uuid.uuid4())
+            self.id = self.new_id()
             self.created_at = datetime.datetime.now()
             self.updated_at = self.created_at
             models.storage.new(self)
 
-    def create(self, **dictionary):
-        """Update the class Base and returns a instance with all
-            attributes already set
-        Args:
-            dictionary: Dictionary with all attributes of the object
-        Return:
-            An instance with all attributes already set
-        """
-        for key, value in dictionary.items():
-            if key == '__class__':
-                continue
-            elif key == 'created_at':
-                value = datetime.datetime.fromisoformat(
-                    dictionary['created_at']
-                    )
-            elif key == 'updated_at':
-                value = datetime.datetime.fromisoformat(
-                    dictionary['updated_at']
-                    )
-
-            setattr(self, key, value)
+    # create(), to_dict() and the _attributes() and _load() of the
+    #   compact models are compiled for every class, see ModelType
 
     def __str__(self):
         """Convert the instance to string.
@@ -54,25 +231,126 @@ class BaseModel():
             Human readable representation of the class.
         """
 
-        return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
+        # Parse the timestamps still held as ISO strings
+        attributes = dict(self._attributes())
+        for name in ('created_at', 'updated_at'):
+            if name in attributes:
+                attributes[name] = getattr(self, name)
+        return f"[{self.__class__.__name__}] ({self.id}) {attributes}"
+
+    if COMPACT:
+        def __getattr__(self, name):
+            """Read an attribute that isn't in a slot: an undeclared one,
+            or the default of an unset one"""
+            if name == '_extra':
+                return None
+            extra = self._extra
+            if extra is not None and name in extra:
+                return extra[name]
+            default = self.schema.get(name, (None, NO_DEFAULT))[1]
+            if default is NO_DEFAULT:
+                raise AttributeError(
+                    f"'{type(self).__name__}' object has no attribute"
+                    f" '{name}'")
+            return default
+
+        def _set(self, name, value):
+            """Set an attribute, in its slot if it's declared, without
+            telling the storage"""
+            try:
+                object.__setattr__(self, name, value)
+            except AttributeError:
+                if self._extra is None:
+                    object.__setattr__(self, '_extra', {})
+                self._extra[name] = value
+
+        def __setattr__(self, name, value):
+            """Set an attribute, see FileStorage.changed()"""
+            self._set(name, value)
+            models.storage.changed(self)
+
+        def __delattr__(self, name):
+            """Delete an attribute, from its slot if it's declared"""
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                extra = self._extra
+                if extra is None or name not in extra:
+                    raise
+                del extra[name]
+            models.storage.changed(self)
+
+        def __getstate__(self):
+            """The state of the instance to pickle"""
+            return self._attributes()
+
+        def __setstate__(self, state):
+            """Restore an unpickled instance"""
+            self._load(state)
+
+        def _restore(self, attributes):
+            """Replace all the attributes of the instance
+
+            Arguments:
+                attributes -- The attributes, see _attributes()
+            """
+            for slot in self._slots.values():
+                try:
+                    slot.__delete__(self)
+                except AttributeError:
+                    pass
+            object.__setattr__(self, '_extra', None)
+            self._load(attributes)
+    else:
+        # Set an attribute without telling the storage
+        _set = object.__setattr__
+
+        def __setattr__(self, name, value):
+            """Set an attribute, see FileStorage.changed()"""
+            object.__setattr__(self, name, value)
+            models.storage.changed(self)
+
+        def __delattr__(self, name):
+            """Delete an attribute, see FileStorage.changed()"""
+            object.__delattr__(self, name)
+            models.storage.changed(self)
+
+        def _attributes(self):
+            """The attributes of the instance
+
+            Returns:
+                Its __dict__, not to be changed
+            """
+            return self.__dict__
+
+        def _load(self, record):
+            """Set the attributes of a record without parsing them
+
+            Arguments:
+                record -- The dictionary representation of the instance
+            """
+            self.__dict__.update(record)
+            self.__dict__.pop('__class__', None)
+
+        def _restore(self, attributes):
+            """Replace all the attributes of the instance
+
+            Arguments:
+                attributes -- The attributes, see _attributes()
+            """
+            self.__dict__.clear()
+            self.__dict__.update(attributes)
 
     def save(self):
         """Update the updated_at instance attribute."""
 
         self.updated_at = datetime.datetime.now()
+        models.storage.touch(self)
         models.storage.save()
 
-    def to_dict(self):
-        """Convert the instance to its dictionary representation
+    async def asave(self):
+        """Update the updated_at instance attribute and save without
+        blocking the event loop, see FileStorage.asave()"""
 
-        Returns:
-            All the instance attributes in a dictionary
-        """
-
-        instance_to_dict = self.__dict__.copy()
-        instance_to_dict.update({
-            '__class__': self.__class__.__name__,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-            })
-        return instance_to_dict
+        self.updated_at = datetime.datetime.now()
+        await models.storage.asave(self)
@@ -6,5 +6,8 @@ from models.base_model import BaseModel
 class City(BaseModel):
     """Initialize City class"""
 
-    state_id = ''
-    name = ''
+    hash_indexes = ('state_id',)
+    interned = ('state_id',)
+
+    state_id: str = ''
+    name: str = ''
@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+"""Conversions of the models to and from their dictionaries, compiled
+for every model class from its schema
+
+The generic conversions loop over the attributes and test every name
+for a timestamp. The compiled ones know the declared attributes of
+their class: the timestamps are converted by name and, for the compact
+models, every slot is read and written directly.
+
+A timestamp is written as an ISO string, or as an integer number of
+microseconds since the epoch with the epoch timestamps. Both are read
+whichever is written.
+"""
+import datetime
+from functools import lru_cache
+
+# The start of the epoch timestamps. They count the microseconds of the
+#   naive datetimes the models hold, so they convert back exactly.
+EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+TO_DICT_DOC = """Convert the instance to its dictionary representation
+
+        Returns:
+            All the instance attributes in a dictionary
+        """
+
+CREATE_DOC = """Set the attributes of the instance from its dictionary
+        representation
+
+        Args:
+            dictionary: Dictionary with all attributes of the object
+        """
+
+ATTRIBUTES_DOC = """The attributes of the instance, as its __dict__ would
+        hold them
+
+        Returns:
+            A dictionary of the set attributes
+        """
+
+LOAD_DOC = """Set the attributes of a record without parsing them
+
+        Arguments:
+            record -- The dictionary representation of the instance
+        """
+
+
+def to_epoch(value):
+    """The microseconds since the epoch of a timestamp
+
+    Arguments:
+        value -- The timestamp: a datetime, its ISO string or already
+            a number of microseconds
+
+    Returns:
+        The number of microseconds
+
+    Raises:
+        TypeError: If the value isn't a timestamp
+        ValueError: If the string isn't in ISO format
+    """
+    if type(value) is int:
+        return value
+    if type(value) is str:
+        value = datetime.datetime.fromisoformat(value)
+    elif not isinstance(value, datetime.datetime):
+        raise TypeError(f'expected a timestamp, not {type(value).__name__}')
+    return (value - EPOCH) // _MICROSECOND
+
+
+@lru_cache(maxsize=4096)
+def from_epoch(value):
+    """The datetime of a number of microseconds since the epoch, the
+    latest ones are cached as a listing reads them again and again
+
+    Arguments:
+        value -- The number of microseconds
+
+    Returns:
+        The datetime
+    """
+    return EPOCH + value * _MICROSECOND
+
+
+def _add_extra(obj, extra, slot):
+    """Add attributes to the undeclared ones of a compact instance
+
+    Arguments:
+        obj -- The instance
+        extra -- The dictionary of the attributes
+        slot -- The member descriptor of its undeclared attributes
+    """
+    try:
+        current = slot.__get__(obj)
+    except AttributeError:
+        current = None
+    if current is None:
+        slot.__set__(obj, extra)
+    else:
+        current.update(extra)
+
+
+def _compile(cls, name, arguments, lines, namespace, doc):
+    """Compile a function of a class
+
+    Arguments:
+        cls -- The class
+        name -- The name of the function
+        arguments -- The source of its arguments
+        lines -- The lines of its body
+        namespace -- The global names it uses
+        doc -- Its docstring
+
+    Returns:
+        The function, marked as compiled
+    """
+    source = f'def {name}({arguments}):\n' + ''.join(
+        f'    {line}\n' for line in lines)
+    exec(source, namespace)
+    function = namespace[name]
+    function.__qualname__ = f'{cls.__qualname__}.{name}'
+    function.__doc__ = doc
+    function.compiled = True
+    return function
+
+
+def _read_slots(slots, namespace):
+    """The lines reading the set slots of an instance into `record`
+
+    Arguments:
+        slots -- The member descriptors of the slots, by attribute name
+        namespace -- Where to put the descriptors the lines use
+    """
+    lines = ['record = {}']
+    for number, (name, slot) in enumerate(slots.items()):
+        namespace[f'get_{number}'] = slot.__get__
+        lines += ['try:',
+                  f'    record[{name!r}] = get_{number}(self)',
+                  'except AttributeError:',
+                  '    pass']
+    lines += ['try:',
+              '    extra = get_extra(self)',
+              'except AttributeError:',
+              '    extra = None',
+              'if extra:',
+              '    record.update(extra)']
+    return lines
+
+
+def compile_codecs(cls, timestamps, compact, epoch, extra_slot=None):
+    """Compile the conversions of a model class
+
+    Arguments:
+        cls -- The class, its `_slots` are set for a compact model
+        timestamps -- The names of its timestamp attributes
+        compact -- Whether the class is a compact model
+        epoch -- Whether it holds and writes the epoch timestamps
+
+    Keyword Arguments:
+        extra_slot -- The member descriptor of the undeclared attributes
+            of a compact model (default: {None})
+
+    Returns:
+        A dictionary of the compiled methods by name: to_dict() and
+        create(), and for a compact model _attributes() and _load()
+    """
+    namespace = {
+        'datetime': datetime.datetime,
+        'fromisoformat': datetime.datetime.fromisoformat,
+        'from_epoch': from_epoch,
+        'to_epoch': to_epoch,
+        'MISSING': object()
+        }
+    methods = {}
+
+    # The timestamps loaded from a file and still unparsed are kept, in
+    #   the format written
+    convert = []
+    parse = []
+    for name in timestamps:
+        convert.append(f'value = record.get({name!r})')
+        parse += [f'value = dictionary.get({name!r}, MISSING)',
+                  'if value is not MISSING:']
+        if epoch:
+            convert += ['if type(value) is not int:',
+                        f'    record[{name!r}] = to_epoch(self.{name})']
+            parse += ['    if type(value) is not int:',
+                      f'        dictionary[{name!r}] = to_epoch(value)']
+        else:
+            convert += ['if type(value) is datetime:',
+                        f'    record[{name!r}] = value.isoformat()',
+                        'elif type(value) is not str:',
+                        f'    record[{name!r}] = self.{name}.isoformat()']
+            parse += [f'    dictionary[{name!r}] = fromisoformat(value)'
+                      ' if type(value) is not int else from_epoch(value)']
+
+    if not compact:
+        methods['to_dict'] = _compile(
+            cls, 'to_dict', 'self',
+            ['record = self.__dict__.copy()',
+             f'record["__class__"] = {cls.__name__!r}'] + convert +
+            ['return record'], namespace, TO_DICT_DOC)
+        methods['create'] = _compile(
+            cls, 'create', 'self, **dictionary',
+            ['dictionary.pop("__class__", None)'] + parse +
+            ['self.__dict__.update(dictionary)'], namespace, CREATE_DOC)
+        return methods
+
+    namespace['get_extra'] = extra_slot.__get__
+    namespace['add_extra'] = _add_extra
+    namespace['extra_slot'] = extra_slot
+    namespace['slots'] = cls._slots
+    methods['to_dict'] = _compile(
+        cls, 'to_dict', 'self',
+        _read_slots(cls._slots, namespace) +
+        [f'record["__class__"] = {cls.__name__!r}'] + convert +
+        ['return record'], namespace, TO_DICT_DOC)
+    methods['_attributes'] = _compile(
+        cls, '_attributes', 'self',
+        _read_slots(cls._slots, namespace) + ['return record'],
+        namespace, ATTRIBUTES_DOC)
+    load = ['found = 0']
+    for number, (name, slot) in enumerate(cls._slots.items()):
+        namespace[f'set_{number}'] = slot.__set__
+        load += [f'value = record.get({name!r}, MISSING)',
+                 'if value is not MISSING:',
+                 f'    set_{number}(self, value)',
+                 '    found += 1']
+    load += ['if len(record) > found + ("__class__" in record):',
+             '    extra = {name: value for name, value in record.items()',
+             '             if name not in slots and name != "__class__"}',
+             '    if extra:',
+             '        add_extra(self, extra, extra_slot)']
+    methods['_load'] = _compile(cls, '_load', 'self, record', load,
+                                namespace, LOAD_DOC)
+    methods['create'] = _compile(
+        cls, 'create', 'self, **dictionary',
+        parse + ['self._load(dictionary)'], namespace, CREATE_DOC)
+    return methods
@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+"""Binary copies of the snapshot files, reloaded faster than JSON
+
+A binary snapshot is written beside a JSON one (`file.json.pickle`).
+It starts with a header holding its format version, the number of
+objects and the checksum of the JSON snapshot it was written with, and
+goes on with the stored objects pickled (protocol 5) in batches. It's
+only read when the JSON snapshot still has that checksum, and being a
+pickle it must only be read from a trusted directory.
+
+A snapshot may hold a string table: every batch is then preceded by
+the list of the strings it adds to the table, and the strings of the
+table are written in the objects as their position in it. A string
+repeated by many objects, like a foreign key, is written once and all
+of them get the same, interned, string when it's read.
+"""
+import os
+import pickle
+import struct
+import zlib
+from sys import intern
+
+MAGIC = b'HBNB'
+VERSION = 1
+# The version of the snapshots holding a string table
+TABLE_VERSION = 2
+# The magic, the version, the number of objects, and the CRC-32 and
+#   size of the JSON snapshot
+HEADER = struct.Struct('<4sHQIQ')
+# The objects pickled at once, the pickler remembers every object of a
+#   batch
+BATCH_SIZE = 10000
+
+
+class CorruptSnapshot(ValueError):
+    """A binary snapshot whose objects can't be read"""
+
+
+class _TablePickler(pickle.Pickler):
+    """Pickle the strings of a string table as their position in it"""
+
+    def __init__(self, file):
+        """Initialize the pickler with an empty table
+
+        Arguments:
+            file -- The file, opened in binary mode
+        """
+        super().__init__(file, protocol=5)
+        self.table = {}
+
+    def persistent_id(self, obj):
+        """The position of a string in the table, None to pickle it"""
+        if type(obj) is str:
+            return self.table.get(obj)
+        return None
+
+
+class _TableUnpickler(pickle.Unpickler):
+    """Unpickle the strings of a string table from their position"""
+
+    def __init__(self, file, table):
+        """Initialize the unpickler
+
+        Arguments:
+            file -- The file, opened in binary mode
+            table -- The list of the strings of the table read so far
+        """
+        super().__init__(file)
+        self.table = table
+
+    def persistent_load(self, pid):
+        """The string at a position of the table"""
+        return self.table[pid]
+
+
+class Checksum():
+    """The CRC-32 and size of the bytes of a file"""
+
+    def __init__(self):
+        """Initialize the checksum of an empty file"""
+        self.crc = 0
+        self.size = 0
+
+    def update(self, data):
+        """Add some bytes to the checksum
+
+        Arguments:
+            data -- The bytes
+        """
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+
+    def pieces(self, pieces):
+        """Add pieces of text to the checksum as they pass through
+
+        Arguments:
+            pieces -- An iterable of strings, as written to the file
+
+        Returns:
+            An iterator over the same pieces
+        """
+        for piece in pieces:
+            self.update(piece.encode())
+            yield piece
+
+    @classmethod
+    def of_file(cls, file, chunk_size=1 << 20):
+        """The checksum of a file, read from its start
+
+        Arguments:
+            file -- The file, opened in binary mode
+
+        Keyword Arguments:
+            chunk_size -- The number of bytes read at once
+
+        Returns:
+            The Checksum, the file is back at its start
+        """
+        checksum = cls()
+        file.seek(0)
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            checksum.update(chunk)
+        file.seek(0)
+        return checksum
+
+
+def write_snapshot(file, items, count, checksum, strings=None):
+    """Write a binary snapshot
+
+    Arguments:
+        file -- The file, opened in binary mode
+        items -- An iterable of the (key, object) pairs
+        count -- The number of pairs
+        checksum -- The Checksum of the JSON snapshot
+
+    Keyword Arguments:
+        strings -- A function returning the strings of an object to put
+            in the string table, None to write no table (default: {None})
+    """
+    file.write(HEADER.pack(MAGIC, VERSION if strings is None else
+                           TABLE_VERSION, count, checksum.crc,
+                           checksum.size))
+    if strings is None:
+        pickler = pickle.Pickler(file, protocol=5)
+    else:
+        pickler = _TablePickler(file)
+
+    def dump(batch):
+        """Pickle a batch, after the strings it adds to the table"""
+        if strings is not None:
+            added = {}
+            for _, obj in batch:
+                for string in strings(obj):
+                    if string not in pickler.table:
+                        added[string] = None
+            pickler.dump(list(added))
+            pickler.clear_memo()
+            for string in added:
+                pickler.table[string] = len(pickler.table)
+        pickler.dump(batch)
+        pickler.clear_memo()
+
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == BATCH_SIZE:
+            dump(batch)
+            batch = []
+    dump(batch)
+
+
+def read_snapshot(file, json_file):
+    """Read a binary snapshot, if it was written with a JSON snapshot
+
+    Arguments:
+        file -- The binary snapshot, opened in binary mode
+        json_file -- The JSON snapshot, opened in binary mode, it's
+            left at its start
+
+    Returns:
+        An iterator over the (key, object) pairs, None if the binary
+        snapshot doesn't hold the JSON one. The iterator raises
+        CorruptSnapshot if the pickled objects turn out to be corrupt.
+    """
+    header = file.read(HEADER.size)
+    if len(header) != HEADER.size:
+        return None
+    magic, version, count, crc, size = HEADER.unpack(header)
+    json_size = json_file.seek(0, os.SEEK_END)
+    json_file.seek(0)
+    if magic != MAGIC or version not in (VERSION, TABLE_VERSION) or \
+            size != json_size:
+        return None
+    checksum = Checksum.of_file(json_file)
+    if (checksum.crc, checksum.size) != (crc, size):
+        return None
+    return _items(file, count, version == TABLE_VERSION)
+
+
+def _items(file, count, table):
+    """The pickled (key, object) pairs of a binary snapshot
+
+    Arguments:
+        file -- The binary snapshot, past its header
+        count -- The number of pairs it holds
+        table -- Whether it holds a string table
+
+    Raises:
+        CorruptSnapshot: If the pairs can't be unpickled
+    """
+    strings = []
+    read = 0
+    while True:
+        try:
+            # Every batch is pickled with a memo of its own, while an
+            #   unpickler goes on numbering the objects of the last one
+            if table:
+                strings.extend(map(intern, pickle.Unpickler(file).load()))
+                batch = _TableUnpickler(file, strings).load()
+            else:
+                batch = pickle.Unpickler(file).load()
+        except Exception as error:
+            raise CorruptSnapshot(
+                f'corrupt binary snapshot: {error}') from error
+        if type(batch) is not list:
+            raise CorruptSnapshot('corrupt binary snapshot')
+        read += len(batch)
+        yield from batch
+        if len(batch) < BATCH_SIZE:
+            break
+    if read != count:
+        raise CorruptSnapshot('corrupt binary snapshot')
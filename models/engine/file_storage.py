@@ -1,6 +1,21 @@
 #!/usr/bin/python3
 """File storage class"""
+import asyncio
+import atexit
 import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on this system, the files are still checked
+    #   for changes before every write
+    fcntl = None
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -8,6 +23,17 @@ from models.review import Review
 from models.place import Place
 from models.city import City
 from models.amenity import Amenity
+from models.engine.lazy_objects import LazyObjects
+from itertools import islice
+from models.engine.indexes import HashIndex, KeyIndex, SortedIndex
+from models.engine.spatial_index import SpatialIndex
+from models.engine.text_index import TextIndex
+from models.engine.query import Query
+from models.engine.rwlock import RWLock
+from models.engine.json_stream import iter_records, encode_entry, \
+    snapshot_chunks, split_records, read_records
+from models.engine.binary_snapshot import Checksum, CorruptSnapshot, \
+    read_snapshot, write_snapshot
 
 # All models' name and class
 models_dict = {
@@ -21,20 +47,722 @@ models_dict = {
     }
 
 
+# The smallest snapshot file reloaded by several processes
+PARALLEL_RELOAD_SIZE = 1 << 22
+
+
+def _load_range(path, start, end, last):
+    """Build the objects of a byte range of a snapshot file, in a
+    process of the reload
+
+    Arguments:
+        path -- The path of the snapshot file
+        start, end -- The range, see split_records()
+        last -- Whether the range ends the file
+
+    Returns:
+        The list of the (key, instance) pairs of the range, in order
+    """
+    objs = []
+    for key, record in read_records(path, start, end, last).items():
+        cls = models_dict[record['__class__']]
+        objs.append((key, cls(**_intern(cls, record))))
+    return objs
+
+
+def _load_ranges(connection, path, ranges, size):
+    """Send the objects of some byte ranges of a snapshot file, one
+    list per range, or the error building them, in a process of the
+    reload
+
+    Arguments:
+        connection -- The sending end of a pipe to the storage
+        path -- The path of the snapshot file
+        ranges -- The ranges, see split_records()
+        size -- The size of the file
+    """
+    try:
+        for start, end in ranges:
+            connection.send(_load_range(path, start, end, end == size))
+    except Exception as error:
+        connection.send(error)
+    finally:
+        connection.close()
+
+
+def _cut_torn_line(path):
+    """Cut a journal file after its last complete line
+
+    A save interrupted while appending leaves a line without its
+    newline, which reload() skips. The next line appended would
+    follow it on the same line, so it's cut first.
+
+    Arguments:
+        path -- The path of the journal file
+    """
+    try:
+        with open(path, 'r+b') as journal_file:
+            end = journal_file.seek(0, os.SEEK_END)
+            if not end:
+                return
+            journal_file.seek(end - 1)
+            if journal_file.read(1) == b'\n':
+                return
+            start = end
+            while start:
+                start = max(0, start - 4096)
+                journal_file.seek(start)
+                newline = journal_file.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    journal_file.truncate(start + newline + 1)
+                    return
+            journal_file.truncate(0)
+    except FileNotFoundError:
+        pass
+
+
+def _indexed_attributes(cls):
+    """The names of the indexes of a class, as __class_indexes() keys
+    them: an attribute name, or a tuple of names for a spatial or text
+    index, and 'id' for its KeyIndex
+
+    Arguments:
+        cls -- The class, None for an unknown one
+
+    Returns:
+        A list of the names
+    """
+    if cls is None:
+        return []
+    names = list(getattr(cls, 'hash_indexes', ())) + \
+        list(getattr(cls, 'sorted_indexes', ()))
+    for kind in ('spatial_index', 'text_indexes'):
+        if getattr(cls, kind, None):
+            names.append(tuple(getattr(cls, kind)))
+    names.append('id')
+    return names
+
+
+def _intern(cls, record):
+    """Intern the strings of the attributes a model lists in `interned`
+
+    A model lists the attributes whose values many objects repeat, e.g.
+    `interned = ('place_id', 'user_id')`. The objects read from a file
+    then share one string per value, instead of holding a copy each.
+
+    Arguments:
+        cls -- The class of the object
+        record -- The dictionary representation of the object, changed
+
+    Returns:
+        The record
+    """
+    for name in getattr(cls, 'interned', ()):
+        value = record.get(name)
+        if type(value) is str:
+            record[name] = sys.intern(value)
+    return record
+
+
+def _intern_object(obj):
+    """Intern the strings of the attributes of an object, see _intern()
+
+    Arguments:
+        obj -- The object, changed
+    """
+    names = getattr(type(obj), 'interned', ())
+    if names:
+        attributes = obj._attributes()
+        for name in names:
+            value = attributes.get(name)
+            if type(value) is str:
+                obj._set(name, sys.intern(value))
+
+
+def _interned_strings(value):
+    """The strings of the interned attributes of an object, see _intern()
+
+    Arguments:
+        value -- The object or its raw record
+
+    Returns:
+        An iterator over the strings
+    """
+    if type(value) is dict:
+        cls, attributes = models_dict[value['__class__']], value
+    else:
+        cls, attributes = type(value), value._attributes()
+    for name in getattr(cls, 'interned', ()):
+        string = attributes.get(name)
+        if type(string) is str:
+            yield string
+
+
+def _build(key, record):
+    """Build an instance from its raw record without parsing it
+
+    Arguments:
+        key -- The key of the object
+        record -- The dictionary representation of the object
+
+    Returns:
+        The instance, its timestamps are parsed when first read
+    """
+    cls = models_dict[record['__class__']]
+    obj = cls.__new__(cls)
+    obj._load(record)
+    return obj
+
+
+def _sync_directory(path):
+    """Sync the directory of a file, so the entry of a renamed or new
+    file is on the disk too
+
+    Arguments:
+        path -- The path of the file
+    """
+    try:
+        directory = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    except OSError:
+        # Directories can't be opened on every system
+        return
+    try:
+        os.fsync(directory)
+    except OSError:
+        pass
+    finally:
+        os.close(directory)
+
+
+def _stat_signature(stat):
+    """What tells a version of a file from another: its inode, size and
+    modification time, None if it doesn't exist
+
+    Arguments:
+        stat -- The os.stat_result of the file, or None
+    """
+    if stat is None:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _signature(path):
+    """The signature of a file, see _stat_signature()
+
+    Arguments:
+        path -- The path of the file
+    """
+    try:
+        return _stat_signature(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def _size(path):
+    """The size of a file, 0 if it doesn't exist
+
+    Arguments:
+        path -- The path of the file
+    """
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
 class FileStorage():
     """Serialize instances to a JSON file and deserialize JSON file
         to instances
+
+    In journal mode every new, changed or destroyed object is appended
+    as one line to a journal file beside the snapshot (`file.json`),
+    instead of rewriting the whole snapshot on each save. `reload()`
+    replays the journal on top of the last snapshot, and the journal is
+    folded back into the snapshot by `compact()` once it grows larger
+    than the snapshot itself.
+
+    In sharded mode every class is kept in its own snapshot (and
+    journal) file, e.g. `file.Place.json`. Only the shards holding a
+    dirty object are written by a save, and `reload()` defers reading
+    a shard until its class is first accessed.
+
+    In lazy mode the objects dictionary is a `LazyObjects`, `reload()`
+    keeps the raw records and an instance is only built the first time
+    it's accessed.
+
+    With `reload_workers`, a snapshot file larger than
+    PARALLEL_RELOAD_SIZE is split into byte ranges of whole records,
+    decoded and built into objects by that many forked processes.
+    The objects are then stored in the order of the file. It needs the
+    `fork` start method, a spawned process would reload the storage
+    as it imports the models.
+
+    With `binary`, a binary copy of every snapshot is written beside it
+    (`file.json.pickle`, see binary_snapshot), holding the objects
+    themselves. `reload()` reads it instead of decoding the JSON and
+    parsing the timestamps again, as long as its checksum says it was
+    written with the JSON snapshot, and falls back to the JSON one
+    otherwise. With `string_table` it writes the values of the interned
+    attributes (see below) once, in a table.
+
+    The values of the attributes a model lists in `interned`, the
+    foreign keys many objects repeat, are interned when the objects
+    are reloaded, stored or touched: all the objects holding a value
+    share one string.
+
+    The keys of every class are indexed, so listing the objects of a
+    class costs the size of the class and counting them is constant.
+    The attributes a model lists in its `hash_indexes` are indexed too,
+    so `find()` costs the number of matches, and the attributes listed
+    in `sorted_indexes` are kept in order for the range queries of
+    `range()`. The keys are kept in the order of their ids too, the
+    order the time-ordered ids were made in (see models.ids). `query()`
+    composes filters, an order and a limit over the same indexes. A
+    model's `spatial_index` coordinates are kept in a grid for
+    `within_radius()`, `within_box()` and `nearest()`. The words
+    of a model's `text_indexes` attributes are kept in an inverted index
+    for the boolean queries of `search()` and the BM25 ranking of
+    `rank()`. With `persist_text` the posting lists are written beside
+    each snapshot (`file.json.text`) and reloaded with it, instead of
+    tokenizing every object again on each start.
+
+    The keys added, touched or deleted since the last save are tracked
+    as dirty, and with `encode_cache` the encoded record of every clean
+    object is cached, so a save only re-encodes the dirty objects. The
+    cache holds the text of every snapshot, without it a save encodes
+    every object again but only ever holds one record. The records are
+    streamed to the file one at a time, the text of the whole snapshot
+    is never built. With `compact` the snapshots are written without
+    indentation, one object per line.
+
+    Every file is replaced atomically: it's written to a temporary file
+    renamed over the old one, so a crash never leaves a truncated
+    snapshot. The `durability` says when the written files are synced
+    to the disk: on every save (`'always'`), at most every N
+    milliseconds in the background (N), or when the system decides
+    (`'never'`). Saves requested while another thread is flushing are
+    merged into the next single flush.
+
+    In write-behind mode `save()` returns at once and a background
+    thread flushes, `write_behind` milliseconds after the first pending
+    save or as soon as `write_behind_objects` objects are dirty.
+    `flush()` writes the pending saves at once, the console calls it
+    on quit and it's called at the interpreter exit.
+
+    The storage is safe to share between threads: many threads can read
+    at once, under the read side of `lock`, while the changes and saves
+    take its write side. A read first loads the shards and rebuilds the
+    indexes it needs under the write side, so reads never change the
+    storage. `all()` is the live dictionary, `snapshot()` is a copy to
+    iterate while other threads change the objects.
+
+    In shared mode several processes can use the same files. Every
+    snapshot file has a lock file beside it (`file.json.lock`), locked
+    while the snapshot is read or written, that counts the writes to
+    it. Before writing a file the storage checks whether another
+    process wrote it since this one last did (its generation, size or
+    modification time changed), and merges only the changed records:
+    the journal lines appended since, or the records of the rewritten
+    snapshot that differ from the stored ones. The objects changed in
+    this process since the last save win. `refresh()` merges them at
+    any time.
+
+    `asave()` and `areload()` are the coroutines of an asyncio service:
+    the encoding and the disk I/O run in the `executor` (a thread of
+    the storage by default) while the event loop goes on, and the
+    saves awaited before the pending one starts are merged into it.
+
+    Between `begin()` and `commit()` (or inside `with storage.batch():`)
+    every save is deferred and flushed once at the end, `rollback()`
+    restores the objects to their state at `begin()`. The background
+    thread and `flush()` defer to the end of the batch too, they would
+    write its uncommitted changes.
     """
     __file_path = "file.json"
     __objects = {}
 
-    def all(self):
+    def __init__(self, journal=False, sharded=False, lazy=False,
+                 persist_text=False, durability='always', write_behind=None,
+                 write_behind_objects=100, shared=False, compact=False,
+                 reload_workers=0, binary=False, string_table=False,
+                 encode_cache=True):
+        """Initialize the storage engine
+
+        Keyword Arguments:
+            journal -- Append changes to a journal file instead of
+                rewriting the whole snapshot on every save
+                (default: {False})
+            sharded -- Keep every class in its own file (default: {False})
+            lazy -- Build the reloaded objects on first access
+                (default: {False})
+            persist_text -- Keep the text indexes in a file beside each
+                snapshot (default: {False})
+            durability -- When to sync the written files to the disk:
+                'always', 'never' or every N milliseconds
+                (default: {'always'})
+            write_behind -- Flush the saves in the background, this many
+                milliseconds after the first one, None to flush on every
+                save (default: {None})
+            write_behind_objects -- Flush in the background as soon as
+                this many objects are dirty (default: {100})
+            shared -- Lock the files and merge the changes of the other
+                processes using them before every write
+                (default: {False})
+            compact -- Write the snapshots without indentation, one
+                object per line (default: {False})
+            reload_workers -- The number of processes reloading a large
+                snapshot, 0 to reload it in this one (default: {0})
+            binary -- Write a binary copy beside every snapshot and
+                reload it instead when it's valid (default: {False})
+            string_table -- Write the interned strings once, in a
+                string table, in the binary copies (default: {False})
+            encode_cache -- Keep the encoded records of the clean
+                objects for the next saves (default: {True})
+        """
+        if durability not in ('always', 'never') and \
+                (type(durability) is not int or durability < 0):
+            raise ValueError("durability must be 'always', 'never' or a"
+                             " number of milliseconds")
+        self.durability = durability
+        self.write_behind = write_behind
+        self.write_behind_objects = write_behind_objects
+        self.journal = journal
+        self.sharded = sharded
+        self.persist_text = persist_text
+        self.shared = shared
+        self.compact_format = compact
+        self.reload_workers = reload_workers
+        self.binary = binary
+        self.string_table = string_table
+        self.encode_cache = encode_cache
+        if lazy:
+            FileStorage.__objects = LazyObjects(_build)
+        self.__dirty = {}
+        self.__changes = {}
+        self.__encoded = {}
+        self.__tracked = self.__objects
+        self.__journal_records = {}
+        self.__unloaded = set()
+        self.__classes = {}
+        self.__attribute_indexes = {}
+        self.__text_indexes = {}
+        self.__indexed = None
+        self.__changed = set()
+        self.__persisted_text = {}
+        self.__persisted_into = None
+        self.__batch_depth = 0
+        self.__batch_snapshot = None
+        self.__save_deferred = False
+        self.__flush_deferred = False
+        self.__flush_lock = threading.Condition()
+        self.__flushing = False
+        self.__requested = 0
+        self.__flushed = 0
+        self.__unsynced = set()
+        self.__sync_timer = None
+        self.__synced_at = time.monotonic()
+        self.lock = RWLock()
+        self.__flusher = None
+        self.__flusher_busy = False
+        self.__flush_pending = False
+        self.__flush_now = False
+        self.__pending_since = 0.0
+        self.__seen = {}
+        self.__held = {}
+        self.executor = None
+        # The pending save of asave(): its loop, objects and future
+        self.__next_save = None
+        self.__next_save_lock = threading.Lock()
+
+    @property
+    def journal_path(self):
+        """The path of the journal file kept beside the snapshot"""
+        return self.__file_path + '.journal'
+
+    def shard_path(self, cls_name):
+        """The snapshot file holding the objects of a class
+
+        Arguments:
+            cls_name -- The name of the class
+
+        Returns:
+            The path of the class shard in sharded mode, otherwise
+            the path of the single snapshot file
+        """
+        if not self.sharded:
+            return self.__file_path
+        root, ext = os.path.splitext(self.__file_path)
+        return f'{root}.{cls_name}{ext}'
+
+    def text_index_path(self, cls_name):
+        """The file holding the persisted text index of a class
+
+        Arguments:
+            cls_name -- The name of the class
+
+        Returns:
+            The path of the file, beside the snapshot of the class
+        """
+        return self.shard_path(cls_name) + '.text'
+
+    @property
+    def dirty(self):
+        """The keys added, changed or deleted since the last save"""
+        with self.lock.write():
+            self.__sync()
+            return frozenset(self.__dirty)
+
+    def all(self, cls=None):
         """All stored objects
 
+        Keyword Arguments:
+            cls -- Only return the objects of this class, given as a
+                class or its name (default: {None})
+
+        Returns:
+            The dictionary objects, the live one without a class,
+            otherwise a new dictionary
+        """
+        if cls is None:
+            self.__ready(index=False)
+            return self.__objects
+
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__ready(cls_name)
+        with self.lock.read():
+            keys = self.__index().get(cls_name, ())
+            if isinstance(self.__objects, LazyObjects):
+                return self.__objects.subset(keys)
+            return {key: self.__objects[key] for key in keys}
+
+    def snapshot(self, cls=None):
+        """A copy of the stored objects, to iterate while other threads
+            change them
+
+        Keyword Arguments:
+            cls -- Only return the objects of this class, given as a
+                class or its name (default: {None})
+
+        Returns:
+            A new dictionary of the objects, as they were all at once
+        """
+        if cls is not None:
+            return self.all(cls)
+        self.__ready(index=False)
+        with self.lock.read():
+            if isinstance(self.__objects, LazyObjects):
+                return self.__objects.subset(self.__objects)
+            return self.__objects.copy()
+
+    def count(self, cls=None):
+        """The number of stored objects
+
+        Keyword Arguments:
+            cls -- Only count the objects of this class, given as a
+                class or its name (default: {None})
+
+        Returns:
+            The number of objects
+        """
+        if cls is None:
+            self.__ready(index=False)
+            return len(self.__objects)
+
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__ready(cls_name)
+        with self.lock.read():
+            return len(self.__index().get(cls_name, ()))
+
+    def get(self, cls, id):
+        """The stored object of a class with an id
+
+        Arguments:
+            cls -- The class of the object, or its name
+            id -- The id of the object
+
         Returns:
-            The dictionary objects
+            The object, None if there isn't any
         """
-        return self.__objects
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__ready(cls_name, index=False)
+        with self.lock.read():
+            return self.__objects.get(f'{cls_name}.{id}')
+
+    def indexes(self, cls, *attributes):
+        """The attribute indexes of a class, to plan queries on
+
+        Only the asked indexes are built, the others are left to build
+        when a read first needs them.
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            attributes -- The indexed attribute names (a tuple of names
+                for a spatial or text index) to return, all of them if
+                none is given
+
+        Returns:
+            A dictionary of the indexed attribute names to their index,
+            without the names that aren't indexed
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__ready(cls_name, attributes=attributes or True)
+        with self.lock.read():
+            indexes = self.__class_indexes(cls_name, attributes or None)
+            return {name: index for name, index in indexes.items()
+                    if not attributes or name in attributes}
+
+    def query(self, cls):
+        """A query of the stored objects of a class, see Query
+
+        Arguments:
+            cls -- The class of the objects, or its name
+
+        Returns:
+            The query of every object of the class, to refine with
+            filter(), order_by() and limit()
+        """
+        return Query(self, cls)
+
+    def find(self, cls, **criteria):
+        """The stored objects of a class having some attribute values
+
+        The most selective indexed attribute narrows the candidates,
+        the other criteria are checked on each of them. Without an
+        indexed attribute every object of the class is checked.
+
+        Arguments:
+            cls -- The class of the objects, or its name
+
+        Keyword Arguments:
+            The attribute names and the values to look for
+
+        Returns:
+            A dictionary of the matching objects
+        """
+        return self.query(cls).filter(**{
+            f'{attribute}__eq': value
+            for attribute, value in criteria.items()}).all()
+
+    def range(self, cls, attribute, low=None, high=None, include_low=True,
+              include_high=True, reverse=False, limit=None, offset=0):
+        """The stored objects of a class whose numeric attribute is in
+            a range, in the order of the attribute
+
+        Without a sorted index on the attribute, the objects of the
+        class are sorted first.
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            attribute -- The name of the numeric attribute
+
+        Keyword Arguments:
+            low -- The lowest value, unbounded if None (default: {None})
+            high -- The highest value, unbounded if None (default: {None})
+            include_low -- Whether low itself is in the range
+                (default: {True})
+            include_high -- Whether high itself is in the range
+                (default: {True})
+            reverse -- Start from the highest value (default: {False})
+            limit -- The most objects to return, all if None
+                (default: {None})
+            offset -- The number of matching objects to skip
+                (default: {0})
+
+        Returns:
+            A dictionary of the matching objects, in order
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__ready(cls_name, attributes=(attribute,))
+        with self.lock.read():
+            index = self.__class_indexes(cls_name, (attribute,)).get(
+                attribute)
+            if not isinstance(index, SortedIndex):
+                index = SortedIndex(models_dict.get(cls_name), attribute)
+                index.build((key, self.__peek(key))
+                            for key in self.__index().get(cls_name, {}))
+
+            keys = index.between(low, high, include_low, include_high,
+                                 reverse)
+            stop = None if limit is None else offset + limit
+            return {key: self.__objects[key]
+                    for key in list(islice(keys, offset, stop))}
+
+    def search(self, cls, query, limit=None):
+        """The stored objects of a class matching a boolean text query,
+            most relevant first
+
+        The words of the query must all appear in the `text_indexes`
+        attributes of an object, a word starting with `-` must not, and
+        `OR` separates alternatives: `pool garden -noisy OR beach`.
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            query -- The query
+
+        Keyword Arguments:
+            limit -- The most objects to return, all if None
+                (default: {None})
+
+        Returns:
+            A dictionary of the matching objects, ordered by their BM25
+            score, empty if the class has no text index
+        """
+        self.__ready(cls, attributes=self.__kind(cls, 'text_indexes'))
+        with self.lock.read():
+            index = self.__text_index(cls)
+            if index is None:
+                return {}
+            return {key: self.__objects[key]
+                    for key, _ in index.search(query, limit)}
+
+    def rank(self, cls, query, k=10):
+        """The stored objects of a class best matching some words, by
+            their BM25 score
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            query -- The words to look for, any of them matches
+
+        Keyword Arguments:
+            k -- The number of objects (default: {10})
+
+        Returns:
+            A dictionary of up to k objects, best first, empty if the
+            class has no text index
+        """
+        self.__ready(cls, attributes=self.__kind(cls, 'text_indexes'))
+        with self.lock.read():
+            index = self.__text_index(cls)
+            if index is None:
+                return {}
+            return {key: self.__objects[key]
+                    for key, _ in index.rank(query, k)}
+
+    def __text_index(self, cls):
+        """The text index of a class, None if it has none
+
+        Arguments:
+            cls -- The class of the objects, or its name
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        names = self.__kind(cls_name, 'text_indexes')
+        return self.__class_indexes(cls_name, names).get(names[0])
+
+    def __kind(self, cls, kind):
+        """The name of the spatial or text index of a class, see
+        _indexed_attributes()
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            kind -- 'spatial_index' or 'text_indexes'
+
+        Returns:
+            A tuple of the name of the index, empty if the class has
+            no such index
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        attributes = getattr(models_dict.get(cls_name), kind, None)
+        return (tuple(attributes),) if attributes else ((),)
 
     def new(self, obj):
         """Save a new object
@@ -42,28 +770,1381 @@ class FileStorage():
         Arguments:
             obj -- The specified object to be saved
         """
-        self.__objects.update({f'{obj.__class__.__name__}.{obj.id}': obj})
+        with self.lock.write():
+            self.__sync()
+            key = f'{obj.__class__.__name__}.{obj.id}'
+            self.__load(obj.__class__.__name__)
+            self.__objects.update({key: obj})
+            self.__touched(key, obj)
+
+    def touch(self, obj):
+        """Record that a stored object has changed since the last save
+
+        Arguments:
+            obj -- The changed object, ignored if it isn't stored
+        """
+        with self.lock.write():
+            self.__sync()
+            key = f'{obj.__class__.__name__}.{obj.id}'
+            self.__load(obj.__class__.__name__)
+            if self.__objects.get(key) is obj:
+                self.__touched(key, obj)
+
+    def changed(self, obj):
+        """Record that an attribute of an object was just set, see
+        BaseModel.__setattr__()
+
+        It takes no lock, the next operation of the storage marks the
+        object changed if it's stored, like touch() would.
+
+        Arguments:
+            obj -- The object
+        """
+        self.__changes[id(obj)] = obj
+
+    def __touched(self, key, obj):
+        """Mark a stored object changed, see touch()
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object
+        """
+        _intern_object(obj)
+        self.__indexed_add(key, obj)
+        self.__dirty[key] = obj
+
+    def delete(self, obj=None):
+        """Delete an object from the stored objects
+
+        Keyword Arguments:
+            obj -- The object to be deleted (default: {None})
+        """
+        if obj is None:
+            return
+        with self.lock.write():
+            self.__sync()
+            key = f'{obj.__class__.__name__}.{obj.id}'
+            self.__load(obj.__class__.__name__)
+            if self.__remove(key) is not None:
+                self.__dirty[key] = None
 
     def save(self):
         """Save all objects to a file
+
+        In journal mode only the objects changed since the last save
+        are appended to the journal file, in sharded mode only the
+        shards holding a changed object are written.
+
+        A save requested while another thread is flushing waits for it,
+        then a single flush writes the changes of every waiting save.
+        In write-behind mode the save is left to the background thread.
+        """
+        if self.__batch_depth:
+            self.__save_deferred = True
+            return
+        if self.write_behind is not None:
+            self.__request_flush()
+            return
+        self.__group_commit()
+
+    def flush(self, wait=True):
+        """Write the saves pending in write-behind mode now, or at the
+        end of the current batch
+
+        Keyword Arguments:
+            wait -- Return once they are written and synced to the disk,
+                otherwise only wake the background thread
+                (default: {True})
         """
-        obj_to_json = {}
-        for key, value in self.all().items():
-            obj_to_json[key] = value.to_dict()
+        with self.__flush_lock:
+            pending = self.__flush_pending
+            if not wait:
+                self.__flush_now = pending
+                self.__flush_lock.notify_all()
+                return
+            self.__flush_pending = False
+            while not pending and (self.__flusher_busy or self.__flushing):
+                self.__flush_lock.wait()
+        if pending:
+            self.__group_commit()
+        if self.durability not in ('always', 'never'):
+            self.sync_files()
 
-        with open(self.__file_path, 'w') as obj_to_json_file:
-            json.dump(obj_to_json, obj_to_json_file, indent=3)
+    async def asave(self, *objs):
+        """Save all objects without blocking the event loop
 
-    def reload(self):
-        """Reload all objects from a file.
+        The save runs in the executor. Saves awaited while it hasn't
+        started are merged into it, the changed objects given to them
+        are recorded there too.
+
+        Arguments:
+            objs -- Objects changed since the last save, to touch in
+                the executor instead of the event loop
         """
+        loop = asyncio.get_running_loop()
+        with self.__next_save_lock:
+            pending = self.__next_save
+            merged = pending is not None and pending[0] is loop
+            if merged:
+                pending[1].extend(objs)
+            else:
+                # Recorded before it's submitted, the executor may run
+                #   it at once
+                pending = self.__next_save = [loop, list(objs), None]
+        if not merged:
+            pending[2] = loop.run_in_executor(
+                self.__executor(), self.__run_asave, pending)
+        # Another save awaiting the same future mustn't be cancelled
+        await asyncio.shield(pending[2])
+
+    def __run_asave(self, pending):
+        """Touch the objects of the merged saves and save, in the
+        executor
+
+        Arguments:
+            pending -- The pending save, see asave()
+        """
+        with self.__next_save_lock:
+            # The saves awaited from now on need a new save
+            if self.__next_save is pending:
+                self.__next_save = None
+        for obj in pending[1]:
+            self.touch(obj)
+        self.save()
+
+    async def areload(self):
+        """Reload all objects without blocking the event loop, see
+        reload()
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.__executor(), self.reload)
+
+    def __executor(self):
+        """The executor of asave() and areload(), a thread of the
+        storage unless `executor` was set
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='storage')
+        return self.executor
+
+    def __request_flush(self):
+        """Have the background thread flush, once the write-behind
+        delay passed or enough objects are dirty
+        """
+        with self.__flush_lock:
+            if not self.__flush_pending:
+                self.__flush_pending = True
+                self.__pending_since = time.monotonic()
+            if len(self.__dirty) >= self.write_behind_objects:
+                self.__flush_now = True
+            if self.__flusher is None:
+                self.__flusher = threading.Thread(
+                    target=self.__run_flusher, name='storage-flusher',
+                    daemon=True)
+                self.__flusher.start()
+                atexit.register(self.flush)
+            self.__flush_lock.notify_all()
+
+    def __run_flusher(self):
+        """Flush the pending saves in the background, forever"""
+        while True:
+            with self.__flush_lock:
+                while not self.__flush_pending:
+                    self.__flush_lock.wait()
+                while not self.__flush_now and self.__flush_pending:
+                    delay = self.__pending_since + \
+                        self.write_behind / 1000 - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.__flush_lock.wait(delay)
+                if not self.__flush_pending:
+                    # flush() wrote them meanwhile
+                    continue
+                self.__flush_pending = False
+                self.__flush_now = False
+                self.__flusher_busy = True
+            try:
+                self.__group_commit()
+            except Exception as error:
+                print(f'** background save failed: {error} **',
+                      file=sys.stderr)
+                with self.__flush_lock:
+                    if not self.__flush_pending:
+                        self.__flush_pending = True
+                        self.__pending_since = time.monotonic()
+            finally:
+                with self.__flush_lock:
+                    self.__flusher_busy = False
+                    self.__flush_lock.notify_all()
+
+    def __group_commit(self):
+        """Flush, merging with the saves requested meanwhile"""
+        with self.__flush_lock:
+            self.__requested += 1
+            ticket = self.__requested
+            while self.__flushing:
+                self.__flush_lock.wait()
+            if self.__flushed >= ticket:
+                # A flush started after this save was requested
+                return
+            self.__flushing = True
+            flushed = self.__requested
         try:
-            with open(self.__file_path, 'r') as json_to_obj_file:
-                json_objects = json.load(json_to_obj_file)
+            self.__flush()
+        finally:
+            with self.__flush_lock:
+                self.__flushing = False
+                self.__flushed = flushed
+                self.__flush_lock.notify_all()
+
+    def __flush(self):
+        """Write the changes since the last save, see save()"""
+        with self.lock.write():
+            if self.__batch_depth:
+                # A save requested before the batch, or flush(): the
+                #   changes of the batch are only written by its commit
+                self.__flush_deferred = True
+                return
+            self.__sync()
+            if self.__tracked is None or \
+                    not self.journal and not self.sharded:
+                self.compact()
+                return
+            paths = {self.__path_of(key) for key in self.__dirty}
+            with self.__locked(paths, exclusive=True):
+                if self.shared:
+                    self.__merge(paths)
+                self.__write_changes()
+                self.__written(paths)
+
+    def __write_changes(self):
+        """Write the changes since the last save, see save()"""
+        if not self.journal:
+            for path in {self.__path_of(key) for key in self.__dirty}:
+                self.__write_snapshot(path)
+            self.__dirty.clear()
+            return
+
+        changes = {}
+        for key, obj in self.__dirty.items():
+            changes.setdefault(self.__path_of(key), []).append((key, obj))
+        for path, records in changes.items():
+            _cut_torn_line(path + '.journal')
+            with open(path + '.journal', 'a') as journal_file:
+                for key, obj in records:
+                    value = obj.to_dict() if obj is not None else None
+                    journal_file.write(
+                        json.dumps({'key': key, 'value': value}) + '\n')
+                    self.__encoded.pop(key, None)
+                journal_file.flush()
+                if self.durability == 'always':
+                    os.fsync(journal_file.fileno())
+            self.__synced(path + '.journal')
+            self.__journal_records[path] = \
+                self.__journal_records.get(path, 0) + len(records)
+        self.__dirty.clear()
+
+        for path, records in changes.items():
+            if self.sharded:
+                size = self.count(records[0][0].partition('.')[0])
+            else:
+                size = len(self.__objects)
+            if self.__journal_records[path] > size:
+                self.__write_snapshot(path)
+
+    def compact(self):
+        """Rewrite the snapshot with all objects and drop the journal
+        """
+        with self.lock.write():
+            self.__sync()
+            self.__load()
+            paths = self.__compact_paths()
+            with self.__locked(paths, exclusive=True):
+                if self.shared:
+                    self.__merge(paths)
+                for path in paths:
+                    self.__write_snapshot(path)
+                self.__dirty.clear()
+                self.__tracked = self.__objects
+                self.__written(paths)
+
+    def __compact_paths(self):
+        """The snapshot files compact() rewrites"""
+        paths = {self.__path_of(key) for key in self.__objects}
+        if not self.sharded:
+            paths.add(self.__file_path)
+        else:
+            # Rewrite the shards whose objects have all been deleted
+            paths.update(path for path in map(self.shard_path, models_dict)
+                         if os.path.exists(path))
+        return paths
+
+    @contextmanager
+    def __locked(self, paths, exclusive):
+        """Hold the locks of some snapshot files inside the with block,
+        in shared mode
+
+        The locks are taken in the order of the paths, so two processes
+        locking the same files can't deadlock. A file this thread
+        already locked is skipped.
+
+        Arguments:
+            paths -- The paths of the snapshot files
+            exclusive -- Lock them for writing, otherwise for reading
+        """
+        locked = []
+        try:
+            for path in sorted(set(paths)):
+                if not self.shared or path in self.__held:
+                    continue
+                descriptor = os.open(path + '.lock',
+                                     os.O_RDWR | os.O_CREAT, 0o666)
+                self.__held[path] = descriptor
+                locked.append(path)
+                if fcntl is not None:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX if exclusive
+                                else fcntl.LOCK_SH)
+            yield
+        finally:
+            # Closing the lock file releases its lock
+            for path in locked:
+                os.close(self.__held.pop(path))
+
+    def __generation(self, path):
+        """The number of writes to a snapshot file, kept in its lock
+        file, None if this thread doesn't hold its lock
+        """
+        descriptor = self.__held.get(path)
+        if descriptor is None:
+            return None
+        os.lseek(descriptor, 0, os.SEEK_SET)
+        text = os.read(descriptor, 32).strip()
+        return int(text) if text.isdigit() else 0
+
+    def __written(self, paths):
+        """Count a write to some snapshot files in their lock files and
+        remember how this process left them
+
+        Arguments:
+            paths -- The paths of the written snapshot files
+        """
+        for path in paths:
+            generation = self.__generation(path)
+            if generation is not None:
+                generation += 1
+                descriptor = self.__held[path]
+                os.ftruncate(descriptor, 0)
+                os.lseek(descriptor, 0, os.SEEK_SET)
+                os.write(descriptor, str(generation).encode())
+            self.__seen[path] = (generation, _signature(path),
+                                 _size(path + '.journal'))
+
+    def refresh(self):
+        """Merge the changes other processes saved to the files since
+        this one last read or wrote them
+        """
+        with self.lock.write():
+            self.__sync()
+            if self.sharded:
+                paths = {self.shard_path(cls_name)
+                         for cls_name in models_dict
+                         if cls_name not in self.__unloaded}
+            else:
+                paths = {self.__file_path}
+            with self.__locked(paths, exclusive=False):
+                self.__merge(paths)
+
+    def __merge(self, paths):
+        """Merge the changes written to some snapshot files by other
+        processes, see refresh()
+
+        A file whose snapshot didn't change since it was last read or
+        written only has its new journal lines read. Otherwise the file
+        is read again, but only the records differing from the stored
+        objects replace them. The objects changed since the last save
+        are kept as they are. Nothing is merged when the objects
+        dictionary has been replaced as a whole, it replaces the files.
+
+        Arguments:
+            paths -- The paths of the snapshot files
+        """
+        if self.__tracked is None:
+            return
+        shards = {self.shard_path(cls_name): cls_name
+                  for cls_name in models_dict}
+        for path in paths:
+            if self.sharded and shards.get(path) in self.__unloaded:
+                # Read in full when its class is first used
+                continue
+            seen = self.__seen.get(path)
+            generation = self.__generation(path)
+            signature = _signature(path)
+            size = _size(path + '.journal')
+            if seen is not None and seen[1] == signature:
+                if size > seen[2]:
+                    self.__merge_journal(path, seen[2])
+                    continue
+                if size == seen[2] and generation == seen[0]:
+                    continue
+            self.__merge_file(path)
+
+    def __merge_journal(self, path, offset):
+        """Merge the lines appended to a journal since an offset
+
+        Arguments:
+            path -- The path of the snapshot file the journal belongs to
+            offset -- The offset of the first line to read
+        """
+        records = {}
+        count, offset = self.__read_journal(path, offset, records)
+        self.__apply(records)
+        self.__journal_records[path] = \
+            self.__journal_records.get(path, 0) + count
+        self.__seen[path] = (self.__generation(path), _signature(path),
+                             offset)
+
+    def __merge_file(self, path):
+        """Merge the records of a snapshot file and its journal that
+        differ from the stored objects
+
+        Arguments:
+            path -- The path of the snapshot file
+        """
+        try:
+            with open(path, 'r') as json_file:
+                stat = os.fstat(json_file.fileno())
+                records = json.load(json_file)
+        except FileNotFoundError:
+            stat = None
+            records = {}
+        count, offset = self.__read_journal(path, 0, records)
+
+        # The clean objects missing from the file were deleted there
+        for key in [key for key, _ in self.__raw_items()
+                    if not self.sharded or self.__path_of(key) == path]:
+            if records.get(key) is None:
+                records.setdefault(key, None)
+        for key, value in list(records.items()):
+            if value is not None and key in self.__objects:
+                current = self.__peek(key)
+                if type(current) is not dict:
+                    current = current.to_dict()
+                if current == value:
+                    del records[key]
+        self.__apply(records)
+        self.__journal_records[path] = count
+        self.__seen[path] = (self.__generation(path), _stat_signature(stat),
+                             offset)
+
+    def __apply(self, records):
+        """Store the records changed by another process, except over the
+        objects changed since the last save
+
+        Arguments:
+            records -- A dictionary of keys to their record, None for
+                the deleted objects
+        """
+        for key, value in records.items():
+            if key in self.__dirty:
+                continue
+            if value is None:
+                self.__remove(key)
+            else:
+                self.__store(key, value)
+
+    def __path_of(self, key):
+        """The snapshot file holding the object of a key"""
+        return self.shard_path(key.partition('.')[0])
+
+    def __write_snapshot(self, path):
+        """Rewrite one snapshot file and drop its journal
+
+        Arguments:
+            path -- The path of the snapshot file
+        """
+        for key in self.__dirty:
+            if self.__path_of(key) == path:
+                self.__encoded.pop(key, None)
+
+        chunks = snapshot_chunks(self.__entries(path))
+        if not self.binary:
+            self.__replace(path, chunks)
+        else:
+            checksum = Checksum()
+            self.__replace(path, checksum.pieces(chunks))
+            self.__write_binary(path, checksum)
+
+        # The snapshot now holds every journaled change, replaying the
+        #   journal over it again would be harmless but wasteful.
+        try:
+            os.remove(path + '.journal')
         except FileNotFoundError:
+            pass
+        self.__journal_records.pop(path, None)
+        if self.persist_text:
+            self.__write_text_indexes(path)
+
+    def __write_binary(self, path, checksum):
+        """Write the binary copy of a snapshot file
+
+        Arguments:
+            path -- The path of the snapshot file
+            checksum -- The Checksum of the snapshot file
+        """
+        items = [(key, value) for key, value in self.__raw_items()
+                 if not self.sharded or self.__path_of(key) == path]
+        strings = _interned_strings if self.string_table else None
+        self.__replace(path + '.pickle', lambda binary_file: write_snapshot(
+            binary_file, items, len(items), checksum, strings))
+
+    def __entries(self, path):
+        """The encoded records of a snapshot file, one at a time
+
+        The snapshot is assembled from the cached records, so the
+        output is the same as json.dump(..., indent=3) of every
+        object's to_dict() without encoding the clean ones again.
+        Without `encode_cache` every record is encoded and dropped.
+
+        Arguments:
+            path -- The path of the snapshot file
+
+        Returns:
+            An iterator over the encoded records, see encode_entry()
+        """
+        compact = self.compact_format
+        for key, value in self.__raw_items():
+            if self.sharded and self.__path_of(key) != path:
+                continue
+            if not self.encode_cache:
+                record = value if type(value) is dict else value.to_dict()
+                yield encode_entry(key, record, compact)
+                continue
+            cached = self.__encoded.get(key)
+            if cached is None or cached[0] is not value or \
+                    cached[2] is not compact:
+                record = value if type(value) is dict else value.to_dict()
+                cached = (value, encode_entry(key, record, compact), compact)
+                self.__encoded[key] = cached
+            yield cached[1]
+
+    def __write_text_indexes(self, path):
+        """Persist the text indexes of the classes of a snapshot file,
+        tagged with the size and modification time of the snapshot
+
+        Arguments:
+            path -- The path of the snapshot file
+        """
+        names = [cls_name for cls_name, cls in models_dict.items()
+                 if getattr(cls, 'text_indexes', ())
+                 and self.shard_path(cls_name) == path]
+        if not names:
+            return
+        self.__index()
+        indexes = {}
+        for cls_name in names:
+            indexes[cls_name] = self.__early_text_index(cls_name).to_dict()
+        stat = os.stat(path)
+        # The indexes can be rebuilt from the snapshot, no need to sync
+        self.__replace(path + '.text', json.dumps(
+            {'snapshot': [stat.st_size, stat.st_mtime_ns],
+             'indexes': indexes}, separators=(',', ':')), sync=False)
+
+    def __replace(self, path, text, sync=True):
+        """Replace the content of a file atomically
+
+        The text is written to a temporary file renamed over the file,
+        a crash leaves either the old or the new content.
+
+        Arguments:
+            path -- The path of the file
+            text -- The new content, an iterable of its pieces, or a
+                function writing it to the file opened in binary mode
+
+        Keyword Arguments:
+            sync -- Sync the file as the durability says (default: {True})
+        """
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'wb' if callable(text) else 'w') \
+                    as temp_file:
+                if isinstance(text, str):
+                    temp_file.write(text)
+                elif callable(text):
+                    text(temp_file)
+                else:
+                    temp_file.writelines(text)
+                temp_file.flush()
+                if sync and self.durability == 'always':
+                    os.fsync(temp_file.fileno())
+        except BaseException:
+            # An object failing to encode leaves a partial file
+            os.remove(temp_path)
+            raise
+        os.replace(temp_path, path)
+        if sync:
+            self.__synced(path)
+
+    def __synced(self, path):
+        """Sync a written file as the durability says
+
+        With 'always' the file itself is already synced, its directory
+        is synced so the rename is kept too. With a number of
+        milliseconds the file is synced by a timer once that much time
+        passed since the last sync.
+
+        Arguments:
+            path -- The path of the written file
+        """
+        if self.durability == 'always':
+            _sync_directory(path)
+        elif self.durability != 'never':
+            with self.__flush_lock:
+                self.__unsynced.add(path)
+                if self.__sync_timer is None:
+                    delay = self.durability / 1000 - \
+                        (time.monotonic() - self.__synced_at)
+                    self.__sync_timer = threading.Timer(
+                        max(0.0, delay), self.sync_files)
+                    self.__sync_timer.start()
+
+    def sync_files(self):
+        """Sync the files written since the last sync to the disk
+
+        Called by the timer of a durability in milliseconds, it can be
+        called at any time to sync at once.
+        """
+        with self.__flush_lock:
+            paths = self.__unsynced
+            self.__unsynced = set()
+            if self.__sync_timer is not None:
+                self.__sync_timer.cancel()
+                self.__sync_timer = None
+            self.__synced_at = time.monotonic()
+        for path in paths:
+            try:
+                with open(path, 'rb') as written_file:
+                    os.fsync(written_file.fileno())
+            except FileNotFoundError:
+                # Replaced or removed since, its successor is synced
+                continue
+            _sync_directory(path)
+
+    def __read_text_indexes(self, path, stat):
+        """Keep the persisted text indexes of a snapshot file until the
+        indexes are built, if they were written with this snapshot
+
+        Arguments:
+            path -- The path of the snapshot file
+            stat -- The os.stat_result of the snapshot file when read
+        """
+        if self.__indexed is self.__objects:
+            return
+        try:
+            with open(path + '.text', 'r') as text_file:
+                persisted = json.load(text_file)
+        except (FileNotFoundError, ValueError):
+            return
+        if persisted.get('snapshot') != [stat.st_size, stat.st_mtime_ns]:
+            return
+        if self.__persisted_into is not self.__objects:
+            self.__persisted_text = {}
+        self.__persisted_text.update(persisted['indexes'])
+        self.__persisted_into = self.__objects
+
+    @property
+    def in_batch(self):
+        """Whether saves are currently deferred by a batch"""
+        return self.__batch_depth > 0
+
+    def begin(self):
+        """Start deferring saves until the matching commit
+
+        Batches nest, only the outermost commit flushes and a rollback
+        always returns to the state of the outermost begin.
+        """
+        with self.lock.write():
+            if self.__batch_depth == 0:
+                self.__sync()
+                self.__load()
+                self.__batch_snapshot = (
+                    {key: (obj, dict(obj._attributes())
+                           if type(obj) is not dict else None)
+                     for key, obj in self.__raw_items()},
+                    self.__dirty.copy(),
+                    self.__tracked
+                    )
+                self.__save_deferred = False
+            self.__batch_depth += 1
+
+    def commit(self):
+        """End a batch, flushing once if any save was deferred by it
+        """
+        if self.__batch_depth == 0:
+            return
+        with self.lock.write():
+            self.__batch_depth -= 1
+            deferred = False
+            if self.__batch_depth == 0:
+                self.__batch_snapshot = None
+                deferred = self.__save_deferred or self.__flush_deferred
+                self.__save_deferred = False
+                self.__flush_deferred = False
+        if deferred:
+            self.save()
+
+    def rollback(self):
+        """Abandon the current batch and restore the objects to their
+        state at its begin
+        """
+        if self.__batch_depth == 0:
+            return
+        objects, dirty, tracked = self.__batch_snapshot
+        with self.lock.write():
+            self.__changes.clear()
+            self.__objects.clear()
+            for key, (obj, attributes) in objects.items():
+                if attributes is not None:
+                    obj._restore(attributes)
+                self.__store(key, obj)
+            self.__dirty = dirty
+            self.__tracked = tracked
+            self.__indexed = None
+            self.__batch_depth = 0
+            self.__batch_snapshot = None
+            self.__save_deferred = False
+            deferred = self.__flush_deferred
+            self.__flush_deferred = False
+        if deferred:
+            # The saves requested before the batch still are
+            self.save()
+
+    @contextmanager
+    def batch(self):
+        """Defer all saves made inside the with block to a single flush
+        at its end, rolling back if the block raises.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def within_radius(self, cls, latitude, longitude, radius):
+        """The stored objects of a class within a distance of a point
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            latitude -- The latitude of the point, in degrees
+            longitude -- The longitude of the point, in degrees
+            radius -- The distance, in kilometers
+
+        Returns:
+            A dictionary of the objects, nearest first
+        """
+        self.__ready(cls, attributes=self.__kind(cls, 'spatial_index'))
+        with self.lock.read():
+            index = self.__spatial_index(cls)
+            return {key: self.__objects[key]
+                    for key, _ in index.within(latitude, longitude, radius)}
+
+    def within_box(self, cls, south, west, north, east):
+        """The stored objects of a class inside a box
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            south, west, north, east -- The edges of the box, in degrees.
+                The box crosses the 180th meridian if west > east.
+
+        Returns:
+            A dictionary of the objects
+        """
+        self.__ready(cls, attributes=self.__kind(cls, 'spatial_index'))
+        with self.lock.read():
+            index = self.__spatial_index(cls)
+            return {key: self.__objects[key]
+                    for key in index.in_box(south, west, north, east)}
+
+    def nearest(self, cls, latitude, longitude, k):
+        """The stored objects of a class nearest to a point
+
+        Arguments:
+            cls -- The class of the objects, or its name
+            latitude -- The latitude of the point, in degrees
+            longitude -- The longitude of the point, in degrees
+            k -- The number of objects
+
+        Returns:
+            A dictionary of up to k objects, nearest first
+        """
+        self.__ready(cls, attributes=self.__kind(cls, 'spatial_index'))
+        with self.lock.read():
+            index = self.__spatial_index(cls)
+            return {key: self.__objects[key]
+                    for key, _ in index.nearest(latitude, longitude, k)}
+
+    def __spatial_index(self, cls):
+        """The spatial index of a class
+
+        A class without one is indexed on demand by its `latitude` and
+        `longitude` attributes.
+
+        Arguments:
+            cls -- The class of the objects, or its name
+
+        Returns:
+            A SpatialIndex of the objects of the class
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        names = self.__kind(cls_name, 'spatial_index')
+        index = self.__class_indexes(cls_name, names).get(names[0])
+        if index is not None:
+            return index
+        index = SpatialIndex(models_dict.get(cls_name))
+        index.build((key, self.__peek(key))
+                    for key in self.__index().get(cls_name, {}))
+        return index
+
+    def __peek(self, key):
+        """The stored object of a key, or its raw record if not built"""
+        if isinstance(self.__objects, LazyObjects) and \
+                not self.__objects.is_built(key):
+            return dict.__getitem__(self.__objects, key)
+        return self.__objects[key]
+
+    def __raw_items(self):
+        """The stored items, raw records aren't built"""
+        if isinstance(self.__objects, LazyObjects):
+            return self.__objects.raw_items()
+        return self.__objects.items()
+
+    def __store(self, key, value):
+        """Store an object or a raw record under a key
+
+        A raw record is built at once unless the objects dictionary
+        is lazy.
+
+        Arguments:
+            key -- The key of the object
+            value -- The object or its dictionary representation
+        """
+        if type(value) is not dict:
+            _intern_object(value)
+            self.__objects[key] = value
+        else:
+            # Fail on an unknown class now, as building it would
+            cls = models_dict[value['__class__']]
+            if isinstance(self.__objects, LazyObjects):
+                self.__objects.put_raw(key, _intern(cls, value))
+            else:
+                self.__objects[key] = cls(**_intern(cls, value))
+        self.__indexed_add(key, value)
+
+    def __remove(self, key):
+        """Remove the object of a key from the stored objects
+
+        Arguments:
+            key -- The key of the object
+
+        Returns:
+            The removed object, None if there wasn't any
+        """
+        obj = self.__objects.pop(key, None)
+        if self.__indexed is not self.__objects:
+            self.__changed.add(key)
+        elif obj is not None:
+            cls_name = key.partition('.')[0]
+            self.__classes.get(cls_name, {}).pop(key, None)
+            for index in self.__built_indexes(cls_name):
+                index.remove(key)
+        return obj
+
+    def __ready(self, cls=None, index=True, attributes=False):
+        """Load the shards a read needs, apply the attributes set since
+        the last operation and rebuild the stale indexes under the write
+        lock, so the read itself changes nothing
+
+        Keyword Arguments:
+            cls -- The class read or its name, all of them if None
+                (default: {None})
+            index -- Whether the read uses the keys of the classes
+                (default: {True})
+            attributes -- Whether the read uses the attribute indexes of
+                the class, True for all of them or the names of those it
+                uses, see __class_indexes() (default: {False})
+        """
+        cls_name = cls if cls is None or isinstance(cls, str) else \
+            cls.__name__
+        with self.lock.read():
+            needed = self.__unloaded and \
+                (cls_name is None or cls_name in self.__unloaded) or \
+                (index or attributes) and self.__stale() or \
+                attributes and (self.__unbuilt(cls_name, attributes) or
+                                self.__changes)
+        if needed:
+            with self.lock.write():
+                self.__load(cls_name)
+                self.__sync()
+                if attributes:
+                    self.__class_indexes(
+                        cls_name, None if attributes is True else attributes)
+                elif index:
+                    self.__index()
+
+    def __stale(self):
+        """Whether the indexes must be rebuilt, see __index()"""
+        return self.__indexed is not self.__objects or \
+            sum(map(len, self.__classes.values())) != len(self.__objects)
+
+    def __index(self):
+        """The keys of every class
+
+        They are listed again when the objects dictionary was replaced,
+        or changed without going through the storage. The attribute
+        indexes are then dropped, to be built again when first needed,
+        see __class_indexes().
+
+        Returns:
+            A dictionary of class names to the (ordered) keys of their
+            objects
+        """
+        if self.__stale():
+            self.__classes = {}
+            self.__attribute_indexes = {}
+            self.__indexed = self.__objects
+            for key in self.__objects:
+                self.__classes.setdefault(
+                    key.partition('.')[0], {})[key] = None
+            self.__text_indexes = self.__restore_text_indexes()
+            self.__changed.clear()
+        return self.__classes
+
+    def __unbuilt(self, cls_name, attributes):
+        """Whether some indexes of a class aren't built yet
+
+        Arguments:
+            cls_name -- The name of the class
+            attributes -- True for all its indexes, or the names of
+                some of them, see _indexed_attributes()
+        """
+        built = self.__attribute_indexes.get(cls_name, {})
+        return any(name not in built and
+                   (attributes is True or name in attributes)
+                   for name in _indexed_attributes(models_dict.get(cls_name)))
+
+    def __class_indexes(self, cls_name, attributes=None):
+        """The attribute indexes of a class, each built the first time a
+        read needs it, so reading the objects of another class, or other
+        attributes, doesn't
+
+        Arguments:
+            cls_name -- The name of the class
+
+        Keyword Arguments:
+            attributes -- The names of the indexes to build if they
+                aren't, see _indexed_attributes(), all of them if None
+                (default: {None})
+
+        Returns:
+            A dictionary of the indexed attribute names (a tuple of
+            names for a spatial or text index) to their built index,
+            with its KeyIndex under 'id'
+        """
+        keys = self.__index().get(cls_name, {})
+        cls = models_dict.get(cls_name)
+        indexes = self.__attribute_indexes.get(cls_name, {})
+        wanted = {name for name in _indexed_attributes(cls)
+                  if name not in indexes and
+                  (attributes is None or name in attributes)}
+        if not wanted:
+            return indexes
+        indexes = self.__attribute_indexes.setdefault(cls_name, indexes)
+        built = {}
+        for attribute in getattr(cls, 'hash_indexes', ()):
+            if attribute in wanted:
+                built[attribute] = HashIndex(cls, attribute)
+        for attribute in getattr(cls, 'sorted_indexes', ()):
+            if attribute in wanted:
+                built[attribute] = SortedIndex(cls, attribute)
+        attributes = tuple(getattr(cls, 'spatial_index', None) or ())
+        if attributes in wanted:
+            built[attributes] = SpatialIndex(cls, *attributes)
+        if built:
+            items = [(key, self.__peek(key)) for key in keys]
+            # Built at once, the sorted ones are sorted once
+            for index in built.values():
+                index.build(items)
+            indexes.update(built)
+        attributes = tuple(getattr(cls, 'text_indexes', None) or ())
+        if attributes in wanted:
+            indexes[attributes] = self.__early_text_index(cls_name)
+            del self.__text_indexes[cls_name]
+        if 'id' in wanted:
+            # Sorted at once, the random ids would be inserted all over
+            indexes['id'] = KeyIndex(cls, keys)
+        return indexes
+
+    def __early_text_index(self, cls_name):
+        """The text index of a class, built alone if it isn't among the
+        attribute indexes of the class, e.g. to be written by a save
+
+        It's kept up to date until they are, see __built_indexes().
+
+        Arguments:
+            cls_name -- The name of a class having `text_indexes`
+
+        Returns:
+            The TextIndex
+        """
+        for index in self.__attribute_indexes.get(cls_name, {}).values():
+            if isinstance(index, TextIndex):
+                return index
+        index = self.__text_indexes.get(cls_name)
+        if index is None:
+            cls = models_dict[cls_name]
+            index = TextIndex(cls, cls.text_indexes)
+            index.build((key, self.__peek(key))
+                        for key in self.__index().get(cls_name, {}))
+            self.__text_indexes[cls_name] = index
+        return index
+
+    def __built_indexes(self, cls_name):
+        """The indexes of a class to keep up to date
+
+        Arguments:
+            cls_name -- The name of the class
+
+        Returns:
+            Its built attribute indexes, and its early text index if it
+            isn't among them
+        """
+        indexes = self.__attribute_indexes.get(cls_name, {})
+        if cls_name in self.__text_indexes:
+            return (*indexes.values(), self.__text_indexes[cls_name])
+        return indexes.values()
+
+    def __restore_text_indexes(self):
+        """Load the persisted text indexes, and bring them up to date
+        with the objects changed since their snapshot was read
+
+        An index that still doesn't hold the keys of its class is
+        dropped, to be built again from the objects.
+
+        Returns:
+            A dictionary of class names to their restored text index
+        """
+        restored = {}
+        if self.__persisted_into is self.__objects:
+            for cls_name, persisted in self.__persisted_text.items():
+                cls = models_dict.get(cls_name)
+                attributes = tuple(getattr(cls, 'text_indexes', ()))
+                if not attributes or \
+                        list(attributes) != persisted['attributes']:
+                    continue
+                index = TextIndex(cls, attributes)
+                index.load(persisted)
+                for key in self.__changed:
+                    if key.partition('.')[0] != cls_name:
+                        continue
+                    if key in self.__objects:
+                        index.add(key, self.__peek(key))
+                    else:
+                        index.remove(key)
+                keys = self.__classes.get(cls_name, {})
+                if index.lengths.keys() == keys.keys():
+                    restored[cls_name] = index
+        self.__persisted_text = {}
+        self.__persisted_into = None
+        return restored
+
+    def __indexed_add(self, key, value):
+        """Add an object to the indexes of its class
+
+        Arguments:
+            key -- The key of the object
+            value -- The object or its raw record
+        """
+        if self.__indexed is not self.__objects:
+            self.__changed.add(key)
             return
+        cls_name = key.partition('.')[0]
+        self.__classes.setdefault(cls_name, {})[key] = None
+        for index in self.__built_indexes(cls_name):
+            index.add(key, value)
+
+    def __sync(self):
+        """Forget the tracked state when the objects dictionary has been
+        replaced as a whole, the next save then rewrites the snapshot.
+        Otherwise mark changed the stored objects whose attributes were
+        set since, see changed().
+        """
+        changes = self.__changes
+        if self.__tracked is not None and \
+                self.__tracked is not self.__objects:
+            changes.clear()
+            self.__dirty.clear()
+            self.__encoded.clear()
+            self.__tracked = None
+        while changes:
+            # Popped one at a time, other threads may add more meanwhile
+            obj = changes.popitem()[1]
+            key = f'{obj.__class__.__name__}.{getattr(obj, "id", None)}'
+            # Not building a lazy object, it can't be this one anyway
+            if dict.get(self.__objects, key) is obj:
+                self.__touched(key, obj)
+
+    def reload(self, *, progress=None):
+        """Reload all objects from a file.
+
+        The journal, if any, is replayed on top of the snapshot. In
+        sharded mode the shards are only read when first accessed.
+
+        The snapshot is parsed one record at a time and every object
+        is stored as soon as its record is read, so the whole decoded
+        file is never in memory beside the objects.
+
+        Keyword Arguments:
+            progress -- Called with the number of bytes read and the
+                size of the snapshot while it's read, e.g. to report
+                the progress of a large file (default: {None})
+        """
+        with self.lock.write():
+            if self.sharded:
+                self.__unloaded = set(models_dict)
+                return
+            self.__load_file(self.__file_path, progress)
+
+    def __load(self, cls_name=None):
+        """Read the shards that haven't been read since reload
+
+        Keyword Arguments:
+            cls_name -- Only read the shard of this class, all the
+                pending shards otherwise (default: {None})
+        """
+        if not self.__unloaded:
+            return
+        if cls_name is None:
+            pending = list(self.__unloaded)
+        elif cls_name in self.__unloaded:
+            pending = [cls_name]
+        else:
+            return
+        for name in pending:
+            self.__unloaded.discard(name)
+            self.__load_file(self.shard_path(name))
+
+    def __load_file(self, path, progress=None):
+        """Load the objects of one snapshot file and its journal
+
+        Arguments:
+            path -- The path of the snapshot file
+
+        Keyword Arguments:
+            progress -- Called with the number of bytes read and the
+                size of the file (default: {None})
+        """
+        with self.__locked([path], exclusive=False):
+            try:
+                json_to_obj_file = open(path, 'rb')
+            except FileNotFoundError:
+                self.__load_objects(path, None, ())
+                return
+            with json_to_obj_file:
+                stat = os.fstat(json_to_obj_file.fileno())
+                if self.binary and \
+                        self.__load_binary(path, json_to_obj_file, stat):
+                    if progress is not None:
+                        progress(stat.st_size, stat.st_size)
+                    return
+                ranges = self.__parallel_ranges(json_to_obj_file, stat)
+                if ranges:
+                    records = self.__load_parallel(path, ranges, progress)
+                else:
+                    records = iter_records(json_to_obj_file, progress)
+                self.__load_objects(path, stat, records)
+
+    def __load_binary(self, path, json_file, stat):
+        """Load the objects of the binary copy of a snapshot file and
+        replay its journal, if the copy is valid
+
+        Arguments:
+            path -- The path of the snapshot file
+            json_file -- The snapshot file, opened in binary mode
+            stat -- Its os.stat_result
+
+        Returns:
+            Whether the objects were loaded, otherwise the snapshot file
+            must be read
+        """
+        try:
+            binary_file = open(path + '.pickle', 'rb')
+        except FileNotFoundError:
+            return False
+        with binary_file:
+            items = read_snapshot(binary_file, json_file)
+            if items is None:
+                return False
+            try:
+                self.__load_objects(path, stat, items)
+            except CorruptSnapshot:
+                # The objects read are read again from the JSON
+                json_file.seek(0)
+                return False
+        return True
+
+    def __parallel_ranges(self, json_file, stat):
+        """The byte ranges of a snapshot file to reload in parallel
+
+        Arguments:
+            json_file -- The snapshot file, opened in binary mode
+            stat -- Its os.stat_result
+
+        Returns:
+            The list of ranges, see split_records(), None to reload the
+            file in this process
+        """
+        if self.reload_workers < 2 or stat.st_size < PARALLEL_RELOAD_SIZE \
+                or isinstance(self.__objects, LazyObjects) or \
+                'fork' not in multiprocessing.get_all_start_methods():
+            return None
+        # A few ranges per process even out their sizes
+        ranges = split_records(json_file, self.reload_workers * 4)
+        json_file.seek(0)
+        if ranges is None or len(ranges) < 2:
+            return None
+        return ranges
+
+    def __load_parallel(self, path, ranges, progress=None):
+        """Build the objects of a snapshot file in several processes
+
+        Arguments:
+            path -- The path of the snapshot file
+            ranges -- Its byte ranges, see split_records()
+
+        Keyword Arguments:
+            progress -- Called with the number of bytes built and the
+                size of the file after every range (default: {None})
+
+        Returns:
+            An iterator over the (key, instance) pairs, in the file's
+            order
+        """
+        total = ranges[-1][1]
+        context = multiprocessing.get_context('fork')
+        count = min(self.reload_workers, len(ranges))
+        # Forked processes sending to this thread: the threads of a
+        #   process pool would pickle the calls and the objects, and
+        #   wait for the models to be imported when reload() runs from
+        #   their import
+        workers = []
+        try:
+            for number in range(count):
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_load_ranges, daemon=True,
+                    args=(sender, path, ranges[number::count], total))
+                process.start()
+                sender.close()
+                workers.append((process, receiver))
+            for number, (_, end) in enumerate(ranges):
+                objs = workers[number % count][1].recv()
+                if isinstance(objs, Exception):
+                    raise objs
+                yield from objs
+                if progress is not None:
+                    progress(end, total)
+        finally:
+            for process, receiver in workers:
+                receiver.close()
+                process.join()
+
+    def __load_objects(self, path, stat, json_objects):
+        """Store the objects read from a snapshot file and replay its
+        journal
+
+        Arguments:
+            path -- The path of the snapshot file
+            stat -- The os.stat_result of the file when read, None if
+                it doesn't exist
+            json_objects -- An iterator over the (key, record) pairs
+                read from the file
+        """
 
         # Search for the specified class in models_dict dictionary
         #   with its name, then initialize it.
-        for key, value in json_objects.items():
-            self.__objects[key] = models_dict[value['__class__']](**value)
+        for key, value in json_objects:
+            self.__store(key, value)
+            # The object is now as its snapshot has it
+            self.__changed.discard(key)
+        if self.persist_text and stat is not None:
+            self.__read_text_indexes(path, stat)
+
+        offset = self.__replay_journal(path)
+        self.__seen[path] = (self.__generation(path), _stat_signature(stat),
+                             offset)
+
+    def __replay_journal(self, path):
+        """Apply the journaled changes to the loaded objects
+
+        Arguments:
+            path -- The path of the snapshot file the journal belongs to
+
+        Returns:
+            The offset of the end of the last line read
+        """
+        self.__journal_records.pop(path, None)
+        try:
+            with open(path + '.journal', 'rb') as journal_file:
+                offset = 0
+                for line in journal_file:
+                    # A line without its newline is a torn write from
+                    #   an interrupted save, it was never committed.
+                    if not line.endswith(b'\n'):
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    key, value = record['key'], record['value']
+                    if value is None:
+                        self.__remove(key)
+                    else:
+                        self.__store(key, value)
+                    self.__journal_records[path] = \
+                        self.__journal_records.get(path, 0) + 1
+        except FileNotFoundError:
+            return 0
+        return offset
+
+    def __read_journal(self, path, offset, records):
+        """Read the records of a journal from an offset
+
+        Arguments:
+            path -- The path of the snapshot file the journal belongs to
+            offset -- The offset of the first line to read
+            records -- The dictionary the records are put in, by key,
+                None for the deleted objects
+
+        Returns:
+            The number of records read and the offset of the end of the
+            last line read
+        """
+        count = 0
+        try:
+            with open(path + '.journal', 'rb') as journal_file:
+                journal_file.seek(offset)
+                for line in journal_file:
+                    # A torn write, see __replay_journal()
+                    if not line.endswith(b'\n'):
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    records[record['key']] = record['value']
+                    count += 1
+        except FileNotFoundError:
+            return 0, 0
+        return count, offset
@@ -0,0 +1,391 @@
+#!/usr/bin/python3
+"""Secondary indexes kept by the storage engine over model attributes"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from models.codec import to_epoch
+
+
+class _Top():
+    """Sorts after any key, to bisect past all the entries of a value"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+def _number(value):
+    """The numeric value of an attribute
+
+    The console stores updated attributes as strings, so "100" is
+    indexed as 100. A datetime is its number of microseconds since the
+    epoch, see codec.to_epoch().
+
+    Arguments:
+        value -- The value of the attribute
+
+    Returns:
+        The number, None if the value isn't one
+    """
+    if type(value) in (int, float):
+        return value
+    if type(value) is datetime:
+        return to_epoch(value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    # NaN doesn't compare to anything, it can't be kept sorted
+    return value if value == value else None
+
+
+class HashIndex():
+    """Index the keys of a class's objects by the value of one attribute
+
+    Models declare the attributes to index in their `hash_indexes`
+    class attribute, e.g. `hash_indexes = ('city_id', 'user_id')`.
+    """
+
+    def __init__(self, cls, attribute):
+        """Initialize an empty index
+
+        Arguments:
+            cls -- The indexed class, its attribute is the default value
+            attribute -- The name of the indexed attribute
+        """
+        self.cls = cls
+        self.attribute = attribute
+        self.entries = {}
+        self.values = {}
+
+    def value_of(self, obj):
+        """The indexed value of an object
+
+        Arguments:
+            obj -- An instance, or its raw record (a plain dict)
+
+        Returns:
+            The value of the attribute, or the class default
+        """
+        if type(obj) is dict:
+            if self.attribute in obj:
+                return obj[self.attribute]
+            return self.cls.default(self.attribute)
+        return getattr(obj, self.attribute, None)
+
+    def add(self, key, obj):
+        """Index an object, moving it if its value changed
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object or its raw record
+        """
+        value = self.value_of(obj)
+        try:
+            hash(value)
+        except TypeError:
+            self.remove(key)
+            return
+        if key in self.values:
+            if self.values[key] == value:
+                return
+            self.remove(key)
+        self.values[key] = value
+        self.entries.setdefault(value, {})[key] = None
+
+    def build(self, items):
+        """Index many objects at once, see add()
+
+        Arguments:
+            items -- The (key, object or raw record) pairs
+        """
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Forget an object
+
+        Arguments:
+            key -- The key of the object
+        """
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        keys = self.entries[value]
+        del keys[key]
+        if not keys:
+            del self.entries[value]
+
+    def find(self, value):
+        """The keys of the objects having a value
+
+        Arguments:
+            value -- The value of the attribute
+
+        Returns:
+            The (ordered) keys indexed under the value
+        """
+        try:
+            return self.entries.get(value, {})
+        except TypeError:
+            return {}
+
+    def __len__(self):
+        """The number of indexed objects"""
+        return len(self.values)
+
+
+class SortedIndex(HashIndex):
+    """Index the keys of a class's objects in the order of a numeric
+        attribute, for range queries
+
+    Models declare the attributes to index in their `sorted_indexes`
+    class attribute. The entries are (value, key) pairs kept sorted
+    with bisect, objects with equal values are in key order.
+    """
+
+    # The value a bound of a range compares as, None if it can't
+    sort_value = staticmethod(_number)
+
+    def __init__(self, cls, attribute):
+        """Initialize an empty index
+
+        Arguments:
+            cls -- The indexed class, its attribute is the default value
+            attribute -- The name of the indexed attribute
+        """
+        super().__init__(cls, attribute)
+        self.entries = []
+
+    def add(self, key, obj):
+        """Index an object, moving it if its value changed
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object or its raw record
+        """
+        value = _number(self.value_of(obj))
+        if key in self.values:
+            if self.values[key] == value:
+                return
+            self.remove(key)
+        if value is None:
+            return
+        self.values[key] = value
+        insort(self.entries, (value, key))
+
+    def build(self, items):
+        """Index many objects at once, sorting the entries once instead
+        of inserting each of them, see add()
+
+        Arguments:
+            items -- The (key, object or raw record) pairs of objects not
+                indexed yet
+        """
+        values = self.values
+        entries = self.entries
+        for key, obj in items:
+            value = _number(self.value_of(obj))
+            if value is not None:
+                values[key] = value
+                entries.append((value, key))
+        entries.sort()
+
+    def remove(self, key):
+        """Forget an object
+
+        Arguments:
+            key -- The key of the object
+        """
+        if key not in self.values:
+            return
+        entry = (self.values.pop(key), key)
+        del self.entries[bisect_left(self.entries, entry)]
+
+    def between(self, low=None, high=None, include_low=True,
+                include_high=True, reverse=False):
+        """The keys of the objects whose value is in a range
+
+        Keyword Arguments:
+            low -- The lowest value, unbounded if None (default: {None})
+            high -- The highest value, unbounded if None (default: {None})
+            include_low -- Whether low itself is in the range
+                (default: {True})
+            include_high -- Whether high itself is in the range
+                (default: {True})
+            reverse -- Start from the highest value (default: {False})
+
+        Returns:
+            An iterator over the keys, in the order of their values
+        """
+        start, end = self.__bounds(low, high, include_low, include_high)
+        # A copy of the range, so it can be walked while the index changes
+        entries = self.entries[start:end]
+        if reverse:
+            entries.reverse()
+        return (key for _, key in entries)
+
+    def count_between(self, low=None, high=None, include_low=True,
+                      include_high=True):
+        """The number of objects whose value is in a range, see between()
+
+        Returns:
+            The number of keys between() would return
+        """
+        start, end = self.__bounds(low, high, include_low, include_high)
+        return max(0, end - start)
+
+    def __bounds(self, low, high, include_low, include_high):
+        """The slice of the entries whose value is in a range"""
+        start, end = 0, len(self.entries)
+        if low is not None:
+            if include_low:
+                start = bisect_left(self.entries, (low,))
+            else:
+                start = bisect_right(self.entries, (low, _TOP))
+        if high is not None:
+            if include_high:
+                end = bisect_right(self.entries, (high, _TOP))
+            else:
+                end = bisect_left(self.entries, (high,))
+        return start, end
+
+    def find(self, value):
+        """The keys of the objects having a value
+
+        Arguments:
+            value -- The value of the attribute
+
+        Returns:
+            The keys indexed under the value
+        """
+        value = _number(value)
+        if value is None:
+            return {}
+        return dict.fromkeys(self.between(value, value))
+
+
+def _text(value):
+    """The value of an id, None if it isn't a string"""
+    return value if type(value) is str else None
+
+
+class KeyIndex(SortedIndex):
+    """Index the keys of a class's objects in the order of their ids, for
+        the listings in that order and the keyset pagination
+
+    The storage keeps one for every class, under `id`. The ids compare
+    as text, so the time-ordered ids (see models.ids) are in the order
+    they were made. The entries are the keys themselves, which sort as
+    their ids: a new id comes last and is appended.
+    """
+
+    sort_value = staticmethod(_text)
+
+    def __init__(self, cls, keys=()):
+        """Initialize the index
+
+        Arguments:
+            cls -- The indexed class
+
+        Keyword Arguments:
+            keys -- The keys of its objects (default: {()})
+        """
+        super().__init__(cls, 'id')
+        self.prefix = cls.__name__ + '.'
+        self.entries = sorted(keys)
+
+    def add(self, key, obj):
+        """Index an object, once
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object or its raw record, its id is in the key
+        """
+        entries = self.entries
+        if not entries or key > entries[-1]:
+            entries.append(key)
+            return
+        position = bisect_left(entries, key)
+        if entries[position] != key:
+            entries.insert(position, key)
+
+    def build(self, items):
+        """Index many objects at once, see add()
+
+        Arguments:
+            items -- The (key, object or raw record) pairs of objects not
+                indexed yet
+        """
+        self.entries.extend(key for key, _ in items)
+        self.entries.sort()
+
+    def remove(self, key):
+        """Forget an object
+
+        Arguments:
+            key -- The key of the object
+        """
+        entries = self.entries
+        position = bisect_left(entries, key)
+        if position < len(entries) and entries[position] == key:
+            del entries[position]
+
+    def between(self, low=None, high=None, include_low=True,
+                include_high=True, reverse=False):
+        """The keys of the objects whose id is in a range, see
+        SortedIndex.between()"""
+        start, end = self.__bounds(low, high, include_low, include_high)
+        entries = self.entries[start:end]
+        if reverse:
+            entries.reverse()
+        return iter(entries)
+
+    def count_between(self, low=None, high=None, include_low=True,
+                      include_high=True):
+        """The number of objects whose id is in a range, see between()
+        """
+        start, end = self.__bounds(low, high, include_low, include_high)
+        return max(0, end - start)
+
+    def __bounds(self, low, high, include_low, include_high):
+        """The slice of the entries whose id is in a range"""
+        start, end = 0, len(self.entries)
+        if low is not None:
+            low = self.prefix + low
+            if include_low:
+                start = bisect_left(self.entries, low)
+            else:
+                start = bisect_right(self.entries, low)
+        if high is not None:
+            high = self.prefix + high
+            if include_high:
+                end = bisect_right(self.entries, high)
+            else:
+                end = bisect_left(self.entries, high)
+        return start, end
+
+    def find(self, value):
+        """The key of the object having an id
+
+        Arguments:
+            value -- The id
+
+        Returns:
+            The key, in a dictionary, if it's indexed
+        """
+        if type(value) is not str:
+            return {}
+        return dict.fromkeys(self.between(value, value))
+
+    def __len__(self):
+        """The number of indexed objects"""
+        return len(self.entries)
@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+"""Read and write the storage files one record at a time"""
+import codecs
+import json
+import os
+import re
+
+# The size of the chunks read from a file
+CHUNK_SIZE = 1 << 20
+
+_SPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+# Encoders without indentation run in C, unlike json.dumps(indent=3)
+_encode = json.JSONEncoder().encode
+_encode_compact = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def iter_records(file, progress=None, chunk_size=CHUNK_SIZE):
+    """Parse the records of a snapshot file one at a time
+
+    The file holds a single JSON object mapping every key to the record
+    of its object. Only a chunk of the file and the record being parsed
+    are in memory at once, instead of the whole text and every decoded
+    record.
+
+    Arguments:
+        file -- The snapshot file, opened in binary mode
+
+    Keyword Arguments:
+        progress -- Called with the number of bytes read and the size
+            of the file after every chunk (default: {None})
+        chunk_size -- The number of bytes read at once
+            (default: {CHUNK_SIZE})
+
+    Returns:
+        An iterator over the (key, record) pairs, in the file's order
+
+    Raises:
+        json.JSONDecodeError: If the file isn't a JSON object of records
+    """
+    try:
+        total = os.fstat(file.fileno()).st_size
+    except (AttributeError, OSError):
+        total = None
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    done = 0
+    text = ''
+    position = 0
+    at_end = False
+
+    def more():
+        """Read the next chunk, dropping the parsed text
+
+        Returns:
+            False at the end of the file
+        """
+        nonlocal text, position, done, at_end
+        if at_end:
+            return False
+        chunk = file.read(chunk_size)
+        done += len(chunk)
+        at_end = not chunk
+        text = text[position:] + decoder.decode(chunk, final=at_end)
+        position = 0
+        if progress is not None:
+            progress(done, total)
+        return True
+
+    def skip_space():
+        """Move past the whitespace, reading more if needed
+
+        Returns:
+            The next character, '' at the end of the file
+        """
+        nonlocal position
+        while True:
+            position = _SPACE.match(text, position).end()
+            if position < len(text) or not more():
+                return text[position:position + 1]
+
+    def value():
+        """Parse the next JSON value, reading more if it's cut"""
+        nonlocal position
+        while True:
+            try:
+                # A string or an object can't be parsed before its end
+                parsed, position = _decoder.raw_decode(text, position)
+                return parsed
+            except json.JSONDecodeError:
+                if not more():
+                    raise
+
+    def fail(message):
+        """Raise a decoding error at the current position"""
+        raise json.JSONDecodeError(message, text, position)
+
+    if skip_space() != '{':
+        fail('Expecting a JSON object of records')
+    position += 1
+    if skip_space() == '}':
+        position += 1
+    else:
+        while True:
+            if skip_space() != '"':
+                fail('Expecting property name enclosed in double quotes')
+            key = value()
+            if skip_space() != ':':
+                fail("Expecting ':' delimiter")
+            position += 1
+            skip_space()
+            yield key, value()
+            separator = skip_space()
+            position += 1
+            if separator == '}':
+                break
+            if separator != ',':
+                position -= 1
+                fail("Expecting ',' delimiter")
+    if skip_space():
+        fail('Extra data')
+
+
+def encode_entry(key, record, compact=False):
+    """The text of one record in a snapshot file
+
+    Arguments:
+        key -- The key of the object
+        record -- The dictionary representation of the object
+
+    Keyword Arguments:
+        compact -- Leave out the indentation (default: {False})
+
+    Returns:
+        The key and the record, as json.dump(..., indent=3) of the
+        whole snapshot writes them, or on a single line if compact
+    """
+    if compact:
+        return _encode(key) + ':' + _encode_compact(record)
+    lines = []
+    for name, value in record.items():
+        if isinstance(value, (list, dict)) and value:
+            text = json.dumps(value, indent=3).replace('\n', '\n      ')
+        else:
+            text = _encode(value)
+        lines.append('      ' + _encode(name) + ': ' + text)
+    if not lines:
+        return '   ' + _encode(key) + ': {}'
+    return '   ' + _encode(key) + ': {\n' + ',\n'.join(lines) + '\n   }'
+
+
+def snapshot_chunks(entries):
+    """The text of a snapshot file, one piece at a time
+
+    Arguments:
+        entries -- An iterable of the encoded entries, see
+            encode_entry()
+
+    Returns:
+        An iterator over the pieces of the text, to write in order
+    """
+    first = True
+    for entry in entries:
+        yield '{\n' if first else ',\n'
+        yield entry
+        first = False
+    yield '{}' if first else '\n}'
+
+
+def split_records(file, parts):
+    """Split a snapshot file written by snapshot_chunks() into byte
+    ranges holding whole records
+
+    Every record starts on a line of its own, at the indentation of the
+    first one. The strings of JSON can't hold a newline, so such a line
+    is always the start of a record.
+
+    Arguments:
+        file -- The snapshot file, opened in binary mode
+        parts -- The number of ranges wanted
+
+    Returns:
+        The list of the (start, end) offsets of the ranges, in order,
+        None if the file isn't laid out that way
+    """
+    size = os.fstat(file.fileno()).st_size
+    file.seek(0)
+    match = re.match(rb'[ \t\r]*\{[ \t\r]*\n( *)"', file.read(4096))
+    if match is None:
+        return None
+    boundary = b'\n' + match.group(1) + b'"'
+    offsets = [match.start(1)]
+    for part in range(1, parts):
+        position = max(size * part // parts, offsets[-1])
+        file.seek(position)
+        window = b''
+        while True:
+            block = file.read(1 << 16)
+            window += block
+            found = window.find(boundary)
+            if found >= 0 or not block:
+                break
+            # Keep the end of the window, the boundary may span blocks
+            position += len(window) - len(boundary)
+            window = window[-len(boundary):]
+        if found < 0:
+            break
+        start = position + found + 1
+        if start > offsets[-1]:
+            offsets.append(start)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def read_records(path, start, end, last):
+    """Parse the records in a byte range of a snapshot file
+
+    Arguments:
+        path -- The path of the snapshot file
+        start, end -- The range, see split_records()
+        last -- Whether the range is the last one, ending the file
+
+    Returns:
+        The dictionary of the records in the range, by key
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8').rstrip()
+    if last:
+        text = text[:-1].rstrip()
+    return json.loads('{' + text.rstrip(',') + '}')
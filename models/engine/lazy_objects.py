@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Objects dictionary that builds its instances on first access"""
+import threading
+from collections.abc import ItemsView, ValuesView
+
+
+class LazyObjects(dict):
+    """A dictionary of stored objects keeping the raw records loaded
+        from a file until they are accessed
+
+    A value that is a plain dict is a raw record (the `to_dict()` form
+    of an object). It is turned into an instance by the builder the
+    first time it's read, then the instance replaces it. Counting,
+    membership and key scans never build anything. Threads reading the
+    same record concurrently get the same instance.
+    """
+
+    def __init__(self, builder):
+        """Initialize an empty lazy dictionary
+
+        Arguments:
+            builder -- Called with the key and the raw record of an
+                object to build its instance
+        """
+        super().__init__()
+        self.builder = builder
+        self.__building = threading.Lock()
+
+    def put_raw(self, key, record):
+        """Store the raw record of an object without building it
+
+        Arguments:
+            key -- The key of the object
+            record -- The dictionary representation of the object
+        """
+        super().__setitem__(key, record)
+
+    def is_built(self, key):
+        """Whether the object of a key has already been built
+
+        Arguments:
+            key -- The key of the object
+
+        Returns:
+            False if the key still holds a raw record
+        """
+        return type(super().__getitem__(key)) is not dict
+
+    def raw_items(self):
+        """The stored items as they are, without building anything
+
+        Returns:
+            The items of the underlying dictionary
+        """
+        return super().items()
+
+    def subset(self, keys):
+        """A lazy dictionary of some of the keys, building through this
+            one so every object is only built once
+
+        Arguments:
+            keys -- The keys to keep
+
+        Returns:
+            A LazyObjects holding the given keys
+        """
+        subset = LazyObjects(lambda key, record: self[key])
+        for key in keys:
+            subset.put_raw(key, super().__getitem__(key))
+        return subset
+
+    def __getitem__(self, key):
+        """Get the object of a key, building it if needed"""
+        value = super().__getitem__(key)
+        if type(value) is dict:
+            with self.__building:
+                value = super().__getitem__(key)
+                if type(value) is dict:
+                    value = self.builder(key, value)
+                    super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        """Get the object of a key, building it if needed"""
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        """Remove a key and return its object"""
+        if key not in self:
+            return super().pop(key, *default)
+        value = self[key]
+        super().__delitem__(key)
+        return value
+
+    def setdefault(self, key, default=None):
+        """Get the object of a key, storing the default if missing"""
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def popitem(self):
+        """Remove the last key and return it with its object"""
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def values(self):
+        """The objects, built as they are iterated over"""
+        return ValuesView(self)
+
+    def items(self):
+        """The keys and objects, built as they are iterated over"""
+        return ItemsView(self)
+
+    def __iter__(self):
+        """Iterate over the keys
+
+        Overriding it keeps dict(), copy() and ** unpacking going
+        through __getitem__ rather than copying the raw records.
+        """
+        return super().__iter__()
+
+    def __eq__(self, other):
+        """Compare the built objects with another mapping"""
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        """Compare the built objects with another mapping"""
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        """The representation of the built objects"""
+        return repr(dict(self.items()))
@@ -0,0 +1,401 @@
+#!/usr/bin/python3
+"""Composable queries over the stored objects, planned on their indexes"""
+from copy import copy
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+from models.base_model import Timestamp
+from models.codec import to_epoch
+from models.engine.indexes import SortedIndex, _number, _text
+
+# The comparisons a filter can make, written as <attribute>__<operator>
+OPERATORS = ('eq', 'ne', 'lt', 'le', 'gt', 'ge', 'in')
+
+
+def _value(obj, attribute):
+    """The value of an attribute of an object, as the filters compare it
+
+    A timestamp, or any datetime, is compared as its number of
+    microseconds since the epoch: the number the epoch timestamps hold,
+    so no datetime is built for them.
+
+    Arguments:
+        obj -- The object
+        attribute -- The name of the attribute
+
+    Returns:
+        The value, None if the object doesn't have it
+    """
+    descriptor = getattr(type(obj), attribute, None)
+    if isinstance(descriptor, Timestamp):
+        try:
+            return descriptor.epoch(obj)
+        except AttributeError:
+            return None
+    value = getattr(obj, attribute, None)
+    return to_epoch(value) if type(value) is datetime else value
+
+
+def _operand(operand):
+    """An operand of a filter as the values are compared, see _value()
+    """
+    if type(operand) is datetime:
+        return to_epoch(operand)
+    if isinstance(operand, (list, tuple, set, frozenset)):
+        return type(operand)(_operand(value) for value in operand)
+    return operand
+
+
+def _matches(value, operator, operand, sort_value=_number, indexed=False):
+    """Whether an attribute value passes a filter
+
+    The ordering comparisons are numeric, like the sorted indexes, so
+    a value that isn't a number never passes them. The ids compare as
+    text instead, like the key index. On an attribute with a sorted
+    index the equality comparisons are made the same way, so the
+    string "50" the console stores equals 50 like the index finds it.
+
+    Arguments:
+        value -- The value of the attribute
+        operator -- One of OPERATORS
+        operand -- The value the filter compares with
+
+    Keyword Arguments:
+        sort_value -- The value an ordering comparison compares
+            (default: {_number})
+        indexed -- Whether the attribute has a sorted index
+            (default: {False})
+
+    Returns:
+        True if the value passes
+    """
+    if indexed and operator in ('eq', 'ne', 'in'):
+        value = sort_value(value)
+        if operator == 'in':
+            try:
+                return value is not None and \
+                    any(value == sort_value(item) for item in operand)
+            except TypeError:
+                return False
+        equal = value is not None and value == sort_value(operand)
+        return equal if operator == 'eq' else not equal
+    if operator == 'eq':
+        return value == operand
+    if operator == 'ne':
+        return value != operand
+    if operator == 'in':
+        try:
+            return value in operand
+        except TypeError:
+            return False
+    value, operand = sort_value(value), sort_value(operand)
+    if value is None or operand is None:
+        return False
+    if operator == 'lt':
+        return value < operand
+    if operator == 'le':
+        return value <= operand
+    if operator == 'gt':
+        return value > operand
+    return value >= operand
+
+
+def _sort_key(value):
+    """The sort key of an attribute value, numbers in numeric order come
+    before the other values in text order"""
+    number = _number(value)
+    if number is not None:
+        return 0, number, ''
+    return 1, 0, str(value)
+
+
+class Query():
+    """A query over the stored objects of one class, built by chaining
+
+    `storage.query(Place).filter(price_by_night__lt=100, city_id=x)
+    .order_by('-price_by_night').limit(20)`
+
+    Every method returns a new query, the objects are only looked up
+    once its results are asked for. Only the indexes of the filtered
+    and ordering attributes are used, and built if they aren't yet.
+    The planner reads the candidates from the most selective index a
+    filter can use: a lookup of a hash
+    or sorted index for `eq` and `in`, a range of a sorted index for
+    `lt`, `le`, `gt` and `ge`. Without one, the objects are read in the
+    order of a sorted index on the ordering attribute, so a limit stops
+    early, or every object of the class is scanned. `explain()` tells
+    which plan was chosen.
+
+    Every class has a sorted index of its ids, so with time-ordered
+    ids `order_by('-id').limit(20)` lists the newest objects without
+    sorting them, and `filter(id__lt=<last id of a page>)` starts the
+    next page there.
+    """
+
+    def __init__(self, storage, cls):
+        """Initialize a query of every object of a class
+
+        Arguments:
+            storage -- The storage engine
+            cls -- The class of the objects, or its name
+        """
+        self.storage = storage
+        self.cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__filters = ()
+        self.__order = None
+        self.__limit = None
+        self.__offset = 0
+
+    def filter(self, **criteria):
+        """Only keep the objects passing some filters
+
+        Keyword Arguments:
+            <attribute>=<value> keeps the objects whose attribute equals
+            the value, <attribute>__<operator>=<value> compares with one
+            of OPERATORS, e.g. price_by_night__lt=100 or
+            created_at__ge=datetime(2024, 1, 1)
+
+        Returns:
+            The new query
+        """
+        filters = []
+        for name, operand in criteria.items():
+            attribute, _, operator = name.rpartition('__')
+            if not attribute or operator not in OPERATORS:
+                attribute, operator = name, 'eq'
+            filters.append((attribute, operator, _operand(operand)))
+        query = copy(self)
+        query.__filters = self.__filters + tuple(filters)
+        return query
+
+    def order_by(self, attribute):
+        """Order the objects by an attribute
+
+        Arguments:
+            attribute -- The name of the attribute, prefixed with `-`
+                for the descending order
+
+        Returns:
+            The new query
+        """
+        query = copy(self)
+        query.__order = (attribute.lstrip('-'), attribute.startswith('-'))
+        return query
+
+    def limit(self, count):
+        """Return at most some objects
+
+        Arguments:
+            count -- The most objects to return, all if None
+
+        Returns:
+            The new query
+        """
+        query = copy(self)
+        query.__limit = count
+        return query
+
+    def offset(self, count):
+        """Skip the first objects
+
+        Arguments:
+            count -- The number of objects to skip
+
+        Returns:
+            The new query
+        """
+        query = copy(self)
+        query.__offset = count
+        return query
+
+    def explain(self):
+        """The plan the query would run
+
+        Returns:
+            A dictionary of the class name, the `access` path (`lookup`,
+            `range`, `ordered`, `scan` or `empty`), the `index` it reads,
+            the `estimated_rows` it reads and how the objects are put
+            in `order` (`index`, `sort` or None)
+        """
+        access, attribute, rows, _, order = self.__plan()
+        return {
+            'class': self.cls_name,
+            'access': access,
+            'index': attribute,
+            'estimated_rows': rows,
+            'order': order
+            }
+
+    def __plan(self):
+        """Choose how to read the candidates of the query
+
+        Returns:
+            The access path, the indexed attribute, the estimated number
+            of candidates, a function returning an iterator over the
+            (key, object) pairs of those passing the filters, and how
+            they are ordered
+        """
+        attributes = {attribute for attribute, _, _ in self.__filters}
+        if self.__order is not None:
+            attributes.add(self.__order[0])
+        # A plain listing scans the objects, it needs no index
+        indexes = self.storage.indexes(self.cls_name, *attributes) \
+            if attributes else {}
+        objects = self.storage.all(self.cls_name)
+        with self.storage.lock.read():
+            access, attribute, rows, keys, order = self.__choose(
+                indexes, objects)
+        filters = []
+        for name, operator, operand in self.__filters:
+            index = indexes.get(name)
+            if isinstance(index, SortedIndex):
+                filters.append((name, operator, operand,
+                                index.sort_value, True))
+            else:
+                filters.append((name, operator, operand,
+                                _text if name == 'id' else _number, False))
+        return (access, attribute, rows,
+                lambda: self.__matches(keys(), objects, filters), order)
+
+    def __choose(self, indexes, objects):
+        """Choose how to read the candidates of the query, see __plan()
+
+        Arguments:
+            indexes -- The attribute indexes of the class
+            objects -- The objects of the class, by key
+
+        Returns:
+            The plan, with a function returning an iterator over the
+            keys of the candidates
+        """
+        total = len(objects)
+        plans = [('scan', None, total, lambda: iter(objects))]
+        ranges = {}
+        for attribute, operator, operand in self.__filters:
+            index = indexes.get(attribute)
+            if index is None:
+                continue
+            if operator == 'eq':
+                keys = list(index.find(operand))
+                plans.append(('lookup', attribute, len(keys),
+                              lambda keys=keys: iter(keys)))
+            elif operator == 'in':
+                try:
+                    keys = list(dict.fromkeys(
+                        key for value in operand for key in index.find(value)))
+                except TypeError:
+                    continue
+                plans.append(('lookup', attribute, len(keys),
+                              lambda keys=keys: iter(keys)))
+            elif isinstance(index, SortedIndex) and operator != 'ne':
+                number = index.sort_value(operand)
+                if number is None:
+                    plans.append(('empty', attribute, 0, lambda: iter(())))
+                    continue
+                # Several bounds on one attribute make a single range
+                bounds = ranges.setdefault(attribute, [None, None, True,
+                                                       True])
+                if operator in ('gt', 'ge'):
+                    side = 0
+                    tighter = bounds[0] is None or number > bounds[0]
+                else:
+                    side = 1
+                    tighter = bounds[1] is None or number < bounds[1]
+                if tighter or (number == bounds[side] and
+                               operator in ('gt', 'lt')):
+                    bounds[side] = number
+                    bounds[side + 2] = operator in ('ge', 'le')
+
+        order_attribute, descending = self.__order or (None, False)
+        for attribute, bounds in ranges.items():
+            index = indexes[attribute]
+            reverse = descending and attribute == order_attribute
+            plans.append(('range', attribute, index.count_between(*bounds),
+                          lambda index=index, bounds=bounds, reverse=reverse:
+                          index.between(*bounds, reverse=reverse)))
+
+        access, attribute, rows, keys = min(plans, key=lambda plan: plan[2])
+        if self.__order is None:
+            return access, attribute, rows, keys, None
+        if access == 'range' and attribute == order_attribute:
+            return access, attribute, rows, keys, 'index'
+        index = indexes.get(order_attribute)
+        if access == 'scan' and isinstance(index, SortedIndex) and \
+                len(index) == total:
+            # Every object has a number to order by, walk them in order
+            return ('ordered', order_attribute, rows,
+                    lambda: index.between(reverse=descending), 'index')
+        return access, attribute, rows, keys, 'sort'
+
+    def __iter__(self):
+        """Run the query
+
+        Returns:
+            An iterator over the matching objects, in order
+        """
+        return (obj for _, obj in self.__run())
+
+    def __run(self):
+        """Run the query
+
+        Returns:
+            An iterator over the (key, object) pairs of the matching
+            objects, in order
+        """
+        _, _, _, matches, order = self.__plan()
+        matches = matches()
+        if order == 'sort':
+            attribute, descending = self.__order
+            if attribute == 'id':
+                # The keys sort as their ids, like the key index
+                key = itemgetter(0)
+            else:
+                def key(match):
+                    return _sort_key(_value(match[1], attribute)), match[0]
+            matches = iter(sorted(matches, key=key, reverse=descending))
+        stop = None if self.__limit is None else self.__offset + self.__limit
+        return islice(matches, self.__offset, stop)
+
+    def __matches(self, keys, objects, filters):
+        """The (key, object) pairs of the candidates passing every filter
+
+        Arguments:
+            keys -- The keys of the candidates
+            objects -- The objects of the class, by key
+            filters -- The filters, with the sort_value and indexed
+                arguments of _matches() for their attribute
+        """
+        for key in keys:
+            obj = objects.get(key)
+            if obj is not None and all(
+                    _matches(_value(obj, attribute), operator, operand,
+                             sort_value, indexed)
+                    for attribute, operator, operand, sort_value, indexed
+                    in filters):
+                yield key, obj
+
+    def all(self):
+        """Run the query
+
+        Returns:
+            A dictionary of the matching objects, in order
+        """
+        return dict(self.__run())
+
+    def first(self):
+        """Run the query for its first object
+
+        Returns:
+            The first matching object, None if there isn't any
+        """
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Count the matching objects
+
+        Returns:
+            The number of objects the query returns
+        """
+        if not self.__filters and self.__limit is None:
+            return max(0, self.storage.count(self.cls_name) - self.__offset)
+        return sum(1 for _ in self)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Reader/writer lock guarding the storage engine"""
+import threading
+from contextlib import contextmanager
+
+
+class RWLock():
+    """A lock held by many readers at once or by a single writer
+
+    A waiting writer holds back the new readers, so a steady flow of
+    reads can't starve the writes. The writer can take the lock again,
+    to read or to write, and a reader can read again, but a reader
+    can't become the writer: that would deadlock with another reader
+    doing the same.
+    """
+
+    def __init__(self):
+        """Initialize a released lock"""
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = {}
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading inside the with block"""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock for writing inside the with block"""
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        """Wait until no thread writes, then hold the lock for reading"""
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer != me and me not in self.__readers:
+                while self.__writer is not None or self.__waiting_writers:
+                    self.__condition.wait()
+            self.__readers[me] = self.__readers.get(me, 0) + 1
+
+    def release_read(self):
+        """Release a hold for reading"""
+        me = threading.get_ident()
+        with self.__condition:
+            self.__readers[me] -= 1
+            if not self.__readers[me]:
+                del self.__readers[me]
+                if not self.__readers:
+                    self.__condition.notify_all()
+
+    def acquire_write(self):
+        """Wait until no other thread reads or writes, then hold the lock
+        for writing
+
+        Raises:
+            RuntimeError: If the thread only holds the lock for reading
+        """
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__writes += 1
+                return
+            if me in self.__readers:
+                raise RuntimeError('cannot write while holding the lock'
+                                   ' for reading')
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = me
+            self.__writes = 1
+
+    def release_write(self):
+        """Release a hold for writing"""
+        with self.__condition:
+            self.__writes -= 1
+            if not self.__writes:
+                self.__writer = None
+                self.__condition.notify_all()
@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""Spatial index kept by the storage engine over model coordinates"""
+from heapq import nsmallest
+from math import asin, cos, degrees, floor, pi, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """The great-circle distance between two points
+
+    Arguments:
+        lat1, lon1 -- The first point, in degrees
+        lat2, lon2 -- The second point, in degrees
+
+    Returns:
+        The distance in kilometers
+    """
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def _coordinate(value):
+    """The numeric value of a coordinate, None if it isn't one"""
+    if type(value) in (int, float):
+        return float(value)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None
+
+
+def _on_earth(lat, lon):
+    """Whether a point has a latitude and a longitude in range, NaN and
+    the infinities aren't"""
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+class SpatialIndex():
+    """Index the keys of a class's objects in a grid of latitude and
+        longitude cells
+
+    Models declare their coordinate attributes in their `spatial_index`
+    class attribute, e.g. `spatial_index = ('latitude', 'longitude')`.
+    A query only looks at the cells its area overlaps.
+    """
+
+    def __init__(self, cls, latitude='latitude', longitude='longitude',
+                 cell_size=0.1):
+        """Initialize an empty index
+
+        Arguments:
+            cls -- The indexed class, its attributes are the defaults
+
+        Keyword Arguments:
+            latitude -- The name of the latitude attribute
+                (default: {'latitude'})
+            longitude -- The name of the longitude attribute
+                (default: {'longitude'})
+            cell_size -- The side of a grid cell, in degrees
+                (default: {0.1})
+        """
+        self.cls = cls
+        self.latitude = latitude
+        self.longitude = longitude
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+
+    def position_of(self, obj):
+        """The coordinates of an object
+
+        Arguments:
+            obj -- An instance, or its raw record (a plain dict)
+
+        Returns:
+            A (latitude, longitude) tuple, None if either is missing or
+            out of range
+        """
+        position = []
+        for attribute in (self.latitude, self.longitude):
+            if type(obj) is dict and attribute in obj:
+                value = obj[attribute]
+            elif type(obj) is dict:
+                value = self.cls.default(attribute)
+            else:
+                value = getattr(obj, attribute, None)
+            position.append(_coordinate(value))
+        lat, lon = position
+        if lat is None or lon is None or not -90 <= lat <= 90 or \
+                not -180 <= lon <= 180:
+            return None
+        return lat, lon
+
+    def cell_of(self, lat, lon):
+        """The grid cell of a point"""
+        return floor(lat / self.cell_size), floor(lon / self.cell_size)
+
+    def add(self, key, obj):
+        """Index an object, moving it if its position changed
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object or its raw record
+        """
+        position = self.position_of(obj)
+        if key in self.positions:
+            if self.positions[key] == position:
+                return
+            self.remove(key)
+        if position is None:
+            return
+        self.positions[key] = position
+        self.cells.setdefault(self.cell_of(*position), {})[key] = None
+
+    def build(self, items):
+        """Index many objects at once, see add()
+
+        Arguments:
+            items -- The (key, object or raw record) pairs
+        """
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Forget an object
+
+        Arguments:
+            key -- The key of the object
+        """
+        if key not in self.positions:
+            return
+        cell = self.cell_of(*self.positions.pop(key))
+        keys = self.cells[cell]
+        del keys[key]
+        if not keys:
+            del self.cells[cell]
+
+    def __len__(self):
+        """The number of indexed objects"""
+        return len(self.positions)
+
+    def __candidates(self, south, west, north, east):
+        """The keys in the cells overlapping a box, west <= east"""
+        low_row, low_col = self.cell_of(south, west)
+        high_row, high_col = self.cell_of(north, east)
+        if (high_row - low_row + 1) * (high_col - low_col + 1) > \
+                len(self.cells):
+            # The box covers more cells than are used, visit those only
+            for (row, col), keys in self.cells.items():
+                if low_row <= row <= high_row and low_col <= col <= high_col:
+                    yield from keys
+            return
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                yield from self.cells.get((row, col), ())
+
+    def in_box(self, south, west, north, east):
+        """The keys of the objects inside a box
+
+        A box whose west edge is east of its east edge crosses the
+        180th meridian.
+
+        Arguments:
+            south, west, north, east -- The edges of the box, in degrees,
+                cut to the valid latitudes and longitudes
+
+        Returns:
+            A list of the keys, empty if an edge isn't a number
+        """
+        if any(edge != edge for edge in (south, west, north, east)):
+            return []
+        south, north = max(south, -90.0), min(north, 90.0)
+        west, east = min(max(west, -180.0), 180.0), \
+            min(max(east, -180.0), 180.0)
+        if west <= east:
+            spans = ((west, east),)
+        else:
+            spans = ((west, 180.0), (-180.0, east))
+        found = []
+        for low, high in spans:
+            for key in self.__candidates(south, low, north, high):
+                lat, lon = self.positions[key]
+                if south <= lat <= north and low <= lon <= high:
+                    found.append(key)
+        return found
+
+    def within(self, lat, lon, radius):
+        """The keys of the objects within a distance of a point
+
+        Arguments:
+            lat, lon -- The point, in degrees
+            radius -- The distance, in kilometers
+
+        Returns:
+            A list of (key, distance) tuples, nearest first, empty if
+            the point is out of range or the radius is negative or not
+            a number
+        """
+        if not _on_earth(lat, lon) or not radius >= 0:
+            return []
+        # The box around the circle, widened a little so the points
+        #   right on the circle aren't lost to rounding
+        angle = radius / EARTH_RADIUS_KM * (1 + 1e-9)
+        dlat = degrees(angle)
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        scale = cos(radians(lat))
+        if angle >= pi / 2 or south == -90 or north == 90 or \
+                sin(angle) >= scale:
+            west, east = -180.0, 180.0
+        else:
+            dlon = degrees(asin(sin(angle) / scale))
+            west, east = lon - dlon, lon + dlon
+            west = west + 360 if west < -180 else west
+            east = east - 360 if east > 180 else east
+        found = []
+        for key in self.in_box(south, west, north, east):
+            distance = haversine(lat, lon, *self.positions[key])
+            if distance <= radius:
+                found.append((key, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, lat, lon, k):
+        """The keys of the objects nearest to a point
+
+        The rings of cells around the point are visited until k objects
+        are found, then a radius query of the farthest of them makes
+        sure no nearer object was in an unvisited cell. Once the rings
+        cover more cells than are used, every object is measured.
+
+        Arguments:
+            lat, lon -- The point, in degrees
+            k -- The number of objects
+
+        Returns:
+            A list of up to k (key, distance) tuples, nearest first,
+            empty if the point is out of range
+        """
+        if k <= 0 or not _on_earth(lat, lon):
+            return []
+        row, col = self.cell_of(lat, lon)
+        half = round(180 / self.cell_size)
+        seen = []
+        ring = 0
+        while len(seen) < k:
+            if (2 * ring + 1) ** 2 > len(self.cells):
+                return nsmallest(
+                    k, ((key, haversine(lat, lon, *position))
+                        for key, position in self.positions.items()),
+                    key=lambda item: item[1])
+            cells = set()
+            for cell_row in range(row - ring, row + ring + 1):
+                step = 1 if abs(cell_row - row) == ring else 2 * ring
+                for cell_col in range(col - ring, col + ring + 1, step):
+                    # Wrap the columns around the 180th meridian
+                    cells.add((cell_row, (cell_col + half) % (2 * half)
+                               - half))
+            for cell in cells:
+                seen.extend(self.cells.get(cell, ()))
+            ring += 1
+        distances = sorted(haversine(lat, lon, *self.positions[key])
+                           for key in seen)
+        return self.within(lat, lon, distances[k - 1])[:k]
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+"""Full-text inverted index kept by the storage engine over model text"""
+import re
+from heapq import nlargest
+from math import log
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split a text into its lowercase words
+
+    Arguments:
+        text -- The text
+
+    Returns:
+        The list of words, in order
+    """
+    return _WORD.findall(text.lower())
+
+
+class TextIndex():
+    """Index the keys of a class's objects by the words of some text
+        attributes
+
+    Models declare the attributes to index in their `text_indexes`
+    class attribute, e.g. `text_indexes = ('name', 'description')`.
+    The attributes of an object are indexed as one document: every word
+    has a posting list of the keys it appears in, with the number of
+    times it does.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, cls, attributes):
+        """Initialize an empty index
+
+        Arguments:
+            cls -- The indexed class, its attributes are the defaults
+            attributes -- The names of the indexed attributes
+        """
+        self.cls = cls
+        self.attributes = tuple(attributes)
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.terms = {}
+
+    def text_of(self, obj):
+        """The indexed text of an object
+
+        Arguments:
+            obj -- An instance, or its raw record (a plain dict)
+
+        Returns:
+            The string values of the attributes, joined
+        """
+        texts = []
+        for attribute in self.attributes:
+            if type(obj) is dict and attribute in obj:
+                value = obj[attribute]
+            elif type(obj) is dict:
+                value = self.cls.default(attribute)
+            else:
+                value = getattr(obj, attribute, None)
+            if isinstance(value, str):
+                texts.append(value)
+        return ' '.join(texts)
+
+    def add(self, key, obj):
+        """Index an object, replacing its previous words
+
+        Arguments:
+            key -- The key of the object
+            obj -- The object or its raw record
+        """
+        words = tokenize(self.text_of(obj))
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        if key in self.lengths:
+            if self.terms[key] == counts:
+                return
+            self.remove(key)
+        for word, count in counts.items():
+            self.postings.setdefault(word, {})[key] = count
+        self.terms[key] = counts
+        self.lengths[key] = len(words)
+        self.total_length += len(words)
+
+    def build(self, items):
+        """Index many objects at once, see add()
+
+        Arguments:
+            items -- The (key, object or raw record) pairs
+        """
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Forget an object
+
+        Arguments:
+            key -- The key of the object
+        """
+        if key not in self.lengths:
+            return
+        for word in self.terms.pop(key):
+            keys = self.postings[word]
+            del keys[key]
+            if not keys:
+                del self.postings[word]
+        self.total_length -= self.lengths.pop(key)
+
+    def __len__(self):
+        """The number of indexed objects"""
+        return len(self.lengths)
+
+    def match(self, query):
+        """The keys of the objects matching a boolean query
+
+        The words of a query must all appear, a word starting with `-`
+        must not, and `OR` separates alternatives:
+        `pool garden -noisy OR beach`.
+
+        Arguments:
+            query -- The query
+
+        Returns:
+            The list of the matching keys
+        """
+        found = {}
+        for alternative in re.split(r'\s+OR\s+', query.strip()):
+            required, excluded = [], []
+            for word in alternative.split():
+                if word.startswith('-'):
+                    excluded.extend(tokenize(word[1:]))
+                else:
+                    required.extend(tokenize(word))
+            if not required:
+                continue
+            postings = sorted((self.postings.get(word, {})
+                               for word in required), key=len)
+            for key in postings[0]:
+                if all(key in keys for keys in postings[1:]) and \
+                        not any(key in self.postings.get(word, ())
+                                for word in excluded):
+                    found[key] = None
+        return list(found)
+
+    def rank(self, query, k=None, keys=None):
+        """The keys of the objects best matching some words, by BM25
+
+        Arguments:
+            query -- The words to look for, any of them matches
+
+        Keyword Arguments:
+            k -- The number of objects, all if None (default: {None})
+            keys -- Only rank these keys, all if None (default: {None})
+
+        Returns:
+            A list of (key, score) tuples, best first
+        """
+        if not self.lengths:
+            return []
+        count = len(self.lengths)
+        average = self.total_length / count or 1
+        scores = {} if keys is None else dict.fromkeys(keys, 0.0)
+        for word in set(tokenize(query)):
+            postings = self.postings.get(word)
+            if not postings:
+                continue
+            idf = log((count - len(postings) + 0.5) /
+                      (len(postings) + 0.5) + 1)
+            for key, frequency in postings.items():
+                if keys is not None and key not in scores:
+                    continue
+                norm = self.k1 * (1 - self.b +
+                                  self.b * self.lengths[key] / average)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+        if k is None:
+            return sorted(scores.items(), key=lambda item: -item[1])
+        return nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def search(self, query, k=None):
+        """The keys of the objects matching a boolean query, by relevance
+
+        Arguments:
+            query -- The query, see match()
+
+        Keyword Arguments:
+            k -- The number of objects, all if None (default: {None})
+
+        Returns:
+            A list of (key, score) tuples, best first
+        """
+        words = ' '.join(word for word in query.split()
+                         if word != 'OR' and not word.startswith('-'))
+        return self.rank(words, k, self.match(query))
+
+    def to_dict(self):
+        """The dictionary representation of the index, to persist it
+
+        Returns:
+            The attributes, posting lists and document lengths
+        """
+        return {
+            'attributes': list(self.attributes),
+            'postings': self.postings,
+            'lengths': self.lengths
+            }
+
+    def load(self, dictionary):
+        """Replace the content of the index by a persisted one
+
+        Arguments:
+            dictionary -- The dictionary representation of an index
+        """
+        self.postings = dictionary['postings']
+        self.lengths = dictionary['lengths']
+        self.total_length = sum(self.lengths.values())
+        self.terms = {key: {} for key in self.lengths}
+        for word, keys in self.postings.items():
+            for key, count in keys.items():
+                self.terms[key][word] = count
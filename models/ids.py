@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""The generators of the ids of the new objects
+
+`uuid4` is random, the default. `uuid7` and `ulid` start with the
+millisecond they were made at, so their text sorts in the order they
+were made, and within one process they are monotonic: an id made in
+the same millisecond as the previous one, or after the clock went
+back, increments it instead. The objects of a class are then listed
+newest first, or a page after another, in the order of their ids
+instead of sorting them by date, see the Query of the storage.
+
+A deployment chooses its generator with HBNB_MODEL_IDS, a name of
+GENERATORS or the dotted path of a function of its own. The ids of
+every format are read the same, so the objects saved before it was
+changed keep theirs; those don't sort by date, only the new ones do.
+"""
+import os
+import threading
+import time
+import uuid
+from importlib import import_module
+
+# The digits of the ULIDs, Crockford's base32 in ascending order
+CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+_lock = threading.Lock()
+# The millisecond and the counter of the last uuid7, and the
+#   millisecond and the random part of the last ULID
+_last_uuid7 = [0, 0]
+_last_ulid = [0, 0]
+
+
+def _milliseconds():
+    """The milliseconds since the epoch, from the clock"""
+    return time.time_ns() // 1000000
+
+
+def uuid4():
+    """A random id, as the models always had
+
+    Returns:
+        Its canonical text, e.g. '9c1b8c3e-5b0e-4f8e-a0f4-1c2d3e4f5a6b'
+    """
+    return str(uuid.uuid4())
+
+
+def uuid7():
+    """A time-ordered UUID, version 7 of RFC 9562
+
+    The millisecond takes its first 48 bits and a counter the 12 bits
+    after the version. The counter starts at a random value below 2048
+    every millisecond, so it rarely overflows, and the other 62 bits
+    are random.
+
+    Returns:
+        Its canonical text, in lowercase hexadecimal like uuid4()
+    """
+    random = int.from_bytes(os.urandom(10), 'big')
+    with _lock:
+        milliseconds = max(_milliseconds(), _last_uuid7[0])
+        if milliseconds == _last_uuid7[0]:
+            counter = _last_uuid7[1] + 1
+            if counter > 0xfff:
+                milliseconds, counter = milliseconds + 1, random >> 69
+        else:
+            counter = random >> 69
+        _last_uuid7[:] = milliseconds, counter
+    value = (milliseconds << 80 | 0x7000 << 64 | counter << 64 |
+             0b10 << 62 | random & (1 << 62) - 1)
+    text = f'{value:032x}'
+    return f'{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}'
+
+
+def ulid():
+    """A time-ordered ULID
+
+    The millisecond takes its first 48 bits and a random number the
+    other 80, incremented instead in the same millisecond.
+
+    Returns:
+        Its 26 characters of Crockford's base32
+    """
+    with _lock:
+        milliseconds = max(_milliseconds(), _last_ulid[0])
+        if milliseconds == _last_ulid[0]:
+            random = _last_ulid[1] + 1
+            if random >> 80:
+                milliseconds += 1
+                random = int.from_bytes(os.urandom(10), 'big')
+        else:
+            random = int.from_bytes(os.urandom(10), 'big')
+        _last_ulid[:] = milliseconds, random
+    value = milliseconds << 80 | random
+    return ''.join(CROCKFORD[value >> shift & 31]
+                   for shift in range(125, -1, -5))
+
+
+# The generators a deployment can name
+GENERATORS = {
+    'uuid4': uuid4,
+    'uuid7': uuid7,
+    'ulid': ulid
+    }
+
+
+def generator(name):
+    """The generator of a name
+
+    Arguments:
+        name -- A name of GENERATORS, or the dotted path of a function
+            returning a new id, e.g. 'mypackage.ids.snowflake'
+
+    Returns:
+        The function
+
+    Raises:
+        ValueError: If there isn't any such generator
+    """
+    if name in GENERATORS:
+        return GENERATORS[name]
+    module, _, function = name.rpartition('.')
+    try:
+        return getattr(import_module(module), function)
+    except (ImportError, AttributeError, ValueError):
+        raise ValueError(
+            f"unknown id generator {name!r}, use one of"
+            f" {', '.join(GENERATORS)} or the path of a function") from None
@@ -6,14 +6,21 @@ from models.base_model import BaseModel
 class Place(BaseModel):
     """Initialize Place class"""
 
-    city_id = ''
-    user_id = ''
-    name = ''
-    description = ''
-    number_rooms = 0
-    number_bathrooms = 0
-    max_guest = 0
-    price_by_night = 0
-    latitude = 0.0
-    longitude = 0.0
-    amenity_ids = list()
+    hash_indexes = ('city_id', 'user_id')
+    interned = ('city_id', 'user_id')
+    sorted_indexes = ('price_by_night', 'max_guest', 'number_rooms',
+                      'number_bathrooms')
+    spatial_index = ('latitude', 'longitude')
+    text_indexes = ('name', 'description')
+
+    city_id: str = ''
+    user_id: str = ''
+    name: str = ''
+    description: str = ''
+    number_rooms: int = 0
+    number_bathrooms: int = 0
+    max_guest: int = 0
+    price_by_night: int = 0
+    latitude: float = 0.0
+    longitude: float = 0.0
+    amenity_ids: list = list()
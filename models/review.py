@@ -6,6 +6,10 @@ from models.base_model import BaseModel
 class Review(BaseModel):
     """Initialize Review class"""
 
-    place_id = ''
-    user_id = ''
-    text = ''
+    hash_indexes = ('place_id', 'user_id')
+    interned = ('place_id', 'user_id')
+    text_indexes = ('text',)
+
+    place_id: str = ''
+    user_id: str = ''
+    text: str = ''
@@ -6,4 +6,4 @@ from models.base_model import BaseModel
 class State(BaseModel):
     """Initialize State class"""
 
-    name = ''
+    name: str = ''
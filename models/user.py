@@ -9,7 +9,7 @@ class User(BaseModel):
     Arguments:
         BaseModel -- Inherts BaseModel's attributes and methods
     """
-    email = ''
-    password = ''
-    first_name = ''
-    last_name = ''
+    email: str = ''
+    password: str = ''
+    first_name: str = ''
+    last_name: str = ''
@@ -5,3 +5,304 @@ import datetime
 import json
 import cmd
 import re
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.place import Place
+import models
+
+
+class TestConsoleSpatial(unittest.TestCase):
+    """Testing the radius, bbox and nearest commands of the console.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a place in New York and one in Paris
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.places = []
+        for latitude, longitude in ((40.7128, -74.0060), (48.8566, 2.3522)):
+            place = Place()
+            place.latitude = latitude
+            place.longitude = longitude
+            place.save()
+            self.places.append(place)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def run_command(self, line):
+        """Run a console command
+
+        Arguments:
+            line -- The command line
+
+        Returns:
+            What the command printed
+        """
+        with patch('sys.stdout', new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue()
+
+    def test_radius(self):
+        """Verifies that radius prints the places within the distance.
+        """
+        output = self.run_command('radius Place 40.7 -74.0 10')
+        self.assertIn(self.places[0].id, output)
+        self.assertNotIn(self.places[1].id, output)
+        self.assertEqual('', self.run_command('radius Place 0 0 10'))
+
+    def test_bbox(self):
+        """Verifies that bbox prints the places inside the box.
+        """
+        output = self.run_command('bbox Place 48 2 49 3')
+        self.assertIn(self.places[1].id, output)
+        self.assertNotIn(self.places[0].id, output)
+
+    def test_nearest(self):
+        """Verifies that nearest prints the nearest places, nearest first.
+        """
+        output = self.run_command('nearest Place 48 2 2')
+        self.assertLess(output.index(self.places[1].id),
+                        output.index(self.places[0].id))
+        output = self.run_command('nearest Place 48 2 1')
+        self.assertNotIn(self.places[0].id, output)
+
+    def test_missing_arguments(self):
+        """Ensures the missing class or coordinates are reported.
+        """
+        self.assertEqual("** class name missing **\n",
+                         self.run_command('radius'))
+        self.assertEqual("** class doesn't exist **\n",
+                         self.run_command('bbox Spot 0 0 1 1'))
+        self.assertEqual("** coordinates missing **\n",
+                         self.run_command('nearest Place 1 1'))
+
+    def test_invalid_numbers(self):
+        """Ensures the numbers that aren't finite, out of range or not a
+        count are reported instead of raising.
+        """
+        for line, error in (
+                ('nearest Place 1 1 nan', 'invalid count'),
+                ('nearest Place 1 1 inf', 'invalid count'),
+                ('nearest Place 1 1 2.5', 'invalid count'),
+                ('nearest Place 1 1 -1', 'invalid count'),
+                ('bbox Place nan 0 1 1', 'invalid coordinates'),
+                ('bbox Place 0 0 1 east', 'invalid coordinates'),
+                ('bbox Place 0 -inf 1 1', 'invalid coordinates'),
+                ('radius Place 1e308 0 5', 'latitude out of range'),
+                ('radius Place 0 181 5', 'longitude out of range'),
+                ('radius Place 0 0 nan', 'invalid distance'),
+                ('radius Place 0 0 -5', 'invalid distance')):
+            self.assertEqual(f"** {error} **\n", self.run_command(line))
+
+
+class TestConsoleSearch(unittest.TestCase):
+    """Testing the search command of the console.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store two described places
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.places = []
+        for name in ('Quiet garden flat', 'Noisy beach house'):
+            place = Place()
+            place.name = name
+            place.save()
+            self.places.append(place)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def run_command(self, line):
+        """Run a console command, see TestConsoleSpatial.run_command()
+        """
+        with patch('sys.stdout', new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue()
+
+    def test_search(self):
+        """Verifies that search prints the places matching the query.
+        """
+        output = self.run_command('search Place garden')
+        self.assertIn(self.places[0].id, output)
+        self.assertNotIn(self.places[1].id, output)
+        output = self.run_command('search Place flat OR house -noisy')
+        self.assertIn(self.places[0].id, output)
+        self.assertNotIn(self.places[1].id, output)
+        self.assertEqual('', self.run_command('search Place castle'))
+
+    def test_missing_arguments(self):
+        """Ensures the missing class or query are reported.
+        """
+        self.assertEqual("** class name missing **\n",
+                         self.run_command('search'))
+        self.assertEqual("** class doesn't exist **\n",
+                         self.run_command('search Spot garden'))
+        self.assertEqual("** query missing **\n",
+                         self.run_command('search Place'))
+
+
+class TestConsoleTransaction(unittest.TestCase):
+    """Testing the begin, commit and rollback commands of the console.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """End any transaction left and reset the storage file name to
+        its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+        models.storage.rollback()
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def run_command(self, line):
+        """Run a console command, see TestConsoleSpatial.run_command()
+        """
+        with patch('sys.stdout', new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue()
+
+    def saved_keys(self):
+        """The keys saved in the storage file"""
+        try:
+            with open('file.json', 'r') as file:
+                return list(json.load(file))
+        except FileNotFoundError:
+            return []
+
+    def test_commit(self):
+        """Verifies that the saves made in a transaction are written at
+        its commit.
+        """
+        self.assertEqual('', self.run_command('begin'))
+        obj_id = self.run_command('create Place').strip()
+        self.assertNotIn(f'Place.{obj_id}', self.saved_keys())
+        self.assertEqual('', self.run_command('commit'))
+        self.assertIn(f'Place.{obj_id}', self.saved_keys())
+        self.assertFalse(models.storage.in_batch)
+
+    def test_rollback(self):
+        """Verifies that the changes made in a transaction are discarded
+        by its rollback.
+        """
+        kept_id = self.run_command('create Place').strip()
+        self.assertEqual('', self.run_command('begin'))
+        obj_id = self.run_command('create Place').strip()
+        self.run_command(f'destroy Place {kept_id}')
+        self.assertEqual('', self.run_command('rollback'))
+        self.assertIn(f'Place.{kept_id}', models.storage.all())
+        self.assertNotIn(f'Place.{obj_id}', models.storage.all())
+        self.assertEqual([f'Place.{kept_id}'], self.saved_keys())
+        self.assertFalse(models.storage.in_batch)
+
+    def test_errors(self):
+        """Ensures a transaction can't be begun twice, nor committed or
+        rolled back when none is in progress.
+        """
+        self.assertEqual("** no transaction in progress **\n",
+                         self.run_command('commit'))
+        self.assertEqual("** no transaction in progress **\n",
+                         self.run_command('rollback'))
+        self.run_command('begin')
+        self.assertEqual("** transaction already in progress **\n",
+                         self.run_command('begin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,12 +8,37 @@ objects in a Python application.
 import unittest
 import os
 import datetime
-from models.base_model import BaseModel
+import subprocess
+import sys
+import tempfile
+import uuid
+from models.base_model import BaseModel, NO_DEFAULT
+from models.place import Place
 import models
 from time import sleep
 import json
 
 
+def other_process(code, **environment):
+    """Run some code in another process and directory
+
+    Arguments:
+        code -- The code, its assertions are the test
+
+    Keyword Arguments:
+        The environment variables of the process
+    """
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    environment = dict(os.environ, PYTHONPATH=root, **environment)
+    with tempfile.TemporaryDirectory() as directory:
+        subprocess.run(
+            [sys.executable, '-c',
+             'import datetime\nfrom models import storage\n'
+             'from models.place import Place\n' + code],
+            env=environment, cwd=directory, check=True)
+
+
 class TestBaseModelInit(unittest.TestCase):
     """Test the constructor of the BaseModel class
 
@@ -161,6 +186,26 @@ class TestBaseModelInit(unittest.TestCase):
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
 
+    def test_timestamp_parsed_on_first_read(self):
+        """Tests that a timestamp held as an ISO string is parsed the
+        first time it's read, keeping its place in __dict__.
+        """
+        date = datetime.datetime(2024, 1, 14, 17, 7, 0, 0)
+        obj = BaseModel()
+        obj.__dict__['created_at'] = date.isoformat()
+        self.assertEqual(date.isoformat(), obj.to_dict()['created_at'])
+        self.assertEqual(date, obj.created_at)
+        self.assertEqual(date, obj.__dict__['created_at'])
+        self.assertEqual(['id', 'created_at', 'updated_at'],
+                         list(obj.__dict__))
+
+    def test_missing_timestamp(self):
+        """Tests that a missing timestamp raises an AttributeError.
+        """
+        obj = BaseModel(id='1809')
+        with self.assertRaises(AttributeError):
+            obj.created_at
+
 
 class TestBaseModelStr(unittest.TestCase):
     """This class contains test cases for the __str__ method of
@@ -394,5 +439,231 @@ class TestBaseModelToDict(unittest.TestCase):
             self.assertEqual(dict1[key], value)
 
 
+class TestBaseModelSchema(unittest.TestCase):
+    """Test the schemas declared by the models
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def test_schema(self):
+        """Tests that the schema holds the declared attributes, the
+        inherited ones first.
+        """
+        self.assertEqual((str, NO_DEFAULT), Place.schema['id'])
+        self.assertEqual((datetime.datetime, NO_DEFAULT),
+                         Place.schema['created_at'])
+        self.assertEqual((int, 0), Place.schema['number_rooms'])
+        self.assertEqual(['id', 'created_at', 'updated_at', 'city_id'],
+                         list(Place.schema)[:4])
+        self.assertNotIn('city_id', BaseModel.schema)
+
+    def test_default(self):
+        """Tests the defaults of the attributes.
+        """
+        self.assertEqual('', Place.default('city_id'))
+        self.assertEqual(0.0, Place.default('latitude'))
+        self.assertIsNone(Place.default('id'))
+        self.assertIsNone(Place.default('unknown'))
+
+
+class TestBaseModelCompact(unittest.TestCase):
+    """Test the compact models, keeping their attributes in slots
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def compact(self, code):
+        """Run some code with compact models, see other_process()"""
+        other_process(code, HBNB_COMPACT_MODELS='1')
+
+    def test_slots(self):
+        """Tests that the declared attributes are in slots, reading as
+        their defaults until set.
+        """
+        self.compact(
+            'place = Place()\n'
+            'assert not hasattr(place, "__dict__")\n'
+            'assert place.number_rooms == 0 and place.amenity_ids == []\n'
+            'place.name = "Home"\n'
+            'assert set(place.to_dict()) == {"__class__", "id",'
+            ' "created_at", "updated_at", "name"}\n'
+            'assert str(place).endswith("\'name\': \'Home\'}")\n'
+            'del place.name\n'
+            'assert place.name == ""\n')
+
+    def test_undeclared_attributes(self):
+        """Tests that the attributes which aren't declared are kept.
+        """
+        self.compact(
+            'place = Place()\n'
+            'place.rating = 4\n'
+            'assert place.rating == 4\n'
+            'assert place.to_dict()["rating"] == 4\n'
+            'del place.rating\n'
+            'assert not hasattr(place, "rating")\n')
+
+    def test_create(self):
+        """Tests that an instance is recreated from its dictionary.
+        """
+        self.compact(
+            'place = Place()\n'
+            'place.city_id = "1"\n'
+            'place.rating = 4\n'
+            'copy = Place(**place.to_dict())\n'
+            'assert copy.to_dict() == place.to_dict()\n'
+            'assert type(copy.created_at) is datetime.datetime\n')
+
+    def test_save_reload(self):
+        """Tests that the instances are saved and reloaded, from the JSON
+        and from a binary snapshot.
+        """
+        self.compact(
+            'from models.engine.file_storage import FileStorage\n'
+            'place = Place()\n'
+            'place.price_by_night = 80\n'
+            'place.rating = 4\n'
+            'record = place.to_dict()\n'
+            'storage = FileStorage(binary=True)\n'
+            'storage.save()\n'
+            'for binary in (False, True):\n'
+            '    FileStorage._FileStorage__objects = {}\n'
+            '    FileStorage(binary=binary).reload()\n'
+            '    place = storage.get(Place, place.id)\n'
+            '    assert place.to_dict() == record\n'
+            '    assert storage.query(Place).filter(price_by_night__lt=100)'
+            '.count() == 1\n')
+
+    def test_rollback(self):
+        """Tests that a rollback restores the attributes.
+        """
+        self.compact(
+            'place = Place()\n'
+            'place.name = "Home"\n'
+            'record = place.to_dict()\n'
+            'with storage.batch():\n'
+            '    place.name = "Other"\n'
+            '    place.rating = 4\n'
+            '    storage.rollback()\n'
+            'assert place.to_dict() == record\n')
+
+
+class TestBaseModelEpoch(unittest.TestCase):
+    """Test the epoch timestamps, held and written as numbers
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def epoch(self, code):
+        """Run some code with epoch timestamps, see other_process()"""
+        other_process(code, HBNB_STORAGE_TIMESTAMPS='epoch')
+
+    def test_held_as_number(self):
+        """Tests that the timestamps are numbers, read as datetimes.
+        """
+        self.epoch(
+            'place = Place()\n'
+            'record = place.to_dict()\n'
+            'assert type(record["created_at"]) is int\n'
+            'assert type(place.created_at) is datetime.datetime\n'
+            'assert place._attributes()["created_at"] =='
+            ' record["created_at"]\n'
+            'copy = Place(**record)\n'
+            'assert copy.created_at == place.created_at\n'
+            'assert copy.to_dict() == record\n')
+
+    def test_save_reload(self):
+        """Tests that the numbers are written, and reloaded.
+        """
+        self.epoch(
+            'import json\n'
+            'place = Place()\n'
+            'place.save()\n'
+            'with open("file.json") as file:\n'
+            '    saved = json.load(file)[f"Place.{place.id}"]\n'
+            'assert type(saved["updated_at"]) is int\n'
+            'storage.reload()\n'
+            'reloaded = storage.get(Place, place.id)\n'
+            'assert reloaded is not place\n'
+            'assert reloaded.to_dict() == place.to_dict()\n'
+            'assert reloaded.updated_at == place.updated_at\n')
+
+    def test_legacy_file(self):
+        """Tests that a file of ISO timestamps is read, and rewritten with
+        numbers.
+        """
+        self.epoch(
+            'import json\n'
+            'with open("file.json", "w") as file:\n'
+            '    json.dump({"Place.1": {"id": "1", "__class__": "Place",'
+            ' "created_at": "2024-01-14T17:07:00",'
+            ' "updated_at": "2024-01-14T17:07:00.500000"}}, file)\n'
+            'storage.reload()\n'
+            'place = storage.get(Place, "1")\n'
+            'date = datetime.datetime(2024, 1, 14, 17, 7)\n'
+            'assert place.created_at == date\n'
+            'assert storage.query(Place).filter(created_at__lt=date +'
+            ' datetime.timedelta(seconds=1)).count() == 1\n'
+            'storage.save()\n'
+            'with open("file.json") as file:\n'
+            '    saved = json.load(file)["Place.1"]\n'
+            'assert saved["created_at"] == 1705252020000000\n'
+            'assert saved["updated_at"] == 1705252020500000\n')
+
+    def test_str(self):
+        """Tests that printing an instance leaves its numbers.
+        """
+        self.epoch(
+            'place = Place()\n'
+            'assert str(place).count("datetime.datetime(") == 2\n'
+            'assert type(place._attributes()["created_at"]) is int\n'
+            'assert type(place.to_dict()["updated_at"]) is int\n')
+
+
+class TestBaseModelIds(unittest.TestCase):
+    """Test the choice of the generator of the ids
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def test_default(self):
+        """Tests that the ids are random UUIDs by default.
+        """
+        self.assertEqual(4, uuid.UUID(BaseModel().id).version)
+
+    def test_time_ordered(self):
+        """Tests that the uuid7 ids are in the order the objects were
+        made, and the uuid4 ids of a file written before still read.
+        """
+        other_process(
+            'import json, uuid\n'
+            'with open("file.json", "w") as file:\n'
+            '    json.dump({"Place.ffffffff-0000-4000-8000-000000000000":'
+            ' {"id": "ffffffff-0000-4000-8000-000000000000",'
+            ' "__class__": "Place", "created_at": "2024-01-14T17:07:00",'
+            ' "updated_at": "2024-01-14T17:07:00"}}, file)\n'
+            'storage.reload()\n'
+            'places = [Place() for _ in range(100)]\n'
+            'assert uuid.UUID(places[0].id).version == 7\n'
+            'storage.save()\n'
+            'storage.reload()\n'
+            'assert storage.get(Place, "ffffffff-0000-4000-8000-'
+            '000000000000") is not None\n'
+            'newest = storage.query(Place).filter(id__lt="f")'
+            '.order_by("-id").limit(10)\n'
+            'assert [place.id for place in newest] =='
+            ' [place.id for place in places[:-11:-1]]\n',
+            HBNB_MODEL_IDS='uuid7')
+
+    def test_unknown(self):
+        """Tests that an unknown generator is refused at start.
+        """
+        with self.assertRaises(subprocess.CalledProcessError):
+            other_process('', HBNB_MODEL_IDS='uuid1')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the conversions
+compiled for every model class.
+"""
+import datetime
+import unittest
+from models.base_model import BaseModel
+from models.codec import from_epoch, to_epoch
+from models.place import Place
+from models.user import User
+
+
+class Custom(BaseModel):
+    """A model converting itself"""
+
+    def to_dict(self):
+        """A dictionary of its id only"""
+        return {'id': self.id}
+
+
+class CustomChild(Custom):
+    """A subclass of a model converting itself"""
+
+    name: str = ''
+
+
+class TestCompiledCodecs(unittest.TestCase):
+    """Testing the compiled to_dict() and create() methods.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    date = datetime.datetime(2024, 1, 14, 17, 7, 0, 0)
+
+    def test_compiled_per_class(self):
+        """Ensures every class has its own compiled conversions.
+        """
+        self.assertTrue(Place.to_dict.compiled)
+        self.assertTrue(Place.create.compiled)
+        self.assertIsNot(Place.to_dict, User.to_dict)
+        self.assertEqual('Place.to_dict', Place.to_dict.__qualname__)
+
+    def test_own_method_kept(self):
+        """Ensures a method a class defines isn't replaced, for its
+        subclasses either.
+        """
+        obj = CustomChild(id='1', name='x')
+        self.assertEqual({'id': '1'}, obj.to_dict())
+        self.assertTrue(CustomChild.create.compiled)
+
+    def test_to_dict(self):
+        """Ensures the timestamps are converted, unparsed ones kept.
+        """
+        place = Place(id='1', created_at=self.date.isoformat(),
+                      updated_at=self.date.isoformat(), name='Home')
+        place.updated_at = self.date
+        place._load({'created_at': '2024-01-14T17:07:00'})
+        self.assertEqual({'id': '1', 'created_at': '2024-01-14T17:07:00',
+                          'updated_at': self.date.isoformat(),
+                          'name': 'Home', '__class__': 'Place'},
+                         place.to_dict())
+
+    def test_to_dict_missing_timestamp(self):
+        """Ensures a missing timestamp raises an AttributeError.
+        """
+        with self.assertRaises(AttributeError):
+            Place(id='1').to_dict()
+
+    def test_create(self):
+        """Ensures the timestamps are parsed and the class skipped.
+        """
+        place = Place(id='1', created_at=self.date.isoformat(),
+                      __class__='Place', rating=4)
+        self.assertEqual(self.date, place._attributes()['created_at'])
+        self.assertEqual(4, place.rating)
+        self.assertNotIn('__class__', place._attributes())
+
+
+class TestEpoch(unittest.TestCase):
+    """Testing the conversions of the epoch timestamps.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def test_round_trip(self):
+        """Ensures a timestamp converts back exactly.
+        """
+        date = datetime.datetime(2024, 1, 14, 17, 7, 0, 123456)
+        self.assertEqual(1705252020123456, to_epoch(date))
+        self.assertEqual(date, from_epoch(to_epoch(date)))
+        self.assertEqual(to_epoch(date), to_epoch(date.isoformat()))
+        self.assertEqual(-1, to_epoch(datetime.datetime(1969, 12, 31, 23,
+                                                        59, 59, 999999)))
+
+    def test_errors(self):
+        """Ensures what isn't a timestamp is rejected.
+        """
+        with self.assertRaises(TypeError):
+            to_epoch(None)
+        with self.assertRaises(ValueError):
+            to_epoch('2002')
+
+    def test_read_both(self):
+        """Ensures both formats are read as datetimes.
+        """
+        date = datetime.datetime(2024, 1, 14, 17, 7, 0, 0)
+        place = Place(id='1', created_at=to_epoch(date),
+                      updated_at=date.isoformat())
+        self.assertEqual(date, place.created_at)
+        self.assertEqual(date, place.updated_at)
+        place._load({'created_at': to_epoch(date)})
+        self.assertEqual(date.isoformat(), place.to_dict()['created_at'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the binary snapshots
+written beside the JSON snapshot files.
+"""
+import io
+import sys
+import unittest
+from unittest import mock
+from models.engine import binary_snapshot
+from models.engine.binary_snapshot import Checksum, CorruptSnapshot, \
+    read_snapshot, write_snapshot
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """Testing the write_snapshot and read_snapshot functions.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Write a binary snapshot of a few items in batches of 3
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.json_file = io.BytesIO(b'{"a": 1}')
+        self.items = [(f'User.{i}', {'id': str(i)}) for i in range(7)]
+        self.file = io.BytesIO()
+        checksum = Checksum()
+        list(checksum.pieces(['{"a"', ': 1}']))
+        with mock.patch.object(binary_snapshot, 'BATCH_SIZE', 3):
+            write_snapshot(self.file, self.items, len(self.items),
+                           checksum)
+        self.file.seek(0)
+        return super().setUp()
+
+    def read(self):
+        """The items read back from the snapshot"""
+        with mock.patch.object(binary_snapshot, 'BATCH_SIZE', 3):
+            items = read_snapshot(self.file, self.json_file)
+            return items if items is None else list(items)
+
+    def test_checksum(self):
+        """Verifies that the checksum of the pieces is the file's one
+        """
+        checksum = Checksum.of_file(self.json_file)
+        self.assertEqual(8, checksum.size)
+        self.assertEqual(0, self.json_file.tell())
+
+    def test_read(self):
+        """Verifies that the items are read back, in order
+        """
+        self.assertEqual(self.items, self.read())
+
+    def test_other_json(self):
+        """Verifies that a snapshot written with another JSON file
+        isn't read
+        """
+        for text in (b'{"a": 2}', b'{"a": 1} '):
+            self.file.seek(0)
+            self.json_file = io.BytesIO(text)
+            self.assertIsNone(self.read())
+
+    def test_header(self):
+        """Verifies that a snapshot of another format isn't read
+        """
+        data = self.file.getvalue()
+        for corrupt in (data[:10], b'XBNB' + data[4:],
+                        data[:4] + b'\x03' + data[5:]):
+            self.file = io.BytesIO(corrupt)
+            self.assertIsNone(self.read())
+
+    def test_corrupt(self):
+        """Verifies that truncated objects raise CorruptSnapshot
+        """
+        self.file = io.BytesIO(self.file.getvalue()[:-20])
+        with self.assertRaises(CorruptSnapshot):
+            self.read()
+
+    def test_string_table(self):
+        """Verifies that the strings of the table are read back as one
+        interned string each
+        """
+        self.items = [(f'Review.{i}', {'id': str(i),
+                                       'place_id': 'place-' + str(i % 2)})
+                      for i in range(7)]
+        self.file = io.BytesIO()
+        checksum = Checksum()
+        list(checksum.pieces(['{"a": 1}']))
+        with mock.patch.object(binary_snapshot, 'BATCH_SIZE', 3):
+            write_snapshot(self.file, self.items, len(self.items),
+                           checksum, lambda record: [record['place_id']])
+        self.assertEqual(binary_snapshot.TABLE_VERSION,
+                         self.file.getvalue()[4])
+        self.assertEqual(1, self.file.getvalue().count(b'place-0'))
+        self.file.seek(0)
+        items = self.read()
+        self.assertEqual(self.items, items)
+        self.assertIs(items[0][1]['place_id'], items[6][1]['place_id'])
+        self.assertIs(sys.intern('place-1'), items[3][1]['place_id'])
+
+    def test_shared_objects(self):
+        """Verifies that the objects a batch pickles once are read back
+        from that batch
+        """
+        self.items = []
+        for i in range(7):
+            value = [i]
+            self.items.append((f'User.{i}', {'a': value, 'b': value}))
+        self.file = io.BytesIO()
+        checksum = Checksum()
+        list(checksum.pieces(['{"a": 1}']))
+        with mock.patch.object(binary_snapshot, 'BATCH_SIZE', 3):
+            write_snapshot(self.file, self.items, len(self.items),
+                           checksum)
+        self.file.seek(0)
+        self.assertEqual(self.items, self.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
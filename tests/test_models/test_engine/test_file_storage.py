@@ -7,11 +7,22 @@ of a simple object-relational mapping (ORM) system. The module includes
 various test classes, each focusing on specific aspects of the FileStorage
 class.
 """
+import asyncio
+import concurrent.futures
 import unittest
 import datetime
+import fcntl
 import json
 import os
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
 from models.base_model import BaseModel
+from models.place import Place
+from models.review import Review
+from models.user import User
 import models
 
 
@@ -241,6 +252,7 @@ class TestFileStorageSave(unittest.TestCase):
         models.storage.new(obj)
         with self.assertRaises(AttributeError):
             models.storage.save()
+        self.assertFalse(os.path.exists('file.json.tmp'))
 
     def test_saved_empty_objects_attribute(self):
         """Tests the behavior of saving when the __objects attribute is empty.
@@ -250,6 +262,22 @@ class TestFileStorageSave(unittest.TestCase):
             json_data = json.load(file)
         self.assertDictEqual(json_data, models.storage.all())
 
+    def test_compact_format(self):
+        """Verifies that a compact storage writes one object per line,
+        and reloads them.
+        """
+        storage = models.FileStorage(compact=True)
+        objs = [BaseModel() for _ in range(3)]
+        storage.save()
+        with open('file.json', 'r') as file:
+            lines = file.read().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertFalse(any(line.startswith(' ') for line in lines))
+        models.FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual([obj.to_dict() for obj in objs],
+                         [obj.to_dict() for obj in storage.all().values()])
+
 
 class TestFileStorageReload(unittest.TestCase):
     """Testing the reload method of the FileStorage class.
@@ -374,6 +402,2195 @@ class TestFileStorageReload(unittest.TestCase):
 
         self.assertIn(obj2, list(models.storage.all().values()))
 
+    def test_reload_streams_records(self):
+        """Ensures the file is parsed one record at a time, with its
+        progress reported.
+        """
+        objs = [BaseModel() for _ in range(3)]
+        models.storage.save()
+        models.FileStorage._FileStorage__objects = {}
+        reported = []
+        with mock.patch('json.load') as load:
+            models.storage.reload(
+                progress=lambda done, total: reported.append((done, total)))
+        load.assert_not_called()
+        size = os.path.getsize('file.json')
+        self.assertEqual((size, size), reported[-1])
+        self.assertEqual([f'BaseModel.{obj.id}' for obj in objs],
+                         list(models.storage.all()))
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """Testing the journal mode of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(journal=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.journal'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def journal_lines(self):
+        """Read the journal records
+
+        Returns:
+            A list of the decoded journal records
+        """
+        with open(self.storage.journal_path, 'r') as file:
+            return [json.loads(line) for line in file]
+
+    def test_save_appends_only_changed_objects(self):
+        """Verifies that a save appends one record per changed object.
+        """
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.storage.compact()
+
+        self.storage.touch(obj1)
+        self.storage.save()
+        records = self.journal_lines()
+        self.assertEqual(1, len(records))
+        self.assertEqual(f'BaseModel.{obj1.id}', records[0]['key'])
+        self.assertEqual(obj1.to_dict(), records[0]['value'])
+
+    def test_reload_replays_journal_over_snapshot(self):
+        """Verifies that reload applies the journal on top of the snapshot.
+        """
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.storage.compact()
+
+        obj1.name = 'Zakaria'
+        self.storage.touch(obj1)
+        self.storage.delete(obj2)
+        obj3 = BaseModel()
+        self.storage.new(obj3)
+        self.storage.save()
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objects = self.storage.all()
+        self.assertEqual('Zakaria', objects[f'BaseModel.{obj1.id}'].name)
+        self.assertNotIn(f'BaseModel.{obj2.id}', objects)
+        self.assertIn(f'BaseModel.{obj3.id}', objects)
+
+    def test_torn_journal_record_is_ignored(self):
+        """Ensures a partially written last record doesn't break reload.
+        """
+        obj = BaseModel()
+        self.storage.new(obj)
+        self.storage.compact()
+        with open(self.storage.journal_path, 'w') as file:
+            file.write('{"key": "BaseModel.1", "value": {"id"')
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual([f'BaseModel.{obj.id}'],
+                         list(self.storage.all().keys()))
+
+    def test_torn_journal_record_then_save(self):
+        """Ensures a save after a torn record appends on a line of its
+        own, so the next reload still reads the journal.
+        """
+        objs = [BaseModel() for _ in range(3)]
+        for obj in objs:
+            self.storage.new(obj)
+        self.storage.compact()
+        objs[0].name = 'first'
+        self.storage.touch(objs[0])
+        self.storage.save()
+        with open(self.storage.journal_path, 'a') as file:
+            file.write('{"key": "BaseModel.torn", "val')
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(journal=True)
+        self.storage.reload()
+        obj = self.storage.get(BaseModel, objs[1].id)
+        obj.name = 'second'
+        self.storage.touch(obj)
+        self.storage.save()
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(journal=True)
+        self.storage.reload()
+        self.assertEqual(sorted(f'BaseModel.{obj.id}' for obj in objs),
+                         sorted(self.storage.all()))
+        self.assertEqual('first',
+                         self.storage.get(BaseModel, objs[0].id).name)
+        self.assertEqual('second',
+                         self.storage.get(BaseModel, objs[1].id).name)
+
+    def test_journal_compacted_when_larger_than_snapshot(self):
+        """Verifies that the journal is folded into the snapshot once it
+        holds more records than there are objects.
+        """
+        obj = BaseModel()
+        self.storage.new(obj)
+        self.storage.save()
+        self.storage.touch(obj)
+        self.storage.save()
+
+        self.assertFalse(os.path.exists(self.storage.journal_path))
+        with open('file.json', 'r') as file:
+            json_data = json.load(file)
+        self.assertIn(f'BaseModel.{obj.id}', json_data)
+
+
+class TestFileStorageDirty(unittest.TestCase):
+    """Testing the dirty tracking of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage()
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_dirty_keys(self):
+        """Verifies that new, touched and deleted keys are dirty until
+        the next save.
+        """
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.assertEqual({f'BaseModel.{obj1.id}', f'BaseModel.{obj2.id}'},
+                         self.storage.dirty)
+
+        self.storage.save()
+        self.assertEqual(frozenset(), self.storage.dirty)
+
+        self.storage.touch(obj1)
+        self.storage.delete(obj2)
+        self.assertEqual({f'BaseModel.{obj1.id}', f'BaseModel.{obj2.id}'},
+                         self.storage.dirty)
+
+    def test_save_encodes_only_dirty_objects(self):
+        """Verifies that a save doesn't call to_dict on clean objects.
+        """
+        objs = [BaseModel() for _ in range(5)]
+        for obj in objs:
+            self.storage.new(obj)
+        self.storage.save()
+
+        to_dict = BaseModel.to_dict
+        with mock.patch.object(BaseModel, 'to_dict', autospec=True,
+                               side_effect=to_dict) as patched:
+            objs[0].name = 'Abdelrahman'
+            self.storage.touch(objs[0])
+            self.storage.save()
+        self.assertEqual(1, patched.call_count)
+
+        with open('file.json', 'r') as file:
+            json_data = json.load(file)
+        self.assertEqual({obj.to_dict()['id'] for obj in objs},
+                         {value['id'] for value in json_data.values()})
+        self.assertEqual('Abdelrahman',
+                         json_data[f'BaseModel.{objs[0].id}']['name'])
+
+    def test_change_then_save(self):
+        """Verifies that an attribute set or deleted without touch() is
+        saved, not the record encoded before.
+        """
+        obj = BaseModel()
+        obj.email = 'old'
+        models.storage.save()
+        obj.email = 'new'
+        self.assertIn(f'BaseModel.{obj.id}', models.storage.dirty)
+        models.storage.save()
+        with open('file.json', 'r') as file:
+            self.assertEqual('new',
+                             json.load(file)[f'BaseModel.{obj.id}']['email'])
+
+        del obj.email
+        models.storage.save()
+        with open('file.json', 'r') as file:
+            self.assertNotIn('email', json.load(file)[f'BaseModel.{obj.id}'])
+
+    def test_saved_file_matches_full_dump(self):
+        """Ensures the assembled snapshot is the same as dumping every
+        object's dictionary.
+        """
+        obj = BaseModel()
+        obj.team = ['Zakaria', 'Abdelrahman']
+        self.storage.new(obj)
+        self.storage.new(BaseModel())
+        self.storage.save()
+        expected = json.dumps(
+            {key: value.to_dict()
+             for key, value in self.storage.all().items()}, indent=3)
+        with open('file.json', 'r') as file:
+            self.assertEqual(expected, file.read())
+
+    def test_without_encode_cache(self):
+        """Verifies that without the cache every object is encoded on
+        each save, and the file is the same.
+        """
+        storage = models.FileStorage(encode_cache=False)
+        objs = [BaseModel() for _ in range(3)]
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+        with open('file.json', 'r') as file:
+            expected = file.read()
+
+        to_dict = BaseModel.to_dict
+        with mock.patch.object(BaseModel, 'to_dict', autospec=True,
+                               side_effect=to_dict) as patched:
+            storage.save()
+        self.assertEqual(3, patched.call_count)
+        self.assertEqual({}, storage._FileStorage__encoded)
+        with open('file.json', 'r') as file:
+            self.assertEqual(expected, file.read())
+
+
+class TestFileStorageBatch(unittest.TestCase):
+    """Testing the batch and transaction methods of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage()
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_saves_deferred_until_end_of_batch(self):
+        """Verifies that saves inside a batch are flushed once at its end.
+        """
+        with mock.patch.object(models.FileStorage, 'compact',
+                               autospec=True) as patched:
+            with self.storage.batch():
+                for _ in range(3):
+                    obj = BaseModel()
+                    self.storage.new(obj)
+                    self.storage.save()
+                self.assertEqual(0, patched.call_count)
+        self.assertEqual(1, patched.call_count)
+
+    def test_nested_batches_flush_once(self):
+        """Verifies that only the outermost batch flushes.
+        """
+        with self.storage.batch():
+            with self.storage.batch():
+                self.storage.new(BaseModel())
+                self.storage.save()
+            self.assertFalse(os.path.exists('file.json'))
+            self.assertTrue(self.storage.in_batch)
+        self.assertFalse(self.storage.in_batch)
+        self.assertTrue(os.path.exists('file.json'))
+
+    def test_rollback_restores_objects(self):
+        """Verifies that rollback restores the objects and their
+        attributes to their state at begin.
+        """
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.begin()
+        obj1.name = 'Zakaria'
+        self.storage.delete(obj2)
+        obj3 = BaseModel()
+        self.storage.save()
+        self.storage.rollback()
+
+        objects = self.storage.all()
+        self.assertIs(obj1, objects[f'BaseModel.{obj1.id}'])
+        self.assertNotIn('name', obj1.__dict__)
+        self.assertIs(obj2, objects[f'BaseModel.{obj2.id}'])
+        self.assertNotIn(f'BaseModel.{obj3.id}', objects)
+        self.assertFalse(self.storage.in_batch)
+        self.assertFalse(os.path.exists('file.json'))
+
+    def test_exception_in_batch_rolls_back(self):
+        """Ensures a batch left by an exception is rolled back.
+        """
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                obj = BaseModel()
+                self.storage.save()
+                raise ValueError
+        self.assertNotIn(f'BaseModel.{obj.id}', self.storage.all())
+        self.assertFalse(os.path.exists('file.json'))
+
+
+class TestFileStorageSharded(unittest.TestCase):
+    """Testing the sharded mode of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    shards = ('file.BaseModel.json', 'file.Place.json', 'file.User.json')
+
+    def setUp(self):
+        """Initialize a sharded storage over an empty objects dictionary
+
+        Returns:
+            The default behavior of the parent class
+        """
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(sharded=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """Remove the shard files
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in self.shards:
+            for suffix in ('', '.journal'):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+
+        return super().tearDown()
+
+    def test_shard_path(self):
+        """Verifies the file holding each class
+        """
+        self.assertEqual('file.Place.json', self.storage.shard_path('Place'))
+        self.assertEqual('file.json',
+                         models.FileStorage().shard_path('Place'))
+
+    def test_objects_saved_in_their_class_shard(self):
+        """Verifies that every class is saved in its own file.
+        """
+        place = Place()
+        user = User()
+        self.storage.new(place)
+        self.storage.new(user)
+        self.storage.save()
+
+        with open('file.Place.json', 'r') as file:
+            self.assertEqual([f'Place.{place.id}'], list(json.load(file)))
+        with open('file.User.json', 'r') as file:
+            self.assertEqual([f'User.{user.id}'], list(json.load(file)))
+
+    def test_only_dirty_shards_written(self):
+        """Verifies that a save leaves the clean shards untouched.
+        """
+        place = Place()
+        self.storage.new(place)
+        self.storage.new(User())
+        self.storage.save()
+        os.remove('file.User.json')
+
+        self.storage.touch(place)
+        self.storage.save()
+        self.assertTrue(os.path.exists('file.Place.json'))
+        self.assertFalse(os.path.exists('file.User.json'))
+
+    def test_reload_reads_only_accessed_shard(self):
+        """Verifies that a reloaded shard is only read when its class is
+        accessed.
+        """
+        place = Place()
+        user = User()
+        self.storage.new(place)
+        self.storage.new(user)
+        self.storage.save()
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual([f'Place.{place.id}'],
+                         list(self.storage.all(Place)))
+        self.assertNotIn(f'User.{user.id}',
+                         models.FileStorage._FileStorage__objects)
+        self.assertIn(f'User.{user.id}', self.storage.all())
+
+    def test_deleted_class_shard_emptied(self):
+        """Ensures that deleting the last object of a class empties its
+        shard on compaction.
+        """
+        place = Place()
+        self.storage.new(place)
+        self.storage.save()
+        self.storage.delete(place)
+        self.storage.compact()
+        with open('file.Place.json', 'r') as file:
+            self.assertEqual({}, json.load(file))
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """Testing the lazy mode of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Save a few objects, then reload them in a lazy storage
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.place = Place()
+        self.user = User()
+        models.storage.save()
+        self.storage = models.FileStorage(lazy=True)
+        self.storage.reload()
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_reload_builds_nothing(self):
+        """Verifies that reloaded records are only built on access.
+        """
+        objects = self.storage.all()
+        self.assertEqual(2, len(objects))
+        self.assertEqual(1, len(self.storage.all(Place)))
+        self.assertFalse(objects.is_built(f'Place.{self.place.id}'))
+        self.assertFalse(objects.is_built(f'User.{self.user.id}'))
+
+    def test_built_object_matches_saved_one(self):
+        """Verifies that a built object is the same as the saved one.
+        """
+        place = self.storage.all()[f'Place.{self.place.id}']
+        self.assertIsInstance(place, Place)
+        self.assertEqual(self.place.to_dict(), place.to_dict())
+        self.assertEqual(self.place.created_at, place.created_at)
+        self.assertEqual(str(self.place), str(place))
+
+    def test_class_objects_built_through_storage(self):
+        """Verifies that the objects of a class are built only once.
+        """
+        place = self.storage.all(Place)[f'Place.{self.place.id}']
+        self.assertIs(place, self.storage.all()[f'Place.{self.place.id}'])
+
+    def test_save_keeps_unbuilt_records(self):
+        """Ensures that saving writes the records never accessed.
+        """
+        user = self.storage.all()[f'User.{self.user.id}']
+        user.first_name = 'Zakaria'
+        user.save()
+        with open('file.json', 'r') as file:
+            json_data = json.load(file)
+        self.assertEqual(self.place.to_dict(),
+                         json_data[f'Place.{self.place.id}'])
+        self.assertEqual('Zakaria',
+                         json_data[f'User.{self.user.id}']['first_name'])
+        self.assertFalse(
+            self.storage.all().is_built(f'Place.{self.place.id}'))
+
+    def test_unknown_class_fails_on_reload(self):
+        """Ensures a record of an unknown class still fails the reload.
+        """
+        with open('file.json', 'w') as file:
+            json.dump({'Test.1': {'id': '1', '__class__': 'Test'}}, file)
+        with self.assertRaises(KeyError):
+            self.storage.reload()
+
+
+class TestFileStorageClassIndex(unittest.TestCase):
+    """Testing the per-class index behind the all and count methods of
+    the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_all_and_count_of_class(self):
+        """Verifies the objects and the number of objects of a class.
+        """
+        places = [Place(), Place()]
+        user = User()
+        expected = {f'Place.{place.id}': place for place in places}
+        self.assertEqual(expected, models.storage.all(Place))
+        self.assertEqual(expected, models.storage.all('Place'))
+        self.assertEqual(2, models.storage.count(Place))
+        self.assertEqual(1, models.storage.count('User'))
+        self.assertEqual(0, models.storage.count('City'))
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual({f'User.{user.id}': user},
+                         models.storage.all(User))
+
+    def test_class_name_contained_in_id(self):
+        """Ensures an id holding a class name isn't counted for it.
+        """
+        date = datetime.datetime(2024, 1, 14, 17, 7, 0, 0).isoformat()
+        obj = BaseModel(id='City-1809', created_at=date, updated_at=date)
+        models.storage.new(obj)
+        self.assertEqual(0, models.storage.count('City'))
+        self.assertEqual({}, models.storage.all('City'))
+
+    def test_index_follows_delete_and_reload(self):
+        """Verifies that the index follows deletions and reloads.
+        """
+        place1 = Place()
+        place2 = Place()
+        models.storage.save()
+        models.storage.delete(place1)
+        self.assertEqual([f'Place.{place2.id}'],
+                         list(models.storage.all(Place)))
+
+        models.FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(Place))
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count(Place))
+
+    def test_index_follows_direct_changes(self):
+        """Ensures objects added or removed without going through the
+        storage are still indexed.
+        """
+        place = Place()
+        user = User()
+        models.storage.all().pop(f'Place.{place.id}')
+        self.assertEqual(0, models.storage.count(Place))
+        models.storage.all()[f'Place.{place.id}'] = place
+        self.assertEqual({f'Place.{place.id}': place},
+                         models.storage.all(Place))
+        self.assertEqual(1, models.storage.count(User))
+
+
+class TestFileStorageFind(unittest.TestCase):
+    """Testing the find method of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a few reviews of two places
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.reviews = []
+        for place_id, user_id in (('p1', 'u1'), ('p1', 'u2'), ('p2', 'u1')):
+            review = Review()
+            review.place_id = place_id
+            review.user_id = user_id
+            review.save()
+            self.reviews.append(review)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def keys(self, *reviews):
+        """The keys of some reviews"""
+        return [f'Review.{review.id}' for review in reviews]
+
+    def test_find_by_indexed_attribute(self):
+        """Verifies that objects are found by an indexed attribute.
+        """
+        self.assertEqual(
+            self.keys(*self.reviews[:2]),
+            list(models.storage.find(Review, place_id='p1')))
+        self.assertEqual({}, models.storage.find(Review, place_id='p3'))
+
+    def test_find_by_several_attributes(self):
+        """Verifies that every criterion must match.
+        """
+        self.assertEqual(
+            self.keys(self.reviews[1]),
+            list(models.storage.find('Review', place_id='p1',
+                                     user_id='u2')))
+        self.assertEqual(
+            self.keys(self.reviews[0], self.reviews[2]),
+            list(models.storage.find(Review, user_id='u1', text='')))
+
+    def test_find_by_unindexed_attribute(self):
+        """Verifies that an attribute without index is still searched.
+        """
+        self.reviews[2].text = 'Great'
+        self.reviews[2].save()
+        self.assertEqual(self.keys(self.reviews[2]),
+                         list(models.storage.find(Review, text='Great')))
+
+    def test_index_follows_updates_and_deletes(self):
+        """Verifies that the index follows saved changes and deletions.
+        """
+        self.reviews[0].place_id = 'p2'
+        self.reviews[0].save()
+        models.storage.delete(self.reviews[2])
+        self.assertEqual(self.keys(self.reviews[1]),
+                         list(models.storage.find(Review, place_id='p1')))
+        self.assertEqual(self.keys(self.reviews[0]),
+                         list(models.storage.find(Review, place_id='p2')))
+
+    def test_index_follows_reload(self):
+        """Verifies that reloaded objects are indexed.
+        """
+        models.FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(
+            self.keys(*self.reviews[:2]),
+            list(models.storage.find(Review, place_id='p1')))
+
+    def test_indexes_built_on_first_use(self):
+        """Verifies that listing the objects of a class builds no
+        attribute index, and that a find only builds the index of the
+        attribute it filters on.
+        """
+        place = Place()
+        place.save()
+        models.FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        hash_index = models.engine.file_storage.HashIndex
+        with mock.patch.object(hash_index, 'build', autospec=True,
+                               side_effect=hash_index.build) as build:
+            self.assertEqual(3, models.storage.count(Review))
+            self.assertEqual(1, len(models.storage.all(Place)))
+            self.assertEqual(3, models.storage.query(Review).count())
+            self.assertEqual(3, len(models.storage.query(Review).all()))
+            build.assert_not_called()
+            models.storage.find(Review, place_id='p1')
+        self.assertEqual({'place_id'},
+                         {call.args[0].attribute
+                          for call in build.call_args_list})
+        self.assertEqual(
+            self.keys(*self.reviews[:2]),
+            list(models.storage.find(Review, place_id='p1')))
+
+    def test_attributes_set_since_save(self):
+        """Verifies that a find sees the attributes set since the last
+        save, without another storage operation in between.
+        """
+        models.storage.find(Review, place_id='p1')
+        self.reviews[0].place_id = 'p2'
+        self.assertEqual(
+            self.keys(self.reviews[1]),
+            list(models.storage.find(Review, place_id='p1')))
+        self.assertEqual(
+            sorted(self.keys(self.reviews[0], self.reviews[2])),
+            sorted(models.storage.find(Review, place_id='p2')))
+
+
+class TestFileStorageRange(unittest.TestCase):
+    """Testing the range method of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a few places
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.places = []
+        for price, guests in ((120, 4), (60, 2), (90, 6), (40, 1)):
+            place = Place()
+            place.price_by_night = price
+            place.max_guest = guests
+            place.save()
+            self.places.append(place)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def keys(self, *indices):
+        """The keys of some places"""
+        return [f'Place.{self.places[i].id}' for i in indices]
+
+    def test_range_in_order(self):
+        """Verifies that a range is returned in the attribute order.
+        """
+        self.assertEqual(
+            self.keys(1, 2),
+            list(models.storage.range(Place, 'price_by_night', 50, 100)))
+        self.assertEqual(
+            self.keys(2, 1, 3),
+            list(models.storage.range(Place, 'price_by_night', high=100,
+                                      include_high=False, reverse=True)))
+
+    def test_limit_and_offset(self):
+        """Verifies the paging of a range.
+        """
+        self.assertEqual(
+            self.keys(1, 2),
+            list(models.storage.range(Place, 'price_by_night', offset=1,
+                                      limit=2)))
+        self.assertEqual(
+            self.keys(0),
+            list(models.storage.range(Place, 'max_guest', low=3,
+                                      limit=1)))
+
+    def test_range_follows_updates(self):
+        """Verifies that saved changes, including the strings stored by
+        the console, move the objects in the index.
+        """
+        self.places[0].price_by_night = '30'
+        self.places[0].save()
+        models.storage.delete(self.places[3])
+        self.assertEqual(
+            self.keys(0, 1),
+            list(models.storage.range(Place, 'price_by_night', high=60)))
+
+    def test_range_without_index(self):
+        """Verifies that an attribute without index is sorted on demand.
+        """
+        self.places[2].latitude = 10.5
+        self.places[2].save()
+        self.assertEqual(
+            self.keys(2),
+            list(models.storage.range(Place, 'latitude', low=1)))
+
+
+class TestFileStorageSpatial(unittest.TestCase):
+    """Testing the spatial searches of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a few places around New York and one in Paris
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.places = []
+        for latitude, longitude in ((40.7128, -74.0060), (40.7306, -73.9352),
+                                    (40.6413, -73.7781), (48.8566, 2.3522)):
+            place = Place()
+            place.latitude = latitude
+            place.longitude = longitude
+            place.save()
+            self.places.append(place)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def keys(self, *indices):
+        """The keys of some places"""
+        return [f'Place.{self.places[i].id}' for i in indices]
+
+    def test_within_radius(self):
+        """Verifies the places within a distance, nearest first.
+        """
+        self.assertEqual(
+            self.keys(0, 1),
+            list(models.storage.within_radius(Place, 40.71, -74.0, 10)))
+        self.assertEqual(
+            self.keys(1, 0, 2),
+            list(models.storage.within_radius('Place', 40.73, -73.93, 30)))
+
+    def test_within_box(self):
+        """Verifies the places inside a box.
+        """
+        self.assertEqual(
+            sorted(self.keys(0, 1, 2)),
+            sorted(models.storage.within_box(Place, 40, -75, 41, -73)))
+        self.assertEqual({}, models.storage.within_box(Place, 0, 0, 1, 1))
+
+    def test_nearest(self):
+        """Verifies the places nearest to a point.
+        """
+        self.assertEqual(
+            self.keys(3, 2),
+            list(models.storage.nearest(Place, 50, 0, 2)))
+
+    def test_index_follows_updates(self):
+        """Verifies that moved and deleted places are re-indexed.
+        """
+        self.places[3].latitude = '40.7'
+        self.places[3].longitude = '-74.01'
+        self.places[3].save()
+        models.storage.delete(self.places[0])
+        self.assertEqual(
+            self.keys(3),
+            list(models.storage.within_radius(Place, 40.7, -74.01, 1)))
+        self.assertEqual(
+            {}, models.storage.within_radius(Place, 48.8, 2.3, 100))
+
+    def test_class_without_spatial_index(self):
+        """Ensures classes without declared coordinates are searched by
+        their latitude and longitude attributes.
+        """
+        obj = BaseModel()
+        obj.latitude = 1.0
+        obj.longitude = 1.0
+        obj.save()
+        self.assertEqual([f'BaseModel.{obj.id}'],
+                         list(models.storage.nearest(BaseModel, 0, 0, 5)))
+
+
+class TestFileStorageText(unittest.TestCase):
+    """Testing the text searches of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a few places and a review
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(persist_text=True)
+        self.places = []
+        for name, description in (('Sunny loft', 'Quiet, near the beach'),
+                                  ('Noisy flat', 'Garden parties'),
+                                  ('Cabin', 'Quiet garden, quiet pool')):
+            place = Place()
+            place.name = name
+            place.description = description
+            self.storage.new(place)
+            self.places.append(place)
+        self.review = Review()
+        self.review.text = 'A quiet place'
+        self.storage.new(self.review)
+        self.storage.save()
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.journal', 'file.json.text'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def keys(self, *indices):
+        """The keys of some places"""
+        return [f'Place.{self.places[i].id}' for i in indices]
+
+    def test_search(self):
+        """Verifies the boolean queries, most relevant first.
+        """
+        self.assertEqual(self.keys(2, 0),
+                         list(self.storage.search(Place, 'quiet')))
+        self.assertEqual(self.keys(2),
+                         list(self.storage.search('Place', 'garden -noisy')))
+        self.assertEqual(self.keys(2), list(self.storage.search(
+            Place, 'quiet', limit=1)))
+        self.assertEqual([f'Review.{self.review.id}'],
+                         list(self.storage.search(Review, 'quiet')))
+        self.assertEqual({}, self.storage.search(User, 'quiet'))
+
+    def test_rank(self):
+        """Verifies the BM25 ranking.
+        """
+        self.assertEqual(self.keys(2, 1),
+                         list(self.storage.rank(Place, 'quiet garden', 2)))
+
+    def test_index_follows_updates(self):
+        """Verifies that changed and deleted objects are re-indexed.
+        """
+        self.places[1].description = 'Quiet beach'
+        self.storage.touch(self.places[1])
+        self.storage.delete(self.places[2])
+        self.assertEqual(self.keys(1, 0),
+                         list(self.storage.search(Place, 'quiet beach')))
+        self.assertEqual({}, self.storage.search(Place, 'pool'))
+
+    def test_reload_uses_persisted_index(self):
+        """Verifies that reload reads the posting lists back instead of
+        indexing the objects again, and applies the journal over them.
+        """
+        self.assertTrue(os.path.exists(self.storage.text_index_path('Place')))
+        self.storage.journal = True
+        self.places[0].name = 'Sunny pool'
+        self.storage.touch(self.places[0])
+        self.storage.delete(self.places[2])
+        self.storage.save()
+
+        models.FileStorage._FileStorage__objects = {}
+        storage = models.FileStorage(journal=True, persist_text=True)
+        storage.reload()
+        text_index = models.engine.file_storage.TextIndex
+        with mock.patch.object(text_index, 'add', autospec=True,
+                               side_effect=text_index.add) as add:
+            storage.search(Place, 'quiet')
+        self.assertEqual([f'Place.{self.places[0].id}'],
+                         [call.args[1] for call in add.call_args_list])
+        self.assertEqual(self.keys(0),
+                         list(storage.search(Place, 'pool')))
+
+    def test_stale_persisted_index_is_ignored(self):
+        """Ensures posting lists written with another snapshot are not
+        used.
+        """
+        with open('file.json', 'r') as file:
+            json_data = json.load(file)
+        del json_data[f'Place.{self.places[2].id}']
+        with open('file.json', 'w') as file:
+            json.dump(json_data, file)
+
+        models.FileStorage._FileStorage__objects = {}
+        storage = models.FileStorage(persist_text=True)
+        storage.reload()
+        self.assertEqual(self.keys(0), list(storage.search(Place, 'quiet')))
+
+
+class TestFileStorageDurability(unittest.TestCase):
+    """Testing the atomic writes and group commit of the FileStorage
+    class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.journal', 'file.json.tmp'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_interrupted_save_keeps_snapshot(self):
+        """Ensures a save failing before the rename leaves the previous
+        snapshot whole.
+        """
+        storage = models.FileStorage()
+        obj = BaseModel()
+        storage.new(obj)
+        storage.save()
+        storage.new(BaseModel())
+        with mock.patch('os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                storage.save()
+        with open('file.json', 'r') as file:
+            self.assertEqual([f'BaseModel.{obj.id}'], list(json.load(file)))
+
+    def test_durability_always(self):
+        """Verifies that every save is synced before it returns.
+        """
+        storage = models.FileStorage(journal=True)
+        storage.new(BaseModel())
+        with mock.patch('os.fsync') as fsync:
+            storage.save()
+        self.assertTrue(fsync.called)
+
+    def test_durability_never(self):
+        """Verifies that saves are never synced.
+        """
+        storage = models.FileStorage(durability='never')
+        storage.new(BaseModel())
+        with mock.patch('os.fsync') as fsync:
+            storage.save()
+        self.assertFalse(fsync.called)
+
+    def test_durability_interval(self):
+        """Verifies that saves are synced later, all at once.
+        """
+        storage = models.FileStorage(journal=True, durability=60000)
+        storage.new(BaseModel())
+        with mock.patch('os.fsync') as fsync:
+            storage.save()
+            storage.new(BaseModel())
+            storage.save()
+            self.assertFalse(fsync.called)
+            storage.sync_files()
+        self.assertTrue(fsync.called)
+        self.assertIsNone(storage._FileStorage__sync_timer)
+
+    def test_invalid_durability(self):
+        """Ensures an unknown durability is refused.
+        """
+        with self.assertRaises(ValueError):
+            models.FileStorage(durability='sometimes')
+        with self.assertRaises(ValueError):
+            models.FileStorage(durability=-1)
+
+    def test_group_commit(self):
+        """Verifies that the saves requested during a flush are merged
+        into a single flush.
+        """
+        storage = models.FileStorage()
+        started, release = threading.Event(), threading.Event()
+        flushes = []
+
+        def flush():
+            flushes.append(None)
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(storage, '_FileStorage__flush',
+                               side_effect=flush):
+            first = threading.Thread(target=storage.save)
+            first.start()
+            started.wait(5)
+            others = [threading.Thread(target=storage.save)
+                      for _ in range(3)]
+            for thread in others:
+                thread.start()
+            while storage._FileStorage__requested < 4:
+                threading.Event().wait(0.01)
+            release.set()
+            for thread in [first] + others:
+                thread.join(5)
+        self.assertEqual(2, len(flushes))
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """Testing the write-behind mode of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def saved_keys(self, timeout=5):
+        """Wait for the snapshot file to be written
+
+        Keyword Arguments:
+            timeout -- The most seconds to wait (default: {5})
+
+        Returns:
+            The keys in the snapshot file, None if it wasn't written
+        """
+        waited = threading.Event()
+        for _ in range(int(timeout * 100) + 1):
+            if os.path.exists('file.json'):
+                with open('file.json', 'r') as file:
+                    return list(json.load(file))
+            waited.wait(0.01)
+        return None
+
+    def store(self, storage, count=1):
+        """Add some new objects and save them
+
+        Returns:
+            The keys of the objects
+        """
+        keys = []
+        for _ in range(count):
+            obj = BaseModel()
+            storage.new(obj)
+            keys.append(f'BaseModel.{obj.id}')
+        storage.save()
+        return keys
+
+    def test_save_returns_before_writing(self):
+        """Verifies that saves are only written by flush.
+        """
+        storage = models.FileStorage(write_behind=60000)
+        keys = self.store(storage)
+        self.assertFalse(os.path.exists('file.json'))
+        storage.flush()
+        self.assertEqual(keys, self.saved_keys(0))
+
+    def test_flushed_after_delay(self):
+        """Verifies that the background thread flushes after the delay.
+        """
+        storage = models.FileStorage(write_behind=20)
+        keys = self.store(storage)
+        self.assertEqual(keys, self.saved_keys())
+        storage.flush()
+
+    def test_flushed_when_enough_dirty(self):
+        """Verifies that enough dirty objects are flushed at once.
+        """
+        storage = models.FileStorage(write_behind=60000,
+                                     write_behind_objects=3)
+        keys = self.store(storage, 3)
+        self.assertEqual(keys, self.saved_keys())
+        storage.flush()
+
+    def test_flush_without_waiting(self):
+        """Verifies that flush can only wake the background thread.
+        """
+        storage = models.FileStorage(write_behind=60000)
+        keys = self.store(storage)
+        storage.flush(wait=False)
+        self.assertEqual(keys, self.saved_keys())
+        storage.flush()
+
+    def test_deferred_by_batch(self):
+        """Verifies that a save pending when a batch begins is neither
+        flushed by the background thread nor by flush() until its
+        commit, which writes the batch with it.
+        """
+        storage = models.FileStorage(write_behind=20)
+        keys = self.store(storage)
+        storage.begin()
+        keys += self.store(storage)
+        self.assertIsNone(self.saved_keys(0.2))
+        storage.flush()
+        self.assertFalse(os.path.exists('file.json'))
+        storage.commit()
+        self.assertEqual(keys, self.saved_keys())
+        storage.flush()
+
+    def test_deferred_by_rolled_back_batch(self):
+        """Verifies that a save pending when a batch begins is still
+        written after a rollback, without the batch.
+        """
+        storage = models.FileStorage(write_behind=20)
+        keys = self.store(storage)
+        storage.begin()
+        self.store(storage)
+        self.assertIsNone(self.saved_keys(0.2))
+        storage.rollback()
+        self.assertEqual(keys, self.saved_keys())
+        storage.flush()
+
+
+class TestFileStorageThreads(unittest.TestCase):
+    """Testing the FileStorage class used by many threads at once.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.tmp'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_readers_and_writer(self):
+        """Ensures readers iterate consistent snapshots while a writer
+        adds, deletes and saves objects.
+        """
+        storage = models.FileStorage(durability='never')
+        for _ in range(50):
+            storage.new(Place())
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            try:
+                while not stop.is_set():
+                    for key, obj in storage.snapshot().items():
+                        self.assertEqual(key, f'Place.{obj.id}')
+                    storage.query(Place).filter(
+                        price_by_night__ge=0).count()
+                    storage.count(Place)
+            except Exception as error:
+                errors.append(error)
+
+        def write():
+            try:
+                for _ in range(50):
+                    place = Place()
+                    storage.new(place)
+                    storage.save()
+                    storage.delete(place)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                stop.set()
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        self.assertEqual([], errors)
+        self.assertEqual(50, storage.count(Place))
+
+    def test_snapshot_is_a_copy(self):
+        """Ensures a snapshot doesn't change with the storage.
+        """
+        storage = models.FileStorage()
+        place = Place()
+        storage.new(place)
+        snapshot = storage.snapshot(Place)
+        storage.new(Place())
+        storage.delete(place)
+        self.assertEqual([f'Place.{place.id}'], list(snapshot))
+        self.assertEqual({}, storage.snapshot(User))
+
+
+class TestFileStorageShared(unittest.TestCase):
+    """Testing the FileStorage class shared between processes.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.journal', 'file.json.lock'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def other_process(self, code, journal=False):
+        """Run some code in another process sharing the storage file
+
+        Arguments:
+            code -- The code, `storage` is the process's storage engine
+
+        Keyword Arguments:
+            journal -- Use the journal mode (default: {False})
+        """
+        environment = dict(os.environ, HBNB_STORAGE_SHARED='1',
+                           HBNB_STORAGE_JOURNAL='1' if journal else '0')
+        subprocess.run(
+            [sys.executable, '-c',
+             'from models import storage\nfrom models.user import User\n' +
+             code],
+            env=environment, check=True)
+
+    def saved(self):
+        """The records in the storage file"""
+        with open('file.json', 'r') as file:
+            return json.load(file)
+
+    def test_keeps_other_writes(self):
+        """Ensures a save merges the objects another process saved
+        instead of overwriting them.
+        """
+        storage = models.FileStorage(shared=True)
+        first = User()
+        storage.new(first)
+        storage.save()
+        self.other_process('user = User()\nuser.email = "b@x"\n'
+                           'user.save()')
+        second = User()
+        storage.new(second)
+        storage.save()
+
+        emails = {key: record.get('email')
+                  for key, record in self.saved().items()}
+        self.assertEqual(3, len(emails))
+        self.assertIn('b@x', emails.values())
+        self.assertEqual(3, storage.count(User))
+        with open('file.json.lock', 'r') as file:
+            self.assertEqual('3', file.read())
+
+    def test_merges_changed_records(self):
+        """Ensures updates and deletions of other processes are merged,
+        while the objects changed here win.
+        """
+        storage = models.FileStorage(shared=True)
+        kept, deleted, changed = User(), User(), User()
+        for user in (kept, deleted, changed):
+            storage.new(user)
+        storage.save()
+        self.other_process(
+            f'storage.delete(storage.get(User, "{deleted.id}"))\n'
+            f'storage.get(User, "{kept.id}").first_name = "Other"\n'
+            f'storage.get(User, "{changed.id}").first_name = "Other"\n'
+            'storage.save()')
+        changed.first_name = 'Mine'
+        storage.touch(changed)
+        storage.save()
+
+        saved = self.saved()
+        self.assertNotIn(f'User.{deleted.id}', saved)
+        self.assertEqual('Other', saved[f'User.{kept.id}']['first_name'])
+        self.assertEqual('Mine', saved[f'User.{changed.id}']['first_name'])
+        self.assertIsNone(storage.get(User, deleted.id))
+        self.assertEqual('Other', storage.get(User, kept.id).first_name)
+
+    def test_journal_reads_new_lines(self):
+        """Ensures only the lines appended to the journal by another
+        process are read again.
+        """
+        storage = models.FileStorage(journal=True, shared=True)
+        for _ in range(3):
+            storage.new(User())
+        storage.save()
+        storage.compact()
+        storage.new(User())
+        storage.save()
+        self.other_process('User().save()', journal=True)
+        with mock.patch.object(models.FileStorage,
+                               '_FileStorage__merge_file') as merge_file:
+            storage.refresh()
+        merge_file.assert_not_called()
+        self.assertEqual(5, storage.count(User))
+
+    def test_no_change_reads_nothing(self):
+        """Ensures an unchanged file isn't read again.
+        """
+        storage = models.FileStorage(shared=True)
+        storage.new(User())
+        storage.save()
+        with mock.patch('json.load') as load:
+            storage.refresh()
+            storage.save()
+        load.assert_not_called()
+
+    def test_locks_files(self):
+        """Ensures the file is locked for writing while saved.
+        """
+        storage = models.FileStorage(shared=True)
+        storage.new(User())
+        flock = mock.Mock()
+        with mock.patch('fcntl.flock', flock):
+            storage.save()
+        self.assertEqual(fcntl.LOCK_EX, flock.call_args[0][1])
+
+
+class TestFileStorageAsync(unittest.TestCase):
+    """Testing the coroutines of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def test_asave(self):
+        """Ensures asave() saves in the executor.
+        """
+        storage = models.FileStorage()
+        obj = BaseModel()
+        storage.new(obj)
+        threads = []
+        save = models.FileStorage.save
+
+        def record(self):
+            threads.append(threading.current_thread())
+            save(self)
+
+        with mock.patch.object(models.FileStorage, 'save', record):
+            asyncio.run(storage.asave())
+        self.assertNotIn(threading.main_thread(), threads)
+        with open('file.json', 'r') as file:
+            self.assertIn(f'BaseModel.{obj.id}', json.load(file))
+
+    def test_merges_saves(self):
+        """Ensures the saves awaited before the pending one starts are
+        merged into it.
+        """
+        storage = models.FileStorage()
+        save = models.FileStorage.save
+
+        def slow(self):
+            time.sleep(0.05)
+            save(self)
+
+        async def save_all():
+            await asyncio.gather(*(storage.asave(BaseModel())
+                                   for _ in range(5)))
+
+        with mock.patch.object(models.FileStorage, 'save', autospec=True,
+                               side_effect=slow) as patched:
+            asyncio.run(save_all())
+        self.assertLessEqual(patched.call_count, 2)
+        with open('file.json', 'r') as file:
+            self.assertEqual(5, len(json.load(file)))
+
+    def test_executor_starting_at_once(self):
+        """Ensures a save submitted to an executor running it at once
+        isn't awaited again by the next asave(), which saves anew.
+        """
+        class Immediate(concurrent.futures.Executor):
+            def submit(self, function, *args):
+                future = concurrent.futures.Future()
+                future.set_result(function(*args))
+                return future
+
+        storage = models.FileStorage()
+        storage.executor = Immediate()
+        obj = BaseModel()
+        storage.new(obj)
+
+        async def save_twice():
+            obj.name = 'first'
+            await storage.asave(obj)
+            obj.name = 'second'
+            await storage.asave(obj)
+
+        asyncio.run(save_twice())
+        with open('file.json', 'r') as file:
+            saved = json.load(file)[f'BaseModel.{obj.id}']
+        self.assertEqual('second', saved['name'])
+
+    def test_model_asave(self):
+        """Ensures an object saved by asave() is updated and written.
+        """
+        obj = BaseModel()
+        updated_at = obj.updated_at
+        models.storage.save()
+        asyncio.run(obj.asave())
+        self.assertGreater(obj.updated_at, updated_at)
+        with open('file.json', 'r') as file:
+            saved = json.load(file)[f'BaseModel.{obj.id}']
+        self.assertEqual(obj.updated_at.isoformat(), saved['updated_at'])
+
+    def test_areload(self):
+        """Ensures areload() reloads the saved objects.
+        """
+        storage = models.FileStorage()
+        obj = BaseModel()
+        storage.new(obj)
+        storage.save()
+        models.FileStorage._FileStorage__objects = {}
+        asyncio.run(storage.areload())
+        self.assertIn(f'BaseModel.{obj.id}', storage.all())
+
+    def test_asave_in_batch(self):
+        """Ensures asave() is deferred inside a batch like save().
+        """
+        storage = models.FileStorage()
+        with storage.batch():
+            storage.new(BaseModel())
+            asyncio.run(storage.asave())
+            self.assertFalse(os.path.exists('file.json'))
+        self.assertTrue(os.path.exists('file.json'))
+
+
+class TestFileStorageParallelReload(unittest.TestCase):
+    """Testing the reload of the FileStorage class by several processes.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited, and
+        reload even the small files in parallel
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        patcher = mock.patch(
+            'models.engine.file_storage.PARALLEL_RELOAD_SIZE', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def save_places(self, storage, count=40):
+        """Save some places, return their dictionaries in order"""
+        for i in range(count):
+            place = Place()
+            place.name = f'Place {i}'
+            storage.new(place)
+        storage.save()
+        records = [obj.to_dict() for obj in storage.all().values()]
+        models.FileStorage._FileStorage__objects = {}
+        return records
+
+    def test_reload(self):
+        """Ensures the objects reloaded by several processes are the
+        saved ones, in order, in both formats.
+        """
+        for compact in (False, True):
+            storage = models.FileStorage(compact=compact, reload_workers=2)
+            records = self.save_places(storage)
+            reported = []
+            storage.reload(
+                progress=lambda done, total: reported.append(done))
+            self.assertEqual(records, [obj.to_dict() for obj in
+                                       storage.all().values()])
+            self.assertEqual(8, len(reported))
+            self.assertEqual(os.path.getsize('file.json'), reported[-1])
+            self.assertEqual(40, storage.count(Place))
+            models.FileStorage._FileStorage__objects = {}
+
+    def test_unknown_class(self):
+        """Ensures a record of an unknown class fails the reload.
+        """
+        storage = models.FileStorage(reload_workers=2)
+        self.save_places(storage)
+        with open('file.json', 'r') as file:
+            text = file.read()
+        with open('file.json', 'w') as file:
+            file.write(text.replace('"Place"', '"Castle"', 1))
+        with self.assertRaises(KeyError):
+            storage.reload()
+
+    def test_serial_reloads(self):
+        """Ensures the files that can't be split, and the lazy reloads,
+        are reloaded by this process.
+        """
+        storage = models.FileStorage(reload_workers=2)
+        with open('file.json', 'w') as file:
+            json.dump({f'User.{user.id}': user.to_dict()
+                       for user in (User(), User(), User())}, file)
+        with mock.patch.object(models.FileStorage,
+                               '_FileStorage__load_parallel') as parallel:
+            storage.reload()
+            lazy = models.FileStorage(lazy=True, reload_workers=2)
+            lazy.reload()
+        parallel.assert_not_called()
+        self.assertEqual(3, storage.count(User))
+
+    def test_import_models(self):
+        """Ensures the storage reloads a large file in parallel while the
+        models are imported.
+        """
+        storage = models.FileStorage()
+        for _ in range(10000):
+            place = Place()
+            place.description = 'A quiet place near the beach. ' * 10
+            storage.new(place)
+        storage.save()
+        # Larger than the unpatched PARALLEL_RELOAD_SIZE
+        self.assertGreater(os.path.getsize('file.json'), 1 << 22)
+        environment = dict(os.environ, HBNB_STORAGE_RELOAD_WORKERS='4')
+        subprocess.run(
+            [sys.executable, '-c',
+             'import models\n'
+             'assert models.storage.count("Place") == 10000\n'],
+            env=environment, check=True, timeout=60)
+
+
+class TestFileStorageBinary(unittest.TestCase):
+    """Testing the binary snapshots of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.storage = models.FileStorage(binary=True)
+        self.places = [Place() for _ in range(3)]
+        for place in self.places:
+            self.storage.new(place)
+        self.storage.save()
+        self.records = [place.to_dict() for place in self.places]
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.journal', 'file.json.pickle'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def reloaded(self):
+        """The dictionaries of the reloaded objects"""
+        return [obj.to_dict() for obj in self.storage.all().values()]
+
+    def test_reload_binary(self):
+        """Ensures the binary snapshot is reloaded instead of the JSON.
+        """
+        with mock.patch('models.engine.file_storage.iter_records') as read:
+            self.storage.reload()
+        read.assert_not_called()
+        self.assertEqual(self.records, self.reloaded())
+        place = self.storage.get(Place, self.places[0].id)
+        self.assertIs(datetime.datetime,
+                      type(place._attributes()['created_at']))
+
+    def test_changed_json(self):
+        """Ensures the JSON snapshot is reloaded once changed by another
+        writer.
+        """
+        with open('file.json', 'r') as file:
+            records = json.load(file)
+        key = f'Place.{self.places[0].id}'
+        records[key]['name'] = 'Changed'
+        with open('file.json', 'w') as file:
+            json.dump(records, file, indent=3)
+        self.storage.reload()
+        self.assertEqual('Changed', self.storage.all()[key].name)
+
+    def test_corrupt_binary(self):
+        """Ensures the JSON snapshot is reloaded when the binary one is
+        corrupt.
+        """
+        with open('file.json.pickle', 'r+b') as file:
+            file.truncate(os.path.getsize('file.json.pickle') - 10)
+        self.storage.reload()
+        self.assertEqual(self.records, self.reloaded())
+
+    def test_journal(self):
+        """Ensures the journal is replayed over the binary snapshot.
+        """
+        storage = models.FileStorage(binary=True, journal=True)
+        storage.reload()
+        place = storage.get(Place, self.places[1].id)
+        place.name = 'Journaled'
+        place.save()
+        storage.delete(storage.get(Place, self.places[2].id))
+        storage.save()
+        models.FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(['Journaled'],
+                         [place.to_dict()['name']
+                          for place in storage.all().values()
+                          if 'name' in place.to_dict()])
+        self.assertEqual(2, storage.count(Place))
+
+
+class TestFileStorageInterning(unittest.TestCase):
+    """Testing the interned foreign keys of the FileStorage class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Rename the storage file, so it doesn't get overwrited
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        for path in ('file.json', 'file.json.pickle'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def save_reviews(self, storage):
+        """Save reviews of two places, each holding its own copy of the
+        place ids
+
+        Returns:
+            The place ids
+        """
+        place_ids = [str(i) * 36 for i in (1, 2)]
+        for i in range(6):
+            review = Review()
+            review.place_id = ''.join(list(place_ids[i % 2]))
+            storage.new(review)
+        storage.save()
+        return place_ids
+
+    def place_ids(self, storage):
+        """The place ids of the stored reviews, in order"""
+        return [review.place_id for review in storage.all(Review).values()]
+
+    def test_stored_and_touched(self):
+        """Ensures stored and touched objects hold interned strings.
+        """
+        storage = models.FileStorage()
+        place_ids = self.save_reviews(storage)
+        self.assertIs(sys.intern(place_ids[0]), self.place_ids(storage)[0])
+        review = next(iter(storage.all(Review).values()))
+        review.place_id = ''.join(list(place_ids[1]))
+        storage.touch(review)
+        self.assertIs(sys.intern(place_ids[1]), review.place_id)
+        self.assertNotIn('user_id', review.to_dict())
+
+    def test_reload(self):
+        """Ensures the reloaded objects share one string per value.
+        """
+        for options in ({}, {'lazy': True}):
+            with self.subTest(**options):
+                storage = models.FileStorage(**options)
+                if options:
+                    models.FileStorage._FileStorage__objects = \
+                        models.engine.file_storage.LazyObjects(
+                            models.engine.file_storage._build)
+                self.save_reviews(storage)
+                storage.reload()
+                place_ids = self.place_ids(storage)
+                self.assertIs(place_ids[0], place_ids[2])
+                self.assertIs(place_ids[1], place_ids[5])
+                models.FileStorage._FileStorage__objects = {}
+
+    def test_string_table(self):
+        """Ensures the binary copy writes every place id once.
+        """
+        storage = models.FileStorage(binary=True, string_table=True)
+        place_ids = self.save_reviews(storage)
+        with open('file.json.pickle', 'rb') as binary_file:
+            data = binary_file.read()
+        self.assertEqual(1, data.count(place_ids[0].encode()))
+        with mock.patch('models.engine.file_storage.iter_records') as read:
+            storage.reload()
+        read.assert_not_called()
+        self.assertEqual(place_ids * 3, self.place_ids(storage))
+        self.assertIs(self.place_ids(storage)[0], sys.intern(place_ids[0]))
+
 
 if __name__ == '__main__':
     unittest.main()
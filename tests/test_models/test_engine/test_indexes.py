@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the secondary indexes
+the storage engine keeps over model attributes.
+"""
+import unittest
+from models.engine.indexes import HashIndex, KeyIndex, SortedIndex
+from models.place import Place
+from models.review import Review
+
+
+class TestHashIndex(unittest.TestCase):
+    """Testing the HashIndex class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Initialize an index over Review.place_id
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.index = HashIndex(Review, 'place_id')
+        return super().setUp()
+
+    def test_add_and_find(self):
+        """Verifies that objects are found by their value
+        """
+        review1 = Review()
+        review1.place_id = '1'
+        review2 = Review()
+        review2.place_id = '1'
+        self.index.add('Review.1', review1)
+        self.index.add('Review.2', review2)
+        self.index.add('Review.3', {'place_id': '2'})
+        self.assertEqual(['Review.1', 'Review.2'], list(self.index.find('1')))
+        self.assertEqual(['Review.3'], list(self.index.find('2')))
+        self.assertEqual([], list(self.index.find('3')))
+        self.assertEqual(3, len(self.index))
+
+    def test_class_default(self):
+        """Verifies that a missing attribute is indexed with the class
+        default value
+        """
+        self.index.add('Review.1', Review())
+        self.index.add('Review.2', {'id': '2'})
+        self.assertEqual(['Review.1', 'Review.2'], list(self.index.find('')))
+
+    def test_add_moves_changed_value(self):
+        """Verifies that re-adding an object moves it to its new value
+        """
+        review = Review()
+        review.place_id = '1'
+        self.index.add('Review.1', review)
+        review.place_id = '2'
+        self.index.add('Review.1', review)
+        self.assertEqual({}, self.index.find('1'))
+        self.assertEqual(['Review.1'], list(self.index.find('2')))
+        self.assertNotIn('1', self.index.entries)
+
+    def test_remove(self):
+        """Verifies that a removed object isn't found anymore
+        """
+        self.index.add('Review.1', {'place_id': '1'})
+        self.index.remove('Review.1')
+        self.index.remove('Review.2')
+        self.assertEqual({}, self.index.find('1'))
+        self.assertEqual(0, len(self.index))
+
+    def test_unhashable_values(self):
+        """Ensures unhashable values are left out of the index
+        """
+        self.index.add('Review.1', {'place_id': ['1']})
+        self.assertEqual(0, len(self.index))
+        self.assertEqual({}, self.index.find(['1']))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Testing the SortedIndex class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Index a few prices
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.index = SortedIndex(Place, 'price_by_night')
+        for key, price in (('Place.a', 50), ('Place.b', 100),
+                           ('Place.c', 75), ('Place.d', 100),
+                           ('Place.e', 20.5)):
+            self.index.add(key, {'price_by_night': price})
+        return super().setUp()
+
+    def test_kept_sorted(self):
+        """Verifies that the entries are sorted by value then key
+        """
+        self.assertEqual(['Place.e', 'Place.a', 'Place.c', 'Place.b',
+                          'Place.d'], list(self.index.between()))
+        self.assertEqual(['Place.d', 'Place.b', 'Place.c', 'Place.a',
+                          'Place.e'], list(self.index.between(reverse=True)))
+
+    def test_bounds(self):
+        """Verifies the inclusive and exclusive bounds of a range
+        """
+        self.assertEqual(['Place.a', 'Place.c', 'Place.b', 'Place.d'],
+                         list(self.index.between(50, 100)))
+        self.assertEqual(['Place.c'],
+                         list(self.index.between(50, 100, include_low=False,
+                                                 include_high=False)))
+        self.assertEqual(['Place.e', 'Place.a'],
+                         list(self.index.between(high=75,
+                                                 include_high=False)))
+        self.assertEqual(['Place.b', 'Place.d'],
+                         list(self.index.between(low=100)))
+        self.assertEqual([], list(self.index.between(101)))
+
+    def test_count_between(self):
+        """Verifies that ranges are counted without walking them
+        """
+        self.assertEqual(5, self.index.count_between())
+        self.assertEqual(4, self.index.count_between(50, 100))
+        self.assertEqual(1, self.index.count_between(50, 100, False, False))
+        self.assertEqual(0, self.index.count_between(80, 60))
+
+    def test_find(self):
+        """Verifies that objects are found by their value
+        """
+        self.assertEqual(['Place.b', 'Place.d'], list(self.index.find(100)))
+        self.assertEqual(['Place.b', 'Place.d'],
+                         list(self.index.find('100')))
+        self.assertEqual({}, self.index.find('cheap'))
+
+    def test_update_and_remove(self):
+        """Verifies that changed and removed objects are moved or dropped
+        """
+        self.index.add('Place.b', {'price_by_night': 10})
+        self.index.remove('Place.c')
+        self.assertEqual(['Place.b', 'Place.e', 'Place.a', 'Place.d'],
+                         list(self.index.between()))
+        self.assertEqual(4, len(self.index))
+
+    def test_numeric_strings(self):
+        """Ensures values stored as strings by the console are indexed as
+        numbers, and other values are left out
+        """
+        self.index.add('Place.f', {'price_by_night': '60'})
+        self.index.add('Place.g', {'price_by_night': 'free'})
+        self.index.add('Place.h', {'price_by_night': 'nan'})
+        self.assertEqual(['Place.a', 'Place.f'],
+                         list(self.index.between(50, 60)))
+        self.assertNotIn('Place.g', self.index.values)
+        self.assertNotIn('Place.h', self.index.values)
+
+    def test_build(self):
+        """Verifies that objects indexed at once are sorted like the
+        objects added one by one
+        """
+        index = SortedIndex(Place, 'price_by_night')
+        index.build([('Place.a', {'price_by_night': 50}),
+                     ('Place.b', {'price_by_night': 100}),
+                     ('Place.c', {'price_by_night': 'free'}),
+                     ('Place.d', {'price_by_night': '75'}),
+                     ('Place.e', {})])
+        self.assertEqual(['Place.e', 'Place.a', 'Place.d', 'Place.b'],
+                         list(index.between()))
+        self.assertEqual(4, len(index))
+        index.add('Place.a', {'price_by_night': 80})
+        self.assertEqual(['Place.e', 'Place.d', 'Place.a', 'Place.b'],
+                         list(index.between()))
+
+
+class TestKeyIndex(unittest.TestCase):
+    """Testing the KeyIndex class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Index a few keys
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.index = KeyIndex(Place, ['Place.c', 'Place.a', 'Place.e'])
+        return super().setUp()
+
+    def test_kept_sorted(self):
+        """Verifies the keys are in the order of their ids, once
+        """
+        self.index.add('Place.f', {})
+        self.index.add('Place.b', {})
+        self.index.add('Place.c', {})
+        self.assertEqual(['Place.a', 'Place.b', 'Place.c', 'Place.e',
+                          'Place.f'], list(self.index.between()))
+        self.assertEqual(5, len(self.index))
+
+    def test_bounds(self):
+        """Verifies the ranges of ids, as keyset pagination reads them
+        """
+        self.assertEqual(['Place.c', 'Place.a'],
+                         list(self.index.between(high='e', reverse=True,
+                                                 include_high=False)))
+        self.assertEqual(['Place.c', 'Place.e'],
+                         list(self.index.between('b', 'e')))
+        self.assertEqual(1, self.index.count_between('a', 'e', False,
+                                                     False))
+        self.assertEqual('e', self.index.sort_value('e'))
+        self.assertIsNone(self.index.sort_value(5))
+
+    def test_find_and_remove(self):
+        """Verifies that keys are found by their id and removed
+        """
+        self.assertEqual({'Place.c': None}, self.index.find('c'))
+        self.assertEqual({}, self.index.find(3))
+        self.index.remove('Place.c')
+        self.index.remove('Place.d')
+        self.assertEqual({}, self.index.find('c'))
+        self.assertEqual(['Place.a', 'Place.e'], list(self.index.between()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the streaming reader
+of the storage files.
+"""
+import io
+import json
+import unittest
+from models.engine.json_stream import iter_records, encode_entry, \
+    snapshot_chunks
+
+
+class TestIterRecords(unittest.TestCase):
+    """Testing the iter_records function.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    records = {
+        'User.1': {'id': '1', 'first_name': 'Zoë', '__class__': 'User'},
+        'Place.2': {'id': '2', 'name': 'Loft "Ω"', 'amenity_ids': [1, 2],
+                    'latitude': 1.5, 'host': {'a': None}},
+        'Place.3': {'id': '3'}
+        }
+
+    def parse(self, text, **kwargs):
+        """The records parsed from a text"""
+        return list(iter_records(io.BytesIO(text.encode()), **kwargs))
+
+    def test_records(self):
+        """Verifies that every record is parsed, in order, whatever the
+        size of the chunks
+        """
+        for indent in (None, 3):
+            text = json.dumps(self.records, indent=indent,
+                              ensure_ascii=False)
+            for chunk_size in (1, 2, 7, 1 << 20):
+                self.assertEqual(list(self.records.items()),
+                                 self.parse(text, chunk_size=chunk_size))
+
+    def test_empty(self):
+        """Verifies the files without records
+        """
+        self.assertEqual([], self.parse('{}'))
+        self.assertEqual([], self.parse(' {\n }\n', chunk_size=1))
+
+    def test_invalid(self):
+        """Verifies that the files that aren't a JSON object of records
+        fail to parse
+        """
+        for text in ('', 'Well son, very proud of you.', '[]',
+                     '{"a": {}', '{"a": {}} x', '{"a" {}}', '{"a": {}'
+                     ' "b": {}}', '{a: {}}', '{"a": {"b": }}'):
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                self.parse(text, chunk_size=3)
+
+    def test_progress(self):
+        """Verifies that the progress is reported after every chunk
+        """
+        text = json.dumps(self.records)
+        reported = []
+        self.parse(text, chunk_size=64,
+                   progress=lambda done, total: reported.append(done))
+        self.assertEqual(len(text.encode()), reported[-1])
+        self.assertEqual(sorted(reported), reported)
+        self.assertGreater(len(reported), 2)
+
+
+class TestSnapshotChunks(unittest.TestCase):
+    """Testing the encode_entry and snapshot_chunks functions.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def write(self, records, compact=False):
+        """The text of a snapshot of some records"""
+        return ''.join(snapshot_chunks(
+            encode_entry(key, record, compact)
+            for key, record in records.items()))
+
+    def test_indented(self):
+        """Verifies that the snapshot is the same as json.dumps of the
+        records indented by 3
+        """
+        for records in (TestIterRecords.records, {}):
+            self.assertEqual(json.dumps(records, indent=3),
+                             self.write(records))
+
+    def test_compact(self):
+        """Verifies that a compact snapshot has one record per line
+        """
+        records = TestIterRecords.records
+        text = self.write(records, compact=True)
+        self.assertEqual(records, json.loads(text))
+        self.assertEqual(len(records) + 2, len(text.splitlines()))
+        self.assertNotIn('  ', text)
+        self.assertEqual('{}', self.write({}, compact=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
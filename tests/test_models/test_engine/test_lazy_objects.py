@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the LazyObjects class,
+the objects dictionary that keeps the raw records loaded from a file and
+builds each instance the first time it's accessed.
+"""
+import unittest
+from models.engine.lazy_objects import LazyObjects
+
+
+class Record():
+    """A built record, holding the raw record it was built from"""
+
+    def __init__(self, key, record):
+        """Keep the key and the raw record"""
+        self.key = key
+        self.record = record
+
+
+class TestLazyObjects(unittest.TestCase):
+    """Testing the LazyObjects class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Fill a lazy dictionary with raw records
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.built = []
+
+        def builder(key, record):
+            self.built.append(key)
+            return Record(key, record)
+
+        self.objects = LazyObjects(builder)
+        for key in ('User.1', 'User.2', 'Place.1'):
+            self.objects.put_raw(key, {'id': key[-1]})
+        return super().setUp()
+
+    def test_is_a_dict(self):
+        """Test that the lazy dictionary is still a dictionary
+        """
+        self.assertIsInstance(self.objects, dict)
+
+    def test_key_scans_build_nothing(self):
+        """Verifies that counting and scanning the keys build nothing
+        """
+        self.assertEqual(3, len(self.objects))
+        self.assertIn('User.2', self.objects)
+        self.assertEqual(2, len([key for key in self.objects
+                                 if key.startswith('User.')]))
+        self.assertEqual([], self.built)
+
+    def test_built_once_on_access(self):
+        """Verifies that an object is built on first access only
+        """
+        obj = self.objects['User.1']
+        self.assertIsInstance(obj, Record)
+        self.assertEqual({'id': '1'}, obj.record)
+        self.assertIs(obj, self.objects['User.1'])
+        self.assertIs(obj, self.objects.get('User.1'))
+        self.assertEqual(['User.1'], self.built)
+        self.assertTrue(self.objects.is_built('User.1'))
+        self.assertFalse(self.objects.is_built('User.2'))
+
+    def test_values_and_items_build(self):
+        """Verifies that values and items hand out built objects
+        """
+        for obj in self.objects.values():
+            self.assertIsInstance(obj, Record)
+        for key, obj in self.objects.items():
+            self.assertEqual(key, obj.key)
+        self.assertEqual(3, len(self.built))
+
+    def test_copies_build(self):
+        """Ensures copies don't leak the raw records
+        """
+        for copy in (dict(self.objects), {**self.objects}):
+            for obj in copy.values():
+                self.assertIsInstance(obj, Record)
+
+    def test_pop(self):
+        """Verifies that pop returns the built object
+        """
+        self.assertIsInstance(self.objects.pop('Place.1'), Record)
+        self.assertNotIn('Place.1', self.objects)
+        self.assertIsNone(self.objects.pop('Place.1', None))
+        with self.assertRaises(KeyError):
+            self.objects.pop('Place.1')
+
+    def test_subset_builds_through_parent(self):
+        """Verifies that a subset shares the objects it builds
+        """
+        subset = self.objects.subset(['User.1', 'User.2'])
+        self.assertEqual(2, len(subset))
+        self.assertEqual([], self.built)
+        self.assertIs(self.objects['User.1'], subset['User.1'])
+        self.assertEqual(['User.1'], self.built)
+
+
+if __name__ == '__main__':
+    unittest.main()
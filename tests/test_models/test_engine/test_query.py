@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the Query class, the
+composable queries of the storage engine and the plans chosen for them.
+"""
+import datetime
+import os
+import unittest
+from models.base_model import BaseModel
+from models.place import Place
+import models
+
+
+class TestQuery(unittest.TestCase):
+    """Testing the Query class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Store a few places in two cities
+
+        Returns:
+            The default behavior of the parent class
+        """
+        try:
+            os.rename('file.json', 'temp')
+        except FileNotFoundError:
+            pass
+
+        models.FileStorage._FileStorage__objects = {}
+        self.places = []
+        for city_id, price, guests in (('paris', 120, 2), ('paris', 80, 4),
+                                       ('lyon', 60, 2), ('paris', 45, 6),
+                                       ('lyon', 200, 8)):
+            place = Place()
+            place.city_id = city_id
+            place.price_by_night = price
+            place.max_guest = guests
+            place.save()
+            self.places.append(place)
+        return super().setUp()
+
+    def tearDown(self):
+        """Reset the storage file name to its default
+
+        Returns:
+            The default behavior of the parent class
+        """
+
+        # Initialize new storage before each test
+        models.FileStorage._FileStorage__objects = {}
+
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.rename('temp', 'file.json')
+        except FileNotFoundError:
+            pass
+
+        return super().tearDown()
+
+    def keys(self, *indices):
+        """The keys of some places"""
+        return [f'Place.{self.places[i].id}' for i in indices]
+
+    def test_filters(self):
+        """Verifies every filter operator.
+        """
+        query = models.storage.query(Place)
+        self.assertEqual(self.keys(0, 1, 3),
+                         list(query.filter(city_id='paris').all()))
+        self.assertEqual(self.keys(2, 4),
+                         list(query.filter(city_id__ne='paris').all()))
+        self.assertEqual(self.keys(3, 2),
+                         list(query.filter(price_by_night__lt=80).all()))
+        self.assertEqual(self.keys(3, 2, 1),
+                         list(query.filter(price_by_night__le=80).all()))
+        self.assertEqual(self.keys(0, 4),
+                         list(query.filter(price_by_night__gt=80).all()))
+        self.assertEqual(self.keys(1, 0, 4),
+                         list(query.filter(price_by_night__ge=80).all()))
+        self.assertEqual(self.keys(1, 3, 4),
+                         list(query.filter(max_guest__in=(4, 6, 8)).all()))
+        self.assertEqual({}, query.filter(price_by_night__lt='cheap').all())
+
+    def test_value_stored_as_string(self):
+        """Verifies that a filter on a sorted index attribute matches a
+        number stored as a string, as the console's update stores it.
+        """
+        self.places[2].price_by_night = '80'
+        self.places[2].save()
+        query = models.storage.query(Place)
+        self.assertEqual(sorted(self.keys(1, 2)),
+                         sorted(query.filter(price_by_night=80).all()))
+        self.assertEqual(
+            sorted(self.keys(1, 2)),
+            sorted(query.filter(price_by_night__in=[80, 1]).all()))
+        self.assertEqual(sorted(self.keys(0, 3, 4)),
+                         sorted(query.filter(price_by_night__ne='80').all()))
+        self.assertEqual(
+            sorted(self.keys(1, 2)),
+            sorted(models.storage.find(Place, price_by_night=80)))
+
+    def test_timestamps(self):
+        """Verifies the timestamps are filtered and ordered as numbers.
+        """
+        date = datetime.datetime(2024, 1, 14)
+        for day, place in enumerate(self.places):
+            place.created_at = date + datetime.timedelta(days=day)
+        query = models.storage.query(Place)
+        self.assertEqual(self.keys(3, 2), list(
+            query.filter(created_at__ge=date + datetime.timedelta(days=2),
+                         created_at__lt=date + datetime.timedelta(days=4))
+            .order_by('-created_at').all()))
+        self.assertEqual(self.keys(1), list(
+            query.filter(created_at=date + datetime.timedelta(days=1))
+            .all()))
+
+    def test_chaining(self):
+        """Verifies filters, order, offset and limit combined.
+        """
+        query = models.storage.query('Place').filter(
+            price_by_night__lt=150, city_id='paris')
+        self.assertEqual(self.keys(0, 1, 3),
+                         list(query.order_by('-price_by_night').all()))
+        self.assertEqual(self.keys(1), list(
+            query.order_by('-price_by_night').offset(1).limit(1).all()))
+        self.assertEqual(self.places[3],
+                         query.order_by('-max_guest').first())
+        self.assertEqual(3, query.count())
+        self.assertEqual(5, models.storage.query(Place).count())
+        self.assertIsNone(query.filter(max_guest=3).first())
+
+    def test_queries_are_immutable(self):
+        """Ensures refining a query leaves the original as it was.
+        """
+        query = models.storage.query(Place)
+        query.filter(city_id='lyon').limit(1)
+        self.assertEqual(5, len(query.all()))
+
+    def test_explain_lookup(self):
+        """Verifies that the most selective index is chosen.
+        """
+        query = models.storage.query(Place).filter(
+            city_id='lyon', price_by_night__gt=50)
+        self.assertEqual({'class': 'Place', 'access': 'lookup',
+                          'index': 'city_id', 'estimated_rows': 2,
+                          'order': None}, query.explain())
+        query = models.storage.query(Place).filter(
+            city_id='paris', price_by_night__gt=50, price_by_night__lt=100)
+        self.assertEqual(('range', 'price_by_night', 2), (
+            query.explain()['access'], query.explain()['index'],
+            query.explain()['estimated_rows']))
+        self.assertEqual(self.keys(1), list(query.all()))
+
+    def test_explain_order(self):
+        """Verifies how the objects are put in order.
+        """
+        query = models.storage.query(Place).filter(price_by_night__gt=50)
+        self.assertEqual('index',
+                         query.order_by('price_by_night').explain()['order'])
+        self.assertEqual('sort',
+                         query.order_by('max_guest').explain()['order'])
+        plan = models.storage.query(Place).order_by('-max_guest').explain()
+        self.assertEqual(('ordered', 'max_guest', 'index'),
+                         (plan['access'], plan['index'], plan['order']))
+        self.assertEqual(self.keys(4, 3), list(
+            models.storage.query(Place).order_by('-max_guest').limit(2)
+            .all()))
+
+    def test_scan(self):
+        """Verifies that classes or attributes without an index are
+        scanned.
+        """
+        self.places[2].name = 'Hut'
+        self.places[2].save()
+        query = models.storage.query(Place).filter(name='Hut')
+        self.assertEqual(('scan', 5), (query.explain()['access'],
+                                       query.explain()['estimated_rows']))
+        self.assertEqual(self.keys(2), list(query.all()))
+
+        obj = BaseModel()
+        obj.save()
+        self.assertEqual([obj], list(models.storage.query(BaseModel)))
+        plan = models.storage.query(BaseModel).order_by('name').explain()
+        self.assertEqual(('scan', 'sort'), (plan['access'], plan['order']))
+
+    def test_id_order(self):
+        """Verifies the pages of the objects in the order of their ids.
+        """
+        ids = sorted(place.id for place in self.places)
+        query = models.storage.query(Place).order_by('-id').limit(2)
+        plan = query.explain()
+        self.assertEqual(('ordered', 'id', 'index'),
+                         (plan['access'], plan['index'], plan['order']))
+        page = list(query)
+        self.assertEqual(ids[:2:-1], [place.id for place in page])
+        query = query.filter(id__lt=page[-1].id)
+        self.assertEqual(('range', 'id', 'index'), (
+            query.explain()['access'], query.explain()['index'],
+            query.explain()['order']))
+        self.assertEqual(ids[2:0:-1], [place.id for place in query])
+        self.assertEqual(ids[:3], [place.id for place in models.storage.query(
+            Place).filter(id__le=ids[2]).order_by('id')])
+        self.assertEqual(ids[1:], [place.id for place in models.storage.query(
+            Place).filter(city_id__ne='x', id__gt=ids[0]).order_by('id')])
+        self.assertEqual(0, models.storage.query(Place).filter(
+            id__lt=5).count())
+
+
+if __name__ == '__main__':
+    unittest.main()
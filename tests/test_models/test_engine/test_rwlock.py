@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the RWLock class,
+the reader/writer lock guarding the storage engine.
+"""
+import threading
+import unittest
+from models.engine.rwlock import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """Testing the RWLock class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Create a released lock
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.lock = RWLock()
+        return super().setUp()
+
+    def test_readers_share(self):
+        """Verifies that many threads read at once
+        """
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                barrier.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join(5)
+        self.assertFalse(barrier.broken)
+
+    def test_writer_excludes(self):
+        """Verifies that readers wait for the writer
+        """
+        events = []
+        entered = threading.Event()
+
+        def read():
+            entered.set()
+            with self.lock.read():
+                events.append('read')
+
+        with self.lock.write():
+            thread = threading.Thread(target=read)
+            thread.start()
+            entered.wait(5)
+            thread.join(0.1)
+            self.assertTrue(thread.is_alive())
+            events.append('write')
+        thread.join(5)
+        self.assertEqual(['write', 'read'], events)
+
+    def test_reentrant(self):
+        """Verifies that the writer can read and write again
+        """
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(self.lock.acquire_write()))
+        thread.start()
+        thread.join(5)
+        self.assertEqual([None], acquired)
+
+    def test_upgrade(self):
+        """Verifies that a reader can't become the writer
+        """
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+        with self.lock.write():
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
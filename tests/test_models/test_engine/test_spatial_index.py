@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the SpatialIndex class,
+the grid of latitude and longitude cells the storage engine keeps for the
+radius, box and nearest neighbour searches.
+"""
+import random
+import unittest
+from models.engine.spatial_index import SpatialIndex, haversine
+from models.place import Place
+
+
+class TestHaversine(unittest.TestCase):
+    """Testing the haversine function.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def test_distances(self):
+        """Verifies a few known distances
+        """
+        self.assertEqual(0, haversine(40.7, -74.0, 40.7, -74.0))
+        self.assertAlmostEqual(111.195, haversine(0, 0, 1, 0), places=2)
+        self.assertAlmostEqual(haversine(0, 179.5, 0, -179.5),
+                               haversine(0, 0, 0, 1))
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """Testing the SpatialIndex class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Index random points, clustered around New York and the 180th
+        meridian
+
+        Returns:
+            The default behavior of the parent class
+        """
+        generator = random.Random(1809)
+        self.index = SpatialIndex(Place)
+        self.positions = {}
+        for i in range(3000):
+            if i % 3 == 0:
+                lat = generator.gauss(40.7, 0.2)
+                lon = generator.gauss(-74.0, 0.2)
+            elif i % 7 == 0:
+                lat = generator.uniform(-1, 1)
+                lon = generator.choice((179.95, -179.95))
+            else:
+                lat = generator.uniform(-85, 85)
+                lon = generator.uniform(-180, 180)
+            key = f'Place.{i}'
+            self.positions[key] = (lat, lon)
+            self.index.add(key, {'latitude': lat, 'longitude': lon})
+        return super().setUp()
+
+    def scan(self, lat, lon):
+        """Every key with its distance to a point, nearest first"""
+        return sorted(((key, haversine(lat, lon, *position))
+                       for key, position in self.positions.items()),
+                      key=lambda item: item[1])
+
+    def test_within_matches_scan(self):
+        """Verifies the radius search against measuring every point
+        """
+        for lat, lon, radius in ((40.7, -74.0, 5), (0, 179.99, 50),
+                                 (0, -179.99, 300), (84, 0, 800),
+                                 (10, 10, 2000)):
+            expected = [key for key, distance in self.scan(lat, lon)
+                        if distance <= radius]
+            found = self.index.within(lat, lon, radius)
+            self.assertEqual(sorted(expected),
+                             sorted(key for key, _ in found))
+            distances = [distance for _, distance in found]
+            self.assertEqual(sorted(distances), distances)
+
+    def test_nearest_matches_scan(self):
+        """Verifies the nearest neighbour search against measuring every
+        point
+        """
+        for lat, lon, k in ((40.7, -74.0, 10), (0, 180, 7),
+                            (0, -179.99, 30), (60, 60, 5), (-89, 0, 3)):
+            expected = [distance for _, distance in self.scan(lat, lon)[:k]]
+            found = [distance for _, distance in
+                     self.index.nearest(lat, lon, k)]
+            self.assertEqual(expected, found)
+
+    def test_nearest_more_than_indexed(self):
+        """Ensures asking for more objects than indexed returns them all
+        """
+        self.assertEqual(3000, len(self.index.nearest(0, 0, 5000)))
+        self.assertEqual([], self.index.nearest(0, 0, 0))
+
+    def test_in_box(self):
+        """Verifies the box search, also across the 180th meridian
+        """
+        for south, west, north, east in ((40.5, -74.3, 40.9, -73.7),
+                                         (-1, 179, 1, -179)):
+            expected = []
+            for key, (lat, lon) in self.positions.items():
+                if west <= east:
+                    inside = west <= lon <= east
+                else:
+                    inside = lon >= west or lon <= east
+                if south <= lat <= north and inside:
+                    expected.append(key)
+            self.assertEqual(sorted(expected), sorted(
+                self.index.in_box(south, west, north, east)))
+
+    def test_update_and_remove(self):
+        """Verifies that moved and removed objects are re-indexed
+        """
+        self.index.add('Place.0', {'latitude': -33.9, 'longitude': 151.2})
+        self.index.remove('Place.3')
+        keys = [key for key, _ in self.index.within(-33.9, 151.2, 1)]
+        self.assertEqual(['Place.0'], keys)
+        self.assertNotIn('Place.3', self.index.positions)
+        self.assertEqual(2999, len(self.index))
+
+    def test_invalid_coordinates(self):
+        """Ensures objects without valid coordinates are left out
+        """
+        index = SpatialIndex(Place)
+        index.add('Place.1', {'latitude': 'north', 'longitude': 1})
+        index.add('Place.2', {'latitude': 91, 'longitude': 1})
+        index.add('Place.3', {'latitude': '12.5', 'longitude': '1'})
+        self.assertEqual({'Place.3': (12.5, 1.0)}, index.positions)
+
+    def test_invalid_queries(self):
+        """Ensures queries out of range or not numbers find nothing, and
+        boxes are cut to the valid coordinates
+        """
+        nan, inf = float('nan'), float('inf')
+        for lat, lon in ((nan, 0), (0, nan), (inf, 0), (1e308, 0),
+                         (91, 0), (0, -181)):
+            self.assertEqual([], self.index.within(lat, lon, 5))
+            self.assertEqual([], self.index.nearest(lat, lon, 5))
+        self.assertEqual([], self.index.within(0, 0, nan))
+        self.assertEqual([], self.index.within(0, 0, -1))
+        self.assertEqual([], self.index.in_box(nan, 0, 1, 1))
+        self.assertEqual(sorted(self.positions),
+                         sorted(self.index.in_box(-inf, -inf, inf, inf)))
+        self.assertEqual(sorted(self.positions),
+                         sorted(self.index.in_box(-1e308, -1e308,
+                                                  1e308, 1e308)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the TextIndex class,
+the inverted index the storage engine keeps for the text searches.
+"""
+import unittest
+from models.engine.text_index import TextIndex, tokenize
+from models.place import Place
+
+
+class TestTokenize(unittest.TestCase):
+    """Testing the tokenize function.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def test_words(self):
+        """Verifies that texts are split into lowercase words
+        """
+        self.assertEqual(['a', 'cozy', 'café', 'near', 'the', 'beach'],
+                         tokenize('A cozy Café, near the beach!'))
+        self.assertEqual([], tokenize(' -- '))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Testing the TextIndex class.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Index a few places by their name and description
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.index = TextIndex(Place, ('name', 'description'))
+        self.index.add('Place.1', {'name': 'Sunny loft',
+                                   'description': 'Quiet, near the beach'})
+        self.index.add('Place.2', {'name': 'Noisy flat',
+                                   'description': 'Garden parties'})
+        self.index.add('Place.3', {'name': 'Cabin',
+                                   'description': 'Quiet garden, quiet pool'})
+        self.index.add('Place.4', {'name': 'Beach hut'})
+        return super().setUp()
+
+    def test_add(self):
+        """Verifies the posting lists and document lengths
+        """
+        self.assertEqual(4, len(self.index))
+        self.assertEqual({'Place.1': 1, 'Place.3': 2},
+                         self.index.postings['quiet'])
+        self.assertEqual(6, self.index.lengths['Place.1'])
+        self.assertEqual(2, self.index.lengths['Place.4'])
+        self.assertEqual(17, self.index.total_length)
+
+    def test_add_replaces(self):
+        """Verifies that indexing an object again replaces its words
+        """
+        self.index.add('Place.1', {'name': 'Sunny loft'})
+        self.assertNotIn('Place.1', self.index.postings['quiet'])
+        self.assertNotIn('near', self.index.postings)
+        self.assertEqual(2, self.index.lengths['Place.1'])
+        self.assertEqual(13, self.index.total_length)
+
+    def test_remove(self):
+        """Verifies that removed objects leave the posting lists
+        """
+        self.index.remove('Place.2')
+        self.index.remove('Place.2')
+        self.assertEqual(3, len(self.index))
+        self.assertNotIn('noisy', self.index.postings)
+        self.assertEqual({'Place.3': 1}, self.index.postings['garden'])
+
+    def test_match(self):
+        """Verifies the boolean queries
+        """
+        self.assertEqual(['Place.3'], self.index.match('quiet garden'))
+        self.assertEqual(['Place.4'], self.index.match('beach -quiet'))
+        self.assertEqual(['Place.2', 'Place.3', 'Place.4'],
+                         sorted(self.index.match('garden OR hut')))
+        self.assertEqual([], self.index.match('castle'))
+        self.assertEqual([], self.index.match('-quiet'))
+
+    def test_rank(self):
+        """Verifies the BM25 ranking
+        """
+        # Place.2 and Place.1 match one word each, Place.2 is shorter
+        ranked = self.index.rank('quiet garden')
+        self.assertEqual(['Place.3', 'Place.2', 'Place.1'],
+                         [key for key, _ in ranked])
+        self.assertEqual(['Place.3'],
+                         [key for key, _ in self.index.rank('quiet', 1)])
+        self.assertEqual([], self.index.rank('castle'))
+
+    def test_search(self):
+        """Verifies that the matches of a query are ranked by its words
+        """
+        self.assertEqual(['Place.4', 'Place.1'],
+                         [key for key, _ in self.index.search('beach')])
+        self.assertEqual(['Place.3'],
+                         [key for key, _ in
+                          self.index.search('quiet -beach OR castle')])
+
+    def test_load(self):
+        """Verifies that a loaded index is the same as the original
+        """
+        index = TextIndex(Place, ('name', 'description'))
+        index.load(self.index.to_dict())
+        self.assertEqual(self.index.postings, index.postings)
+        self.assertEqual(self.index.lengths, index.lengths)
+        self.assertEqual(self.index.total_length, index.total_length)
+        index.remove('Place.3')
+        self.assertNotIn('pool', index.postings)
+
+
+if __name__ == '__main__':
+    unittest.main()
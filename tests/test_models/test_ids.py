@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+This module provides a unittest suite for testing the generators of
+the ids of the new objects.
+"""
+import unittest
+import uuid
+from unittest import mock
+from models import ids
+
+
+class TestIds(unittest.TestCase):
+    """Testing the id generators.
+
+    Arguments:
+        unittest -- Inherits unittest.TestCase's attributes and methods
+    """
+
+    def setUp(self):
+        """Forget the last ids made, the tests set the clock before them
+
+        Returns:
+            The default behavior of the parent class
+        """
+        self.last = list(ids._last_uuid7), list(ids._last_ulid)
+        ids._last_uuid7[:] = ids._last_ulid[:] = 0, 0
+        return super().setUp()
+
+    def tearDown(self):
+        """Restore the last ids made
+
+        Returns:
+            The default behavior of the parent class
+        """
+        ids._last_uuid7[:], ids._last_ulid[:] = self.last
+        return super().tearDown()
+
+    def test_uuid7_format(self):
+        """Ensures the uuid7 ids are version 7 UUIDs starting with the
+        millisecond.
+        """
+        with mock.patch.object(ids, '_milliseconds',
+                               return_value=0x0123456789ab):
+            text = ids.uuid7()
+        value = uuid.UUID(text)
+        self.assertEqual(str(value), text)
+        self.assertEqual(7, value.version)
+        self.assertEqual(uuid.RFC_4122, value.variant)
+        self.assertEqual(0x0123456789ab, value.int >> 80)
+
+    def test_ulid_format(self):
+        """Ensures the ULIDs are 26 characters of base32 starting with
+        the millisecond.
+        """
+        with mock.patch.object(ids, '_milliseconds',
+                               return_value=0x0123456789ab):
+            value = ids.ulid()
+        self.assertEqual(26, len(value))
+        self.assertTrue(set(value) <= set(ids.CROCKFORD))
+        number = 0
+        for digit in value:
+            number = number * 32 + ids.CROCKFORD.index(digit)
+        self.assertEqual(0x0123456789ab, number >> 80)
+
+    def test_monotonic(self):
+        """Ensures the ids made in one millisecond, or after the clock
+        went back, still sort in the order they were made.
+        """
+        for generator in (ids.uuid7, ids.ulid):
+            made = []
+            for now in (1000, 1000, 999, 1001, 1001):
+                with mock.patch.object(ids, '_milliseconds',
+                                       return_value=now):
+                    made.extend(generator() for _ in range(3))
+            self.assertEqual(sorted(made), made)
+            self.assertEqual(len(made), len(set(made)))
+
+    def test_counter_overflow(self):
+        """Ensures an overflowing counter moves to the next millisecond.
+        """
+        with mock.patch.object(ids, '_milliseconds', return_value=2000):
+            ids.uuid7()
+            ids._last_uuid7[1] = 0xfff
+            value = uuid.UUID(ids.uuid7())
+        self.assertEqual(2001, value.int >> 80)
+
+    def test_generator(self):
+        """Verifies the generators are found by name or path.
+        """
+        self.assertIs(ids.uuid7, ids.generator('uuid7'))
+        self.assertIs(ids.ulid, ids.generator('models.ids.ulid'))
+        for name in ('uuid1', 'models.ids.nothing', 'nowhere.uuid'):
+            with self.assertRaises(ValueError):
+                ids.generator(name)
+
+
+if __name__ == '__main__':
+    unittest.main()